@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 from modules import proportions
 from modules import descriptive, sampling, hypothesis, chi_square
 from modules.correlation import correlation_selector
@@ -11,6 +10,7 @@ from modules import linear_regression
 from modules import logistic_regression
 from modules import outliers_analysis
 from modules import encoding_categorical
+from modules import data_loader
 
 # ✅ Ampliar el ancho de la app
 st.set_page_config(page_title="Statistical Analysis Tool", layout="wide")
@@ -86,13 +86,20 @@ elif menu == "Resources":
 
 st.sidebar.markdown("---")
 
-uploaded_file = st.sidebar.file_uploader("📁 Upload a CSV file", type="csv")
+uploaded_file = st.sidebar.file_uploader(
+    "📁 Upload a data file (CSV, CSV.gz/.zst, Parquet, Feather)",
+    type=data_loader.SUPPORTED_EXTENSIONS
+)
 df = None
 if uploaded_file is not None:
     try:
-        df = pd.read_csv(uploaded_file)
-        uploaded_file.seek(0)
-        st.session_state["uploaded_file"] = pd.read_csv(uploaded_file)
+        with st.sidebar.expander("⚙️ Loading options"):
+            all_columns = data_loader.uploaded_column_names(uploaded_file)
+            load_columns = st.multiselect("🧩 Columns to load (empty = all):", all_columns, key="load_columns")
+            compact_numeric = st.checkbox("🗜️ Compact numeric dtypes (int8/int16/float32)", value=False,
+                                          key="compact_numeric")
+        df = data_loader.load_uploaded_file(uploaded_file, columns=load_columns, compact_numeric=compact_numeric)
+        st.session_state["uploaded_file"] = df
         st.sidebar.success("✅ File uploaded successfully!")
     except Exception as e:
         st.sidebar.error(f"❌ File upload error: {e}")
@@ -134,7 +141,10 @@ if menu == "Analysis":
         stat_tests_menu.run()
 
     elif df is None:
-        st.info("Please upload a CSV file to start analysis.")
+        st.info("Please upload a data file to start analysis.")
+        if module == "Descriptive Analysis":
+            # Archivos más grandes que la memoria: análisis en streaming desde el directorio de datos del servidor
+            descriptive.run_streaming_descriptive_page(None)
 
     else:
         # ✅ Mostrar preview solo si hay archivo y no es "Tests whitout BD"
@@ -142,23 +152,48 @@ if menu == "Analysis":
         st.dataframe(df.head())
 
         if module == "Descriptive Analysis":
-            numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns.tolist()
-            if numeric_cols:
-                selected_col = st.selectbox("🔢 Select a numeric column to analyze:", numeric_cols, key="desc")
-                if st.button("▶️ Run Descriptive Analysis"):
-                    st.subheader(f"📈 Descriptive Statistics for '{selected_col}'")
-                    descriptive.run_descriptive_analysis(df[selected_col].dropna(), selected_col)
+            numeric_cols = df.select_dtypes(include='number').columns.tolist()
+            desc_mode = st.radio("⚙️ Computation mode:", ["Exact (in memory)", "Streaming (chunked sketches)"],
+                                 horizontal=True, key="desc_mode")
+            if desc_mode == "Streaming (chunked sketches)":
+                descriptive.run_streaming_descriptive_page(uploaded_file)
+            elif numeric_cols:
+                profile_all = st.checkbox("📋 Profile all numeric columns at once", key="desc_profile_all")
+                if profile_all:
+                    if st.button("▶️ Run Column Profile"):
+                        descriptive.run_profile_all_columns(df[numeric_cols])
+                else:
+                    selected_col = st.selectbox("🔢 Select a numeric column to analyze:", numeric_cols, key="desc")
+                    if st.button("▶️ Run Descriptive Analysis"):
+                        st.subheader(f"📈 Descriptive Statistics for '{selected_col}'")
+                        descriptive.run_descriptive_analysis(df[selected_col].dropna(), selected_col)
             else:
                 st.warning("⚠️ No numeric columns found in the dataset.")
 
         elif module == "Sampling":
-            numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns.tolist()
+            numeric_cols = df.select_dtypes(include='number').columns.tolist()
             if numeric_cols:
                 selected_col = st.selectbox("📌 Select a numeric column for sampling analysis:", numeric_cols, key="samp")
                 confidence = st.number_input("🔒 Confidence Level (50-99.9%)", min_value=50.0, max_value=99.9, value=95.0)
+                method = st.selectbox("📐 Interval method:", list(sampling.INTERVAL_METHODS),
+                                      format_func=sampling.INTERVAL_METHODS.get, key="samp_method")
+                n_boot, seed, extra = 2_000, 42, False
+                if method != "t":
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        n_boot = int(st.number_input("🔁 Bootstrap resamples (B)", min_value=200, max_value=100_000,
+                                                     value=2_000, step=1_000, key="samp_boot"))
+                    with col2:
+                        seed = int(st.number_input("🎲 Seed", value=42, step=1, key="samp_seed"))
+                    extra = st.checkbox("➕ Also bootstrap the median, variance and CV (about twice as slow)",
+                                        key="samp_extra")
+                run_spec = (selected_col, confidence, method, n_boot, seed, extra)
                 if st.button("📊 Run Sampling Analysis"):
+                    st.session_state["sampling_run"] = run_spec
+                if st.session_state.get("sampling_run") == run_spec:
                     st.subheader(f"📊 Sampling Statistics for '{selected_col}'")
-                    sampling.run_sampling_analysis(df[selected_col].dropna(), confidence)
+                    sampling.run_sampling_analysis(df[selected_col].dropna(), confidence, method, n_boot, seed,
+                                                   extra)
             else:
                 st.warning("⚠️ No numeric columns found in the dataset.")
 
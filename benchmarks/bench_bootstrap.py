@@ -0,0 +1,44 @@
+"""Throughput of the bootstrap engine on continuous and 0/1 data.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_bootstrap --rows 1000000 --resamples 10000 --workers 8
+"""
+import argparse
+import time
+
+import numpy as np
+
+from modules import bootstrap_engine
+
+
+def timed(label, data, statistics, resamples, workers, studentized=True):
+    start = time.perf_counter()
+    result = bootstrap_engine.bootstrap(data, statistics, n_boot=resamples, workers=workers, studentized=studentized)
+    elapsed = time.perf_counter() - start
+    low, high = result.interval(statistics[0], "bca")
+    print(f"{label:<38}{resamples:>10,}{elapsed:>10.2f}{resamples / elapsed:>14,.1f}   "
+          f"BCa {statistics[0]}: ({low:.4g}, {high:.4g})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--resamples", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    values = rng.gamma(2.0, 3.0, args.rows)
+    flags = (rng.random(args.rows) < 0.3).astype(np.float64)
+
+    print(f"{args.rows:,} rows")
+    print(f"{'data / statistics':<38}{'B':>10}{'seconds':>10}{'resamples/s':>14}")
+    timed("0/1 proportion (counts path)", flags, ("proportion",), args.resamples, args.workers)
+    timed("continuous mean (percentile/BCa)", values, ("mean",), args.resamples, args.workers, studentized=False)
+    timed("continuous mean, median, var, CV", values, ("mean", "median", "var", "cv"), args.resamples,
+          args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Call overhead of ``scipy.stats`` distribution methods vs ``modules.distributions``.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_distributions --calls 20000 --array 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+from scipy import stats
+
+from modules import distributions
+
+
+def per_call(func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls
+
+
+def best_of(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--array", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    alpha, df1, df2, t_stat, z_stat = 0.05, 27, 4, 2.31, 1.7
+    # Las formas originales de las páginas frente al servicio
+    scalar_cases = [
+        ("z critical (two-sided)", lambda: stats.norm.ppf(1 - alpha / 2),
+         lambda: distributions.critical_value("norm", alpha)),
+        ("t critical (two-sided)", lambda: stats.t.ppf(1 - alpha / 2, df1),
+         lambda: distributions.critical_value("t", alpha, df1)),
+        ("F critical (upper)", lambda: stats.f.ppf(1 - alpha, df2, df1),
+         lambda: distributions.critical_value("f", alpha, df2, df1, tail="upper")),
+        ("chi2 critical (upper)", lambda: stats.chi2.ppf(1 - alpha, df2),
+         lambda: distributions.critical_value("chi2", alpha, df2, tail="upper")),
+        ("z p-value (two-sided)", lambda: 2 * (1 - stats.norm.cdf(abs(z_stat))),
+         lambda: distributions.p_value("norm", z_stat)),
+        ("t p-value (two-sided)", lambda: 2 * (1 - stats.t.cdf(abs(t_stat), df1)),
+         lambda: distributions.p_value("t", t_stat, df1)),
+        ("F p-value", lambda: stats.f.sf(3.1, df2, df1),
+         lambda: distributions.sf("f", 3.1, df2, df1)),
+    ]
+    print(f"{'scalar call':<26}{'scipy µs':>12}{'service µs':>12}{'speedup':>10}")
+    for name, legacy, service in scalar_cases:
+        before = per_call(legacy, args.calls) * 1e6
+        after = per_call(service, args.calls) * 1e6
+        print(f"{name:<26}{before:>12.2f}{after:>12.2f}{before / after:>9.1f}x")
+
+    rng = np.random.default_rng(0)
+    values = rng.standard_t(df1, args.array) * 2
+    dofs = rng.integers(5, 500, args.array).astype(np.float64)
+    array_cases = [
+        ("norm sf", lambda: stats.norm.sf(values), lambda: distributions.sf("norm", values)),
+        ("t sf (per-row df)", lambda: stats.t.sf(values, dofs), lambda: distributions.sf("t", values, dofs)),
+        ("chi2 sf", lambda: stats.chi2.sf(np.abs(values), 3), lambda: distributions.sf("chi2", np.abs(values), 3)),
+    ]
+    print(f"\n{'array of ' + format(args.array, ','):<26}{'scipy s':>12}{'service s':>12}{'speedup':>10}")
+    for name, legacy, service in array_cases:
+        before = best_of(legacy, args.repeat)
+        after = best_of(service, args.repeat)
+        print(f"{name:<26}{before:>12.4f}{after:>12.4f}{before / after:>9.1f}x")
+
+    print("\nUpper-tail precision, P(Z > z):")
+    for z in (5.0, 9.0, 20.0):
+        print(f"  z={z:>5}: 1 - cdf = {1 - stats.norm.cdf(z):.3e}   sf = {distributions.sf('norm', z):.3e}")
+
+
+if __name__ == "__main__":
+    main()
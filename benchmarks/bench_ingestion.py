@@ -0,0 +1,117 @@
+"""Load time and RSS growth of the ingestion paths in ``modules.data_loader``.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_ingestion --rows 1000000 --cols 40
+
+Every format is loaded in a fresh subprocess so RSS is not polluted by
+earlier runs.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def make_frame(rows, cols, seed=0):
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(cols):
+        kind = i % 4
+        if kind == 0:
+            data[f"f{i}"] = rng.normal(100, 15, rows)
+        elif kind == 1:
+            data[f"i{i}"] = rng.integers(0, 100, rows)
+        elif kind == 2:
+            data[f"s{i}"] = rng.choice(["north", "south", "east", "west"], rows)
+        else:
+            data[f"r{i}"] = rng.integers(0, 1000, rows) / 4
+    return pd.DataFrame(data)
+
+
+def write_files(df, folder):
+    paths = {
+        "csv": os.path.join(folder, "data.csv"),
+        "csv.gz": os.path.join(folder, "data.csv.gz"),
+        "csv.zst": os.path.join(folder, "data.csv.zst"),
+        "parquet": os.path.join(folder, "data.parquet"),
+        "feather": os.path.join(folder, "data.feather"),
+    }
+    df.to_csv(paths["csv"], index=False)
+    df.to_csv(paths["csv.gz"], index=False, compression="gzip")
+    df.to_csv(paths["csv.zst"], index=False, compression="zstd")
+    df.to_parquet(paths["parquet"], index=False)
+    df.to_feather(paths["feather"])
+    return paths
+
+
+def _rss_mb():
+    # RSS actual (Linux); fuera de Linux se usa el pico como aproximación
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(path, file_format, optimized, compact_numeric):
+    from modules import data_loader
+
+    baseline = _rss_mb()
+    start = time.perf_counter()
+    if optimized:
+        df = data_loader.read_table(path, file_format)
+        df = data_loader.optimize_dtypes(df, compact_numeric=compact_numeric)
+    else:
+        # Ruta original: pd.read_csv sin optimización de dtypes
+        df = pd.read_csv(path)
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": elapsed,
+        "rss_mb": _rss_mb() - baseline,
+        "frame_mb": df.memory_usage(deep=True).sum() / 2**20,
+    }
+
+
+def run_case(path, file_format, optimized, compact_numeric):
+    cmd = [sys.executable, "-m", "benchmarks.bench_ingestion", "--worker", path, file_format,
+           str(int(optimized)), str(int(compact_numeric))]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--cols", type=int, default=40)
+    parser.add_argument("--worker", nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        path, file_format, optimized, compact = args.worker
+        print(json.dumps(measure(path, file_format, optimized == "1", compact == "1")))
+        return
+
+    with tempfile.TemporaryDirectory() as folder:
+        paths = write_files(make_frame(args.rows, args.cols), folder)
+        cases = [("csv (current path)", paths["csv"], "csv", False, False)]
+        for file_format, path in paths.items():
+            cases.append((f"{file_format} + category", path, file_format, True, False))
+            cases.append((f"{file_format} + category + compact", path, file_format, True, True))
+
+        print(f"{args.rows:,} rows x {args.cols} columns")
+        print(f"{'case':<34}{'load s':>10}{'RSS +MB':>14}{'frame MB':>12}")
+        for label, path, file_format, optimized, compact in cases:
+            res = run_case(path, file_format, optimized, compact)
+            print(f"{label:<34}{res['seconds']:>10.2f}{res['rss_mb']:>14.1f}{res['frame_mb']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
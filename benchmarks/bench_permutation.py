@@ -0,0 +1,48 @@
+"""Throughput of the permutation-test kernel, with and without early stopping.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_permutation --rows 100000 --permutations 100000 --workers 8
+"""
+import argparse
+import time
+
+import numpy as np
+
+from modules import permutation
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    rate = result.n_permutations / elapsed
+    print(f"{label:<34}{result.n_permutations:>12,}{elapsed:>10.2f}{rate:>14,.0f}   p={result.p_value:.4g}"
+          f"{'  (stopped early)' if result.stopped_early else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--permutations", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--effect", type=float, default=0.02, help="Mean shift of the second group (in SDs).")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    half = args.rows // 2
+    x, y = rng.normal(0, 1, half), rng.normal(args.effect, 1, args.rows - half)
+    groups = np.arange(args.rows) % 4
+
+    print(f"{args.rows:,} rows, up to {args.permutations:,} permutations")
+    print(f"{'test':<34}{'perms':>12}{'seconds':>10}{'perms/s':>14}")
+    timed("two-sample, early stopping", lambda: permutation.two_sample_test(
+        x, y, exact=False, n_permutations=args.permutations, workers=args.workers))
+    timed("one-way ANOVA (4 groups), early", lambda: permutation.anova_test(
+        np.concatenate([x, y]), groups, n_permutations=args.permutations, workers=args.workers))
+    timed("two-sample, all permutations", lambda: permutation.two_sample_test(
+        x, y, exact=False, n_permutations=args.permutations, workers=args.workers, stop_early=False))
+
+
+if __name__ == "__main__":
+    main()
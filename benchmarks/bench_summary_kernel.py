@@ -0,0 +1,63 @@
+"""Per-statistic pandas calls vs ``modules.summary_kernel.summarize``.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_summary_kernel --sizes 1000000 10000000 100000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules import summary_kernel
+
+
+def legacy_summary(series):
+    # La construcción original del dict `desc` en descriptive.py
+    return {
+        'Count': series.count(),
+        'Mean': series.mean(),
+        'Median': series.median(),
+        'Mode': series.mode().values.tolist(),
+        'Min': series.min(),
+        'Max': series.max(),
+        'Range': series.max() - series.min(),
+        'Variance': series.var(),
+        'Standard Deviation': series.std(),
+        'Q1': series.quantile(0.25),
+        'Q2 (Median)': series.quantile(0.50),
+        'Q3': series.quantile(0.75),
+        'IQR': series.quantile(0.75) - series.quantile(0.25),
+        'Top 10': series.value_counts().nlargest(10),
+    }
+
+
+def best_of(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>12}{'legacy s':>12}{'kernel s':>12}{'speedup':>10}")
+    for n in args.sizes:
+        # Valores redondeados para que la moda y las frecuencias tengan sentido
+        series = pd.Series(np.round(rng.normal(50, 10, n), 2))
+        values = series.to_numpy()
+        legacy = best_of(lambda: legacy_summary(series), args.repeat)
+        kernel = best_of(lambda: summary_kernel.summarize(values), args.repeat)
+        print(f"{n:>12,}{legacy:>12.3f}{kernel:>12.3f}{legacy / kernel:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
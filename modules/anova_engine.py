@@ -0,0 +1,266 @@
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+import streamlit as st
+from scipy import sparse
+from modules import data_loader, distributions, plot_cache
+from modules.lru_cache import LRUCache
+
+MAX_CACHED_GROUPINGS = 32
+
+
+@dataclass(frozen=True)
+class GroupStats:
+    """Per-group sufficient statistics: count, mean and M2 (sum of squared deviations)."""
+    labels: np.ndarray
+    count: np.ndarray
+    mean: np.ndarray
+    m2: np.ndarray
+
+    @property
+    def n(self):
+        return int(self.count.sum())
+
+    @property
+    def k(self):
+        return len(self.labels)
+
+    @property
+    def grand_mean(self):
+        return float(np.dot(self.count, self.mean) / self.n)
+
+    @property
+    def variance(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.m2 / (self.count - 1)
+
+    @property
+    def sem(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.sqrt(self.variance / self.count)
+
+    def as_frame(self):
+        return pd.DataFrame({
+            'n': self.count, 'Mean': self.mean, 'Std': np.sqrt(self.variance), 'SE': self.sem,
+        }, index=pd.Index(self.labels, name='Group'))
+
+
+def _grouped_moments(codes, values, k):
+    count = np.bincount(codes, minlength=k)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(codes, weights=values, minlength=k) / count
+    # Segunda pasada centrada: estable aunque las medias sean grandes
+    deviation = values - mean[codes]
+    m2 = np.bincount(codes, weights=deviation * deviation, minlength=k)
+    return count, mean, m2
+
+
+def group_stats(groups, values):
+    """Grouped n / mean / M2 with one factorize and a few ``np.bincount`` passes.
+
+    Rows with a missing group or value are dropped; groups come out sorted,
+    like ``DataFrame.groupby``.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    codes, labels = pd.factorize(pd.Series(groups), sort=True)
+    keep = (codes >= 0) & ~np.isnan(values)
+    count, mean, m2 = _grouped_moments(codes[keep], values[keep], len(labels))
+    used = count > 0
+    return GroupStats(labels=np.asarray(labels)[used], count=count[used], mean=mean[used], m2=m2[used])
+
+
+@dataclass(frozen=True)
+class CellStats:
+    """n / mean / M2 for every (level_a, level_b) cell as I×J arrays (empty cells: n=0, mean=NaN)."""
+    levels_a: np.ndarray
+    levels_b: np.ndarray
+    count: np.ndarray
+    mean: np.ndarray
+    m2: np.ndarray
+
+    @property
+    def n(self):
+        return int(self.count.sum())
+
+    @property
+    def is_balanced(self):
+        return bool((self.count == self.count.flat[0]).all() and self.count.flat[0] > 0)
+
+    @property
+    def sem(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.sqrt(self.m2 / (self.count - 1) / self.count)
+
+    def marginal(self, axis):
+        """Collapse the cells onto factor a (axis=0) or b (axis=1) as ``GroupStats``."""
+        count = self.count if axis == 0 else self.count.T
+        mean = np.nan_to_num(self.mean if axis == 0 else self.mean.T)
+        m2 = self.m2 if axis == 0 else self.m2.T
+        n = count.sum(axis=1)
+        level_mean = (count * mean).sum(axis=1) / n
+        # Chan: M2 de la unión = Σ M2 de celdas + Σ n (media_celda - media_nivel)²
+        level_m2 = (m2 + count * (mean - level_mean[:, None]) ** 2).sum(axis=1)
+        labels = self.levels_a if axis == 0 else self.levels_b
+        return GroupStats(labels=labels, count=n, mean=level_mean, m2=level_m2)
+
+
+def cell_stats(factor_a, factor_b, values):
+    """Cell-level sufficient statistics of a two-factor design from one factorize per factor."""
+    values = np.asarray(values, dtype=np.float64)
+    codes_a, levels_a = pd.factorize(pd.Series(factor_a), sort=True)
+    codes_b, levels_b = pd.factorize(pd.Series(factor_b), sort=True)
+    keep = (codes_a >= 0) & (codes_b >= 0) & ~np.isnan(values)
+    shape = (len(levels_a), len(levels_b))
+    cells = codes_a[keep] * shape[1] + codes_b[keep]
+    count, mean, m2 = _grouped_moments(cells, values[keep], shape[0] * shape[1])
+    return CellStats(levels_a=np.asarray(levels_a), levels_b=np.asarray(levels_b),
+                     count=count.reshape(shape), mean=mean.reshape(shape), m2=m2.reshape(shape))
+
+
+def _session_group_cache():
+    if "_group_stats_cache" not in st.session_state:
+        st.session_state["_group_stats_cache"] = LRUCache(max_entries=MAX_CACHED_GROUPINGS)
+    return st.session_state["_group_stats_cache"]
+
+
+def grouping_key(df, group_col, value_col):
+    fingerprint = data_loader.dataset_fingerprint()
+    if fingerprint is None:
+        fingerprint = plot_cache.data_fingerprint(df[[group_col, value_col]])
+    return (fingerprint, group_col, value_col)
+
+
+def cached_group_stats(df, group_col, value_col):
+    """``group_stats`` memoized per session on (dataset fingerprint, group_col, value_col).
+
+    ANOVA, post-hoc tests and group plots on the same grouping then cost O(k)
+    after the first one instead of another pass over the rows.
+    """
+    key = grouping_key(df, group_col, value_col)
+    return _session_group_cache().get_or_create(key, lambda: group_stats(df[group_col], df[value_col]))
+
+
+def cached_derived(df, group_col, value_col, spec, compute):
+    """Per-session memo of a result derived from a grouping (e.g. a post-hoc table for ``spec``)."""
+    key = grouping_key(df, group_col, value_col) + (spec,)
+    return _session_group_cache().get_or_create(key, compute)
+
+
+@dataclass(frozen=True)
+class OneWayAnova:
+    grand_mean: float
+    ssb: float
+    ssw: float
+    df_between: int
+    df_within: int
+    f_stat: float
+    p_value: float
+    f_crit: float
+
+    @property
+    def sst(self):
+        return self.ssb + self.ssw
+
+    @property
+    def msb(self):
+        return self.ssb / self.df_between
+
+    @property
+    def msw(self):
+        return self.ssw / self.df_within
+
+    @property
+    def mst(self):
+        return self.sst / (self.df_between + self.df_within)
+
+
+def oneway_anova(gs, alpha=0.05):
+    """One-way ANOVA F-test from ``GroupStats`` alone (no pass over the raw data)."""
+    if gs.k < 2 or gs.n <= gs.k:
+        raise ValueError("ANOVA needs at least two groups and more observations than groups.")
+    grand_mean = gs.grand_mean
+    ssb = float(np.dot(gs.count, (gs.mean - grand_mean) ** 2))
+    ssw = float(gs.m2.sum())
+    df_between, df_within = gs.k - 1, gs.n - gs.k
+    with np.errstate(invalid="ignore", divide="ignore"):
+        f_stat = (ssb / df_between) / (ssw / df_within)
+    return OneWayAnova(
+        grand_mean=grand_mean, ssb=ssb, ssw=ssw, df_between=df_between, df_within=df_within,
+        f_stat=float(f_stat),
+        p_value=distributions.sf("f", f_stat, df_between, df_within),
+        f_crit=distributions.critical_value("f", alpha, df_between, df_within, tail="upper"),
+    )
+
+
+def _additive_fit(cs):
+    """Weighted least squares of the additive model on the non-empty cell means.
+
+    The design has one row per cell (not per observation) and is sparse:
+    intercept + one dummy per non-reference level of each factor.
+    Returns (SSE of the additive model, its rank).
+    """
+    rows_a, rows_b = np.nonzero(cs.count)
+    n_a, n_b = cs.count.shape
+    n_cells = len(rows_a)
+    cols = [np.zeros(n_cells, dtype=np.int64)]
+    data = [np.ones(n_cells)]
+    for codes, offset in ((rows_a, 1), (rows_b, n_a)):
+        dummy = codes > 0
+        cols.append(offset + codes[dummy] - 1)
+        data.append(np.ones(dummy.sum()))
+    row_index = np.concatenate([np.arange(n_cells), np.flatnonzero(rows_a > 0), np.flatnonzero(rows_b > 0)])
+    design = sparse.csr_matrix((np.concatenate(data), (row_index, np.concatenate(cols))),
+                               shape=(n_cells, n_a + n_b - 1))
+
+    weights = cs.count[rows_a, rows_b].astype(np.float64)
+    y = cs.mean[rows_a, rows_b]
+    weighted = design.multiply(weights[:, None]).tocsr()
+    gram = (design.T @ weighted).toarray()
+    beta, _, rank, _ = np.linalg.lstsq(gram, weighted.T @ y, rcond=None)
+    residual = y - design @ beta
+    return float(np.dot(weights, residual * residual) + cs.m2.sum()), int(rank)
+
+
+def twoway_anova(cs, names=("A", "B"), alpha=0.05):
+    """Type II two-way ANOVA table (with interaction) from ``CellStats`` alone.
+
+    Balanced designs use the closed-form sums of squares; unbalanced ones
+    compare nested models, fitting the additive model on the cell means.
+    """
+    filled = cs.count > 0
+    n_cells = int(filled.sum())
+    n_a, n_b = cs.count.shape
+    sse_full = float(cs.m2.sum())
+    df_resid = cs.n - n_cells
+    if n_a < 2 or n_b < 2 or df_resid <= 0:
+        raise ValueError("Two-way ANOVA needs at least two levels per factor and replicated cells.")
+
+    sse_a = float(cs.marginal(0).m2.sum())
+    sse_b = float(cs.marginal(1).m2.sum())
+    if cs.is_balanced:
+        grand = cs.mean.mean()
+        mean_a, mean_b = cs.mean.mean(axis=1), cs.mean.mean(axis=0)
+        n_cell = cs.count.flat[0]
+        ss_a = n_cell * n_b * float(((mean_a - grand) ** 2).sum())
+        ss_b = n_cell * n_a * float(((mean_b - grand) ** 2).sum())
+        ss_ab = n_cell * float(((cs.mean - mean_a[:, None] - mean_b[None, :] + grand) ** 2).sum())
+        df_ab = (n_a - 1) * (n_b - 1)
+    else:
+        sse_add, rank_add = _additive_fit(cs)
+        ss_a, ss_b = sse_b - sse_add, sse_a - sse_add
+        ss_ab = sse_add - sse_full
+        df_ab = n_cells - rank_add
+
+    name_a, name_b = names
+    table = pd.DataFrame({
+        'SS': [ss_a, ss_b, ss_ab, sse_full],
+        'df': [n_a - 1, n_b - 1, df_ab, df_resid],
+    }, index=[name_a, name_b, f"{name_a}:{name_b}", "Residual"])
+    table['MS'] = table['SS'] / table['df']
+    ms_resid = table.loc['Residual', 'MS']
+    effects = table.index[:-1]
+    table.loc[effects, 'F'] = table.loc[effects, 'MS'] / ms_resid
+    table.loc[effects, 'P-value'] = distributions.sf("f", table.loc[effects, 'F'].to_numpy(dtype=float),
+                                                     table.loc[effects, 'df'].to_numpy(dtype=float), df_resid)
+    table.loc[effects, 'F crit'] = distributions.isf("f", alpha, table.loc[effects, 'df'].to_numpy(dtype=float), df_resid)
+    return table
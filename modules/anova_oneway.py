@@ -1,37 +1,21 @@
-import streamlit as st
-import numpy as np
 import pandas as pd
-from scipy.stats import f
+import streamlit as st
 import matplotlib.pyplot as plt
 import seaborn as sns
+from modules import anova_engine, permutation
 
 def run_anova_oneway(df, group_col, value_col):
     st.header("📘 One-Way ANOVA")
 
     try:
-        groups = df[group_col].unique()
-        group_data = [
-            df[df[group_col] == g][value_col].dropna()
-            for g in groups
-        ]
-        all_data = pd.concat(group_data)
-
-        k = len(groups)
-        n = len(all_data)
-        grand_mean = np.mean(all_data)
+        # Estadísticos suficientes por grupo (n, media, M2), compartidos con Tukey y los gráficos
+        gs = anova_engine.cached_group_stats(df, group_col, value_col)
+        result = anova_engine.oneway_anova(gs)
 
-        ssb = sum(len(g) * (np.mean(g) - grand_mean) ** 2 for g in group_data)
-        ssw = sum(sum((x - np.mean(g)) ** 2 for x in g) for g in group_data)
-        sst = ssb + ssw
-
-        msb = ssb / (k - 1)
-        msw = ssw / (n - k)
-        mst = sst / (n - 1)
-        f_stat = msb / msw
-
-        alpha = 0.05
-        f_crit = f.ppf(1 - alpha, dfn=k - 1, dfd=n - k)
-        p_value = 1 - f.cdf(f_stat, dfn=k - 1, dfd=n - k)
+        grand_mean = result.grand_mean
+        sst, ssb, ssw = result.sst, result.ssb, result.ssw
+        msb, msw, mst = result.msb, result.msw, result.mst
+        f_stat, f_crit, p_value = result.f_stat, result.f_crit, result.p_value
 
         # Mostrar resultados
         st.subheader("📋 ANOVA Summary")
@@ -62,9 +46,7 @@ def run_anova_oneway(df, group_col, value_col):
         axs[0].set_ylabel(value_col)
 
         # Medias ± error estándar
-        means = df.groupby(group_col)[value_col].mean()
-        sems = df.groupby(group_col)[value_col].sem()
-        axs[1].bar(means.index, means.values, yerr=sems.values, capsize=10, color='lightblue')
+        axs[1].bar(gs.labels.astype(str), gs.mean, yerr=gs.sem, capsize=10, color='lightblue')
         axs[1].set_title("Group Means ± SE")
         axs[1].set_xlabel(group_col)
         axs[1].set_ylabel("Mean")
@@ -72,5 +54,13 @@ def run_anova_oneway(df, group_col, value_col):
         plt.tight_layout()
         st.pyplot(fig)
 
+        # Los códigos de grupo solo se calculan al ejecutar; la clave es la misma que la de los estadísticos por grupo
+        permutation.show_permutation_test(
+            lambda n, seed, stop: permutation.anova_test(df[value_col].to_numpy(dtype=float),
+                                                         pd.factorize(df[group_col])[0], n_permutations=n,
+                                                         seed=seed, stop_early=stop),
+            anova_engine.grouping_key(df, group_col, value_col), (group_col, value_col), "anova"
+        )
+
     except Exception as e:
         st.error(f"🚫 Error running One-Way ANOVA: {e}")
@@ -2,41 +2,31 @@ import streamlit as st
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
-import statsmodels.api as sm
-from statsmodels.formula.api import ols
-from scipy.stats import f
+from modules import anova_engine
 
 def run_anova_twoway(df, factor1, factor2, value_col):
     st.header("📘 Two-Way ANOVA")
 
     try:
         st.subheader(f"Two-Way ANOVA: {value_col} by {factor1} and {factor2}")
-        formula = f'{value_col} ~ C({factor1}) + C({factor2}) + C({factor1}):C({factor2})'
-        model = ols(formula, data=df).fit()
-        aov = sm.stats.anova_lm(model, typ=2)
+        # Estadísticos por celda (n, media, M2): memoria proporcional al número de celdas, no de filas
+        cells = anova_engine.cell_stats(df[factor1], df[factor2], df[value_col])
+        aov = anova_engine.twoway_anova(cells, names=(factor1, factor2))
 
         alpha = 0.05
-        df_within = aov.iloc[-1]['df']
         summary_rows = []
 
-        for effect in [f'C({factor1})', f'C({factor2})', f'C({factor1}):C({factor2})']:
-            if effect in aov.index:
-                row = aov.loc[effect]
-                df_effect = row['df']
-                ms = row['sum_sq'] / row['df']
-                fval = row['F']
-                pval = row['PR(>F)']
-                fcrit = f.ppf(1 - alpha, dfn=df_effect, dfd=df_within)
-                decision = "Reject H₀" if pval < alpha else "Fail to reject H₀"
-                summary_rows.append([
-                    effect, row['sum_sq'], df_effect, ms, fval, pval, fcrit, decision
-                ])
+        for effect in aov.index[:-1]:
+            row = aov.loc[effect]
+            decision = "Reject H₀" if row['P-value'] < alpha else "Fail to reject H₀"
+            summary_rows.append([
+                effect, row['SS'], row['df'], row['MS'], row['F'], row['P-value'], row['F crit'], decision
+            ])
 
         # Residual
         residual = aov.loc['Residual']
-        ms_residual = residual['sum_sq'] / residual['df']
         summary_rows.append([
-            'Residual', residual['sum_sq'], residual['df'], ms_residual, '', '', '', ''
+            'Residual', residual['SS'], residual['df'], residual['MS'], '', '', '', ''
         ])
 
         df_summary = pd.DataFrame(summary_rows, columns=[
@@ -55,8 +45,9 @@ def run_anova_twoway(df, factor1, factor2, value_col):
         axs[0].set_xlabel(factor1)
         axs[0].set_ylabel(value_col)
 
-        interaction_means = df.groupby([factor1, factor2])[value_col].mean().unstack()
-        interaction_sems = df.groupby([factor1, factor2])[value_col].sem().unstack()
+        interaction_means = pd.DataFrame(cells.mean, index=pd.Index(cells.levels_a, name=factor1),
+                                         columns=pd.Index(cells.levels_b, name=factor2))
+        interaction_sems = pd.DataFrame(cells.sem, index=interaction_means.index, columns=interaction_means.columns)
         interaction_means.plot(kind='bar', yerr=interaction_sems, ax=axs[1], capsize=4, colormap='Set2')
         axs[1].set_xticklabels(interaction_means.index, rotation=0)
         axs[1].set_title("Means ± SE by Group Interaction")
@@ -0,0 +1,158 @@
+"""Many t/z tests at once from per-column (and per-segment) moments.
+
+``column_moments`` makes one pass over the selected columns in row blocks:
+a sparse segment-indicator matrix multiplies the shifted values, their
+squares and the non-missing mask, giving n / mean / M2 for every
+(segment, column) cell. All statistics, p-values and the multiple-testing
+adjustment are then vectorized over the whole table.
+"""
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from modules import distributions, multiple_testing
+
+# Filas por bloque: memoria O(bloque × métricas) aunque haya miles de columnas
+CHUNK_ROWS = 50_000
+TESTS = {
+    "t_welch": "Welch t (unequal variances)",
+    "t_student": "Student t (pooled variance)",
+    "z": "z (large-sample)",
+}
+
+
+@dataclass(frozen=True)
+class ColumnMoments:
+    """n / mean / M2 with one row per segment and one column per metric (k × m arrays)."""
+    segments: np.ndarray
+    columns: list
+    count: np.ndarray
+    mean: np.ndarray
+    m2: np.ndarray
+
+    def rest(self):
+        """Moments of everything outside each segment (total minus segment, Chan's formula)."""
+        n_total = self.count.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_total = np.nansum(self.count * self.mean, axis=0) / n_total
+            count = n_total - self.count
+            mean = (n_total * mean_total - np.nan_to_num(self.count * self.mean)) / count
+            m2_total = np.nansum(self.m2 + self.count * (self.mean - mean_total) ** 2, axis=0)
+            m2 = m2_total - np.nan_to_num(self.m2) - np.nan_to_num(self.count * (self.mean - mean_total) ** 2) \
+                - count * (mean - mean_total) ** 2
+        return ColumnMoments(self.segments, self.columns, count, mean, np.maximum(m2, 0.0))
+
+    def select(self, segment):
+        i = int(np.flatnonzero(self.segments == segment)[0])
+        return ColumnMoments(self.segments[[i]], self.columns, self.count[[i]], self.mean[[i]], self.m2[[i]])
+
+    @property
+    def variance(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.m2 / (self.count - 1)
+
+
+def column_moments(df, columns, group=None):
+    """Moments of ``columns`` overall (one segment) or per level of ``group`` (sorted, missing dropped)."""
+    columns = list(columns)
+    if group is None:
+        codes, segments = np.zeros(len(df), dtype=np.int64), np.array(["All rows"], dtype=object)
+    else:
+        codes, segments = pd.factorize(df[group], sort=True)
+        segments = np.asarray(segments)
+    k, m = len(segments), len(columns)
+    count, s1, s2 = np.zeros((k, m)), np.zeros((k, m)), np.zeros((k, m))
+    shift = None
+    frame = df[columns]
+    for start in range(0, len(df), CHUNK_ROWS):
+        values = frame.iloc[start:start + CHUNK_ROWS].to_numpy(dtype=np.float64, na_value=np.nan)
+        chunk_codes = codes[start:start + CHUNK_ROWS]
+        keep = chunk_codes >= 0
+        values, chunk_codes = values[keep], chunk_codes[keep]
+        valid = ~np.isnan(values)
+        if shift is None:
+            # Desplazamiento por la media del primer bloque: las sumas de cuadrados no pierden precisión
+            with np.errstate(invalid="ignore", divide="ignore"):
+                shift = np.nan_to_num(np.nansum(values, axis=0) / valid.sum(axis=0))
+        z = np.where(valid, values - shift, 0.0)
+        indicator = sparse.csr_matrix((np.ones(len(chunk_codes)), (chunk_codes, np.arange(len(chunk_codes)))),
+                                      shape=(k, len(chunk_codes)))
+        count += indicator @ valid.astype(np.float64)
+        s1 += indicator @ z
+        s2 += indicator @ (z * z)
+    if shift is None:
+        shift = np.zeros(m)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = shift + s1 / count
+        m2 = np.maximum(s2 - s1 * s1 / count, 0.0)
+    return ColumnMoments(segments, columns, count, mean, m2)
+
+
+def two_sample(a, b, test="t_welch"):
+    """Statistic, df and two-sided p-value of mean(a) - mean(b) for every cell of two ``ColumnMoments``."""
+    va, vb = a.variance, b.variance
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if test == "t_student":
+            df = a.count + b.count - 2
+            pooled = (a.m2 + b.m2) / df
+            se = np.sqrt(pooled * (1 / a.count + 1 / b.count))
+        else:
+            qa, qb = va / a.count, vb / b.count
+            se = np.sqrt(qa + qb)
+            df = (qa + qb) ** 2 / (qa ** 2 / (a.count - 1) + qb ** 2 / (b.count - 1))
+        stat = (a.mean - b.mean) / se
+    if test == "z":
+        return stat, np.full(stat.shape, np.nan), distributions.p_value("norm", stat)
+    return stat, df, distributions.p_value("t", stat, df)
+
+
+def one_sample(moments, mu0=0.0, test="t", sigma=None):
+    """One-sample t (or z with known ``sigma``, else the sample SD) of every cell against ``mu0``."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sd = np.sqrt(moments.variance) if sigma is None else sigma
+        stat = (moments.mean - mu0) / (sd / np.sqrt(moments.count))
+        df = moments.count - 1
+    if test == "z":
+        return stat, np.full(stat.shape, np.nan), distributions.p_value("norm", stat)
+    return stat, df, distributions.p_value("t", stat, df)
+
+
+def _table(frame, p, alpha, adjust):
+    frame['p-value'] = p.ravel()
+    frame['p-adj'] = multiple_testing.adjust_pvalues(frame['p-value'].to_numpy(), adjust)
+    frame['reject'] = frame['p-adj'] < alpha
+    return frame.sort_values('p-adj', kind='stable', na_position='last').reset_index(drop=True)
+
+
+def batch_one_sample(df, columns, mu0=0.0, test="t", sigma=None, alpha=0.05, adjust="fdr_bh", group=None):
+    """Every metric (per segment, if ``group``) against ``mu0``; one results table sorted by p-adj."""
+    m = column_moments(df, columns, group)
+    stat, dof, p = one_sample(m, mu0, test, sigma)
+    frame = pd.DataFrame({
+        'Segment': np.repeat(m.segments, len(m.columns)), 'Metric': np.tile(m.columns, len(m.segments)),
+        'n': m.count.ravel(), 'Mean': m.mean.ravel(), 'Std': np.sqrt(m.variance).ravel(),
+        'Statistic': stat.ravel(), 'df': dof.ravel(),
+    })
+    if group is None:
+        frame = frame.drop(columns='Segment')
+    return _table(frame, p, alpha, adjust)
+
+
+def batch_segments(df, columns, group, test="t_welch", alpha=0.05, adjust="fdr_bh", versus=None):
+    """Each segment of ``group`` against the rest (or, with ``versus=(a, b)``, segment a vs b) for every metric."""
+    m = column_moments(df, columns, group)
+    if versus is None:
+        a, b = m, m.rest()
+        labels_a, labels_b = m.segments, np.full(len(m.segments), "Rest", dtype=object)
+    else:
+        a, b = (m.select(level) for level in versus)
+        labels_a, labels_b = a.segments, b.segments
+    stat, dof, p = two_sample(a, b, test)
+    k = len(labels_a)
+    frame = pd.DataFrame({
+        'Segment': np.repeat(labels_a, len(m.columns)), 'Versus': np.repeat(labels_b, len(m.columns)),
+        'Metric': np.tile(m.columns, k),
+        'n1': a.count.ravel(), 'Mean 1': a.mean.ravel(), 'n2': b.count.ravel(), 'Mean 2': b.mean.ravel(),
+        'Difference': (a.mean - b.mean).ravel(), 'Statistic': stat.ravel(), 'df': dof.ravel(),
+    })
+    return _table(frame, p, alpha, adjust)
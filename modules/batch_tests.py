@@ -0,0 +1,90 @@
+import streamlit as st
+from modules import batch_engine, model_cache, multiple_testing
+
+MODES = [
+    "Each metric vs μ₀ (one-sample)",
+    "Each segment vs the rest",
+    "Segment A vs Segment B",
+]
+
+
+def run_batch_tests(df, numeric_cols, categorical_cols):
+    st.header("📘 Batch T/Z Tests: Many Metrics or Segments")
+
+    if not numeric_cols:
+        st.warning("⚠️ You need at least one numeric column.")
+        return
+
+    mode = st.radio("🧭 What to test:", MODES, key="batch_mode")
+    metrics = st.multiselect("🔢 Metrics (numeric columns):", numeric_cols, default=numeric_cols, key="batch_metrics")
+
+    group, versus, mu0, sigma = None, None, 0.0, None
+    if mode == MODES[0]:
+        test = st.radio("🧪 Test:", ["t", "z"], format_func=lambda t: {"t": "One-sample t", "z": "One-sample z"}[t],
+                        horizontal=True, key="batch_one_test")
+        mu0 = st.number_input("📏 Hypothesized mean (μ₀):", value=0.0, step=0.1, key="batch_mu0")
+        if test == "z" and st.checkbox("Known population σ (otherwise the sample SD is used)", key="batch_known_sigma"):
+            sigma = st.number_input("📐 Population standard deviation (σ):", value=1.0, min_value=1e-12, key="batch_sigma")
+        if categorical_cols and st.checkbox("Test separately within each segment", key="batch_by_segment"):
+            group = st.selectbox("🔠 Segment column:", categorical_cols, key="batch_group_one")
+    else:
+        if not categorical_cols:
+            st.warning("⚠️ You need a categorical column to define segments.")
+            return
+        group = st.selectbox("🔠 Segment column:", categorical_cols, key="batch_group")
+        test = st.radio("🧪 Test:", list(batch_engine.TESTS), format_func=batch_engine.TESTS.get,
+                        horizontal=True, key="batch_two_test")
+        if mode == MODES[2]:
+            levels = sorted(df[group].dropna().unique().tolist(), key=str)
+            if len(levels) < 2:
+                st.warning("⚠️ The segment column needs at least two levels.")
+                return
+            col1, col2 = st.columns(2)
+            with col1:
+                level_a = st.selectbox("Segment A:", levels, index=0, key="batch_level_a")
+            with col2:
+                level_b = st.selectbox("Segment B:", levels, index=1, key="batch_level_b")
+            versus = (level_a, level_b)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        adjust = st.selectbox("🧮 Multiple-testing correction:", list(multiple_testing.ADJUSTMENTS),
+                              format_func=multiple_testing.ADJUSTMENTS.get, index=1, key="batch_adjust")
+    with col2:
+        alpha = st.number_input("⚠️ Significance level (alpha):", value=0.05, step=0.01, key="batch_alpha")
+
+    if not metrics:
+        return
+    spec = (mode, tuple(metrics), group, versus, test, mu0, sigma, adjust, alpha)
+    if st.button("📊 Run Batch Tests"):
+        st.session_state["batch_run"] = spec
+    if st.session_state.get("batch_run") != spec:
+        return
+
+    def compute():
+        if mode == MODES[0]:
+            return batch_engine.batch_one_sample(df, metrics, mu0, test, sigma, alpha, adjust, group=group)
+        return batch_engine.batch_segments(df, metrics, group, test, alpha, adjust, versus=versus)
+
+    try:
+        with st.spinner("Computing moments in one pass..."):
+            fingerprint = model_cache.frame_fingerprint(df, metrics + ([group] if group else []))
+            results = model_cache.cached_model("batch_tests", fingerprint, spec, compute)
+    except Exception as e:
+        st.error(f"🚫 Error running batch tests: {e}")
+        return
+
+    n_significant = int(results['reject'].sum())
+    st.subheader("📋 Results")
+    st.write(f"**Tests:** {len(results)} — **Significant after {multiple_testing.ADJUSTMENTS[adjust]} "
+             f"(α={alpha}):** {n_significant}")
+    only_significant = st.checkbox("Show only significant tests", value=False, key="batch_significant")
+    view = results[results['reject']] if only_significant else results
+    st.dataframe(view)
+    st.download_button(
+        label="📥 Download all results (CSV)",
+        data=lambda: results.to_csv(index=False).encode("utf-8"),
+        file_name="batch_tests.csv",
+        mime="text/csv",
+        key="batch_csv"
+    )
@@ -1,7 +1,7 @@
 import streamlit as st
-from scipy.stats import binom
 import matplotlib.pyplot as plt
 import numpy as np
+from modules import distributions
 
 def run():
     st.header("🎯 Binomial Distribution Calculator")
@@ -19,18 +19,18 @@ def run():
     ])
 
     if calc_type == "P(X = x)":
-        prob = binom.pmf(x, n, p)
+        prob = distributions.pmf("binom", x, n, p)
     elif calc_type == "P(X ≤ x)":
-        prob = binom.cdf(x, n, p)
+        prob = distributions.cdf("binom", x, n, p)
     else:
-        prob = 1 - binom.cdf(x - 1, n, p)
+        prob = distributions.sf("binom", x - 1, n, p)
 
     st.markdown("### 📊 Result")
     st.write(f"**{calc_type} = {prob:.4f}**")
 
     st.markdown("### 📈 Binomial Distribution Plot")
     x_vals = np.arange(0, n+1)
-    y_vals = binom.pmf(x_vals, n, p)
+    y_vals = distributions.pmf("binom", x_vals, n, p)
 
     fig, ax = plt.subplots(figsize=(15, 5))
     bars = ax.bar(x_vals, y_vals, color="lightblue", edgecolor="black")
@@ -0,0 +1,322 @@
+"""Bootstrap confidence intervals (percentile, BCa, studentized) for one sample.
+
+The data are sorted once and cut into blocks of ``BLOCK_ROWS`` values. A
+bootstrap resample of size n is drawn in two stages that give exactly the
+same distribution as n uniform row indices: a multinomial split of the n
+draws across blocks, then uniform ``uint16`` offsets inside each block. The
+gathers stay in cache, and because the data are sorted the median of a
+resample only needs a partition of the draws in the block that holds the
+middle rank. Each replicate is reduced to power sums (mean, variance, CV and
+the standard errors for bootstrap-t come from them) plus the median when
+asked for. Data with few distinct values (0/1 proportions, small integer
+scales) are resampled as multinomial counts over the distinct values.
+
+Replicates are drawn in tasks with their own SeedSequence child, spread over
+``parallel.run_tasks``; results do not depend on the number of workers.
+"""
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from modules import distributions, parallel
+
+BLOCK_ROWS = 1 << 16
+# Valores extraídos por lote dentro de una tarea: acota la memoria (uint16 + float64)
+BATCH_CELLS = 1 << 22
+TASK_REPLICATES = 250
+# Filas × réplicas a partir de las cuales compensa abrir el pool
+PARALLEL_MIN_WORK = 50_000_000
+# Con tan pocos valores distintos (respecto a n) se remuestrean conteos multinomiales
+COUNTS_RATIO = 16
+
+STATISTICS = {
+    "mean": "Mean",
+    "median": "Median",
+    "var": "Variance",
+    "cv": "Coefficient of variation",
+    "proportion": "Proportion",
+}
+METHODS = {
+    "percentile": "Percentile",
+    "bca": "BCa (bias-corrected and accelerated)",
+    "studentized": "Studentized (bootstrap-t)",
+}
+# Estadísticos con error estándar analítico por réplica (necesario para bootstrap-t)
+STUDENTIZED = {"mean", "var", "cv", "proportion"}
+
+
+def _central_moments(s1, s2, s3, s4, n):
+    """Mean offset and central moments m2..m4 (divisor n) from power sums of centred values."""
+    a = s1 / n
+    m2 = np.maximum(s2 / n - a * a, 0.0)
+    m3 = s3 / n - 3 * a * s2 / n + 2 * a ** 3
+    m4 = s4 / n - 4 * a * s3 / n + 6 * a * a * s2 / n - 3 * a ** 4
+    return a, m2, m3, m4
+
+
+def _estimates(statistic, sums, median, n, center):
+    """Estimate and standard error of ``statistic`` for each replicate (NaN SE where sums are missing)."""
+    if statistic == "median":
+        return median, np.full(np.shape(median), np.nan)
+    s1, s2, s3, s4 = sums
+    mean = center + s1 / n
+    if statistic == "proportion":
+        return mean, np.sqrt(np.clip(mean * (1 - mean), 0.0, None) / n)
+    if s2 is None:
+        return mean, np.full(np.shape(mean), np.nan)
+    a = s1 / n
+    var = np.maximum(s2 / n - a * a, 0.0) * n / (n - 1)
+    if statistic == "mean":
+        return mean, np.sqrt(var / n)
+    if s4 is None:
+        se_var = np.full(np.shape(var), np.nan)
+        return (var, se_var) if statistic == "var" else (np.sqrt(var) / mean, se_var)
+    _, _, m3, m4 = _central_moments(s1, s2, s3, s4, n)
+    # Var(s²) ≈ (μ₄ − σ⁴(n−3)/(n−1)) / n ; Cov(x̄, s²) ≈ μ₃ / n
+    var_of_var = np.maximum(m4 - var * var * (n - 3) / (n - 1), 0.0) / n
+    if statistic == "var":
+        return var, np.sqrt(var_of_var)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sd = np.sqrt(var)
+        d_mean, d_var = -sd / mean ** 2, 1 / (2 * mean * sd)
+        se = np.sqrt(np.maximum(d_mean ** 2 * var / n + d_var ** 2 * var_of_var + 2 * d_mean * d_var * m3 / n, 0.0))
+        return sd / mean, se
+
+
+def _needs(statistics, studentized):
+    """Highest power sum needed and whether medians are needed."""
+    wanted = set(statistics)
+    power = 1 if wanted <= {"mean", "proportion", "median"} else 2
+    if studentized and "mean" in wanted:
+        power = max(power, 2)
+    if studentized and wanted & {"var", "cv"}:
+        power = 4
+    return power, "median" in wanted
+
+
+def _order_statistic(segment, k):
+    return np.partition(segment, k)[k]
+
+
+def _blocked_batch(values, rng, count, power, want_median):
+    """Power sums (count × 4, unused ones NaN) and medians of ``count`` resamples of sorted ``values``."""
+    n = len(values)
+    starts = np.arange(0, n, BLOCK_ROWS)
+    sizes = np.minimum(BLOCK_ROWS, n - starts)
+    per_block = rng.multinomial(n, sizes / n, size=count) if len(sizes) > 1 else np.full((count, 1), n)
+    sums = np.full((count, 4), np.nan)
+    sums[:, :power] = 0.0
+    ranks = np.unique([(n - 1) // 2, n // 2])
+    before = np.cumsum(per_block, axis=1) - per_block
+    middle = np.zeros((count, len(ranks)))
+    for j, (start, size) in enumerate(zip(starts, sizes)):
+        counts = per_block[:, j]
+        total = int(counts.sum())
+        if total == 0:
+            continue
+        offsets = rng.integers(0, size, total, dtype=np.uint16)
+        drawn = values[start:start + size][offsets]
+        owner = np.repeat(np.arange(count), counts) if not counts.all() else None
+        power_values = drawn
+        for p in range(power):
+            if p:
+                power_values = power_values * drawn
+            if owner is None:
+                sums[:, p] += np.add.reduceat(power_values, np.r_[0, np.cumsum(counts)[:-1]])
+            else:
+                sums[:, p] += np.bincount(owner, weights=power_values, minlength=count)
+        if want_median:
+            # Valores ordenados: el k-ésimo menor desplazamiento del bloque da el k-ésimo menor valor
+            bounds = np.r_[0, np.cumsum(counts)]
+            for r in range(count):
+                for i, rank in enumerate(ranks):
+                    k = rank - before[r, j]
+                    if 0 <= k < counts[r]:
+                        offset = _order_statistic(offsets[bounds[r]:bounds[r + 1]], k)
+                        middle[r, i] = values[start + offset]
+    return sums, middle.mean(axis=1) if want_median else None
+
+
+def _counts_batch(levels, frequencies, rng, count, power, want_median):
+    """Same as ``_blocked_batch`` for data given as sorted distinct ``levels`` and their frequencies."""
+    n = int(frequencies.sum())
+    counts = rng.multinomial(n, frequencies / n, size=count).astype(np.float64)
+    sums = np.full((count, 4), np.nan)
+    sums[:, :power] = counts @ np.column_stack([levels ** (p + 1) for p in range(power)])
+    if not want_median:
+        return sums, None
+    cumulative = np.cumsum(counts, axis=1)
+    lo = levels[np.argmax(cumulative > (n - 1) // 2, axis=1)]
+    hi = levels[np.argmax(cumulative > n // 2, axis=1)]
+    return sums, (lo + hi) / 2
+
+
+def _bootstrap_task(arrays, task):
+    kind, seed, count, power, want_median = task
+    rng = np.random.default_rng(seed)
+    if kind == "counts":
+        return _counts_batch(arrays["levels"], arrays["frequencies"], rng, count, power, want_median)
+    values = arrays["values"]
+    batch = max(1, BATCH_CELLS // len(values))
+    parts = [_blocked_batch(values, rng, min(batch, count - start), power, want_median)
+             for start in range(0, count, batch)]
+    sums = np.concatenate([part[0] for part in parts])
+    return sums, np.concatenate([part[1] for part in parts]) if want_median else None
+
+
+def _sorted_median(values):
+    n = len(values)
+    return (values[(n - 1) // 2] + values[n // 2]) / 2
+
+
+def _jackknife(statistic, values):
+    """Leave-one-out estimates for sorted, centred ``values`` (closed forms, O(n))."""
+    n = len(values)
+    if statistic == "median":
+        m = n // 2
+        ranks = np.arange(n)
+        if n % 2:
+            return np.where(ranks < m, (values[m] + values[m + 1]) / 2,
+                            np.where(ranks > m, (values[m - 1] + values[m]) / 2, (values[m - 1] + values[m + 1]) / 2))
+        return np.where(ranks <= m - 1, values[m], values[m - 1])
+    s1 = values.sum() - values
+    s2 = np.dot(values, values) - values * values
+    mean = s1 / (n - 1)
+    if statistic in ("mean", "proportion"):
+        return mean
+    var = np.maximum(s2 - s1 * s1 / (n - 1), 0.0) / (n - 2)
+    if statistic == "var":
+        return var
+    return np.sqrt(var), mean
+
+
+def _acceleration(statistic, values, center):
+    if len(values) < 3:
+        return 0.0
+    loo = _jackknife(statistic, values)
+    if statistic == "cv":
+        sd, mean = loo
+        with np.errstate(invalid="ignore", divide="ignore"):
+            loo = sd / (mean + center)
+    elif statistic in ("mean", "proportion", "median"):
+        loo = loo + center
+    if not np.all(np.isfinite(loo)):
+        # CV casi constante: algún leave-one-out tiene media 0 y la aceleración no está definida
+        return np.nan
+    d = loo.mean() - loo
+    denominator = 6 * np.sum(d * d) ** 1.5
+    return float(np.sum(d ** 3) / denominator) if denominator > 0 else 0.0
+
+
+@dataclass(frozen=True)
+class BootstrapResult:
+    statistics: tuple
+    n: int
+    n_boot: int
+    estimates: np.ndarray
+    standard_errors: np.ndarray
+    replicates: np.ndarray
+    pivots: np.ndarray
+    acceleration: np.ndarray
+
+    def _column(self, statistic):
+        return self.statistics.index(statistic)
+
+    def estimate(self, statistic):
+        return float(self.estimates[self._column(statistic)])
+
+    def bootstrap_se(self, statistic):
+        return float(np.nanstd(self.replicates[:, self._column(statistic)], ddof=1))
+
+    def interval(self, statistic, method="percentile", confidence=0.95):
+        """(lower, upper) bootstrap interval; NaNs when ``method`` is not available for ``statistic``."""
+        j = self._column(statistic)
+        theta = self.replicates[:, j]
+        theta = theta[np.isfinite(theta)]
+        alpha = 1 - confidence
+        estimate = self.estimates[j]
+        if len(theta) == 0:
+            return np.nan, np.nan
+        if method == "percentile":
+            return tuple(np.quantile(theta, [alpha / 2, 1 - alpha / 2]))
+        if method == "bca":
+            below = (np.sum(theta < estimate) + 0.5 * np.sum(theta == estimate)) / len(theta)
+            z0 = distributions.ppf("norm", float(np.clip(below, 1 / (len(theta) + 1), len(theta) / (len(theta) + 1))))
+            z = distributions.ppf("norm", np.array([alpha / 2, 1 - alpha / 2]))
+            a = self.acceleration[j]
+            if not np.isfinite(a):
+                return np.nan, np.nan
+            levels = distributions.cdf("norm", z0 + (z0 + z) / (1 - a * (z0 + z)))
+            return tuple(np.quantile(theta, np.clip(levels, 0.0, 1.0)))
+        pivots = self.pivots[:, j]
+        pivots = pivots[np.isfinite(pivots)]
+        se = self.standard_errors[j]
+        if statistic not in STUDENTIZED or len(pivots) == 0 or not np.isfinite(se):
+            return np.nan, np.nan
+        t_lo, t_hi = np.quantile(pivots, [alpha / 2, 1 - alpha / 2])
+        return estimate - t_hi * se, estimate - t_lo * se
+
+    def table(self, confidence=0.95):
+        """One row per statistic: estimate, bootstrap SE and the three intervals."""
+        rows = []
+        for statistic in self.statistics:
+            row = {"Statistic": STATISTICS[statistic], "Estimate": self.estimate(statistic),
+                   "Bootstrap SE": self.bootstrap_se(statistic)}
+            for method, label in METHODS.items():
+                low, high = self.interval(statistic, method, confidence)
+                row[f"{label.split(' (')[0]} low"], row[f"{label.split(' (')[0]} high"] = low, high
+            rows.append(row)
+        return pd.DataFrame(rows).set_index("Statistic")
+
+
+def bootstrap(data, statistics=("mean",), n_boot=2_000, seed=42, studentized=True, workers=None):
+    """Bootstrap ``n_boot`` resamples of ``data`` and return the replicate table for ``statistics``.
+
+    ``statistics`` are keys of ``STATISTICS``; "proportion" expects 0/1 data.
+    ``studentized=False`` skips the per-replicate standard errors (and the
+    third/fourth power sums they need for variance and CV).
+    """
+    values = np.asarray(data, dtype=np.float64)
+    values = np.sort(values[~np.isnan(values)])
+    n = len(values)
+    if n < 3:
+        raise ValueError("The bootstrap needs at least three observations.")
+    statistics = tuple(statistics)
+    unknown = [s for s in statistics if s not in STATISTICS]
+    if unknown:
+        raise ValueError(f"Unknown statistic(s): {', '.join(unknown)}.")
+    if "proportion" in statistics and not np.all((values == 0) | (values == 1)):
+        raise ValueError("Proportions need 0/1 data.")
+    power, want_median = _needs(statistics, studentized)
+
+    center = float(values.mean())
+    centred = values - center
+    levels, frequencies = np.unique(centred, return_counts=True)
+    if len(levels) * COUNTS_RATIO <= n:
+        kind, arrays = "counts", {"levels": levels, "frequencies": frequencies.astype(np.float64)}
+    else:
+        kind, arrays = "blocked", {"values": centred}
+
+    seeds = parallel.spawn_seeds(seed, -(-n_boot // TASK_REPLICATES))
+    tasks = [(kind, child, min(TASK_REPLICATES, n_boot - i * TASK_REPLICATES), power, want_median)
+             for i, child in enumerate(seeds)]
+    n_workers = parallel.worker_count(workers) if (len(levels) if kind == "counts" else n) * n_boot >= \
+        PARALLEL_MIN_WORK else 1
+    parts = parallel.run_tasks(_bootstrap_task, tasks, arrays, n_workers)
+    sums = np.concatenate([part[0] for part in parts])
+    medians = np.concatenate([part[1] for part in parts]) + center if want_median else None
+
+    full_sums = tuple(np.sum(centred ** (p + 1)) for p in range(4))
+    estimates, errors, replicates, pivots, acceleration = [], [], [], [], []
+    for statistic in statistics:
+        estimate, se = _estimates(statistic, full_sums, _sorted_median(values), n, center)
+        theta, theta_se = _estimates(statistic, tuple(sums[:, p] if p < power else None for p in range(4)),
+                                     medians, n, center)
+        estimates.append(float(estimate))
+        errors.append(float(se))
+        replicates.append(theta)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            pivots.append((theta - estimate) / theta_se if studentized and statistic in STUDENTIZED
+                          else np.full(n_boot, np.nan))
+        acceleration.append(_acceleration(statistic, centred, center))
+    return BootstrapResult(statistics, n, n_boot, np.array(estimates), np.array(errors),
+                           np.column_stack(replicates), np.column_stack(pivots), np.array(acceleration))
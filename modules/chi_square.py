@@ -1,8 +1,9 @@
 import pandas as pd
-from scipy.stats import chi2_contingency, chi2
+from scipy.stats import chi2_contingency
 import streamlit as st
 import matplotlib.pyplot as plt
 import seaborn as sns
+from modules import distributions, permutation, plot_cache
 
 plt.rcParams.update({
     'font.size': 8
@@ -40,7 +41,7 @@ def run_chi_square_test():
         # Ejecutar análisis solo si se presiona el botón
         if st.button("Run Chi-Square Test"):
             chi2_val, p, dof, expected = chi2_contingency(chi_data_numeric)
-            critical_val = chi2.ppf(1 - alpha, df=dof) 
+            critical_val = distributions.critical_value("chi2", alpha, dof, tail="upper")
 
             st.write(f"**Chi-Square Statistic:** {chi2_val:.4f}")
             st.write(f"**Degrees of Freedom:** {dof}")
@@ -106,5 +107,12 @@ def run_chi_square_test():
 
             st.pyplot(fig_diff, use_container_width=False)  
 
+        # χ² por permutación: válido también con frecuencias esperadas pequeñas
+        permutation.show_permutation_test(
+            lambda n, seed, stop: permutation.chi2_test(chi_data_numeric.to_numpy(), n_permutations=n, alpha=alpha,
+                                                        seed=seed, stop_early=stop),
+            plot_cache.data_fingerprint(chi_data_numeric), (), "chi_square", alpha=alpha
+        )
+
     except Exception as e:
         st.error(f"⚠️ Error processing the Chi-Square test: {e}")
@@ -1,6 +1,60 @@
+import re
 import streamlit as st
-from scipy.stats import norm, t
 import numpy as np
+from modules import bootstrap_engine, distributions, model_cache, plot_cache
+
+SAMPLE_DATA = "12.1, 9.8, 11.4, 10.2, 13.7, 9.1, 10.9, 12.6, 8.7, 11.8, 10.4, 15.2, 9.9, 10.7, 11.1"
+
+
+def _parse_sample(text):
+    """Numbers separated by commas, semicolons, spaces or new lines."""
+    values = []
+    for token in re.split(r"[,;\s]+", text.strip()):
+        if not token:
+            continue
+        try:
+            values.append(float(token))
+        except ValueError:
+            raise ValueError(f"Could not read '{token}' (enter numbers separated by commas or spaces).")
+    return np.array(values)
+
+
+def _bootstrap_interval():
+    st.subheader("From Raw Data (Bootstrap)")
+    st.caption("Resamples the data with replacement; no normality assumption. "
+               "Percentile, BCa and studentized (bootstrap-t) intervals are shown side by side.")
+    text = st.text_area("Sample values", SAMPLE_DATA, key="ci_boot_data")
+    statistic = st.selectbox("Statistic", list(bootstrap_engine.STATISTICS),
+                             format_func=bootstrap_engine.STATISTICS.get, key="ci_boot_stat",
+                             help="Proportion expects 0/1 values (1 = success).")
+    col1, col2 = st.columns(2)
+    with col1:
+        n_boot = int(st.number_input("Bootstrap resamples (B)", min_value=200, max_value=100_000, value=5_000,
+                                     step=1_000, key="ci_boot_n"))
+    with col2:
+        seed = int(st.number_input("Seed", value=42, step=1, key="ci_boot_seed"))
+    conf_level = st.slider("Confidence Level", 0.80, 0.99, 0.95, key="ci_boot_conf")
+
+    try:
+        values = _parse_sample(text)
+        result = model_cache.cached_model(
+            "bootstrap", plot_cache.data_fingerprint(values), ((statistic,), n_boot, seed),
+            lambda: bootstrap_engine.bootstrap(values, (statistic,), n_boot=n_boot, seed=seed)
+        )
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        return
+
+    st.markdown("### 📊 Results")
+    st.write(f"Sample Size (n): **{result.n}**")
+    st.write(f"{bootstrap_engine.STATISTICS[statistic]}: **{result.estimate(statistic):.4f}**")
+    st.write(f"Bootstrap Standard Error: **{result.bootstrap_se(statistic):.4f}**")
+    for method, label in bootstrap_engine.METHODS.items():
+        lower, upper = result.interval(statistic, method, conf_level)
+        if np.isfinite(lower) and np.isfinite(upper):
+            st.write(f"**{label}:** ({lower:.4f}, {upper:.4f})")
+        else:
+            st.write(f"**{label}:** not available for this statistic")
 
 def run():
     st.header("📏 Confidence Interval Calculator")
@@ -9,7 +63,8 @@ def run():
     ic_type = st.radio("Interval Type", [
         "Mean (σ known)",
         "Mean (σ unknown)",
-        "Proportion"
+        "Proportion",
+        "Raw data (bootstrap)"
     ])
 
     if ic_type == "Mean (σ known)":
@@ -20,7 +75,7 @@ def run():
         conf_level = st.slider("Confidence Level", 0.80, 0.99, 0.90)
 
         alpha = 1 - conf_level
-        z_crit = norm.ppf(1 - alpha / 2)
+        z_crit = distributions.critical_value("norm", alpha)
         se = sigma / np.sqrt(n)
         me = z_crit * se
         lower, upper = x_bar - me, x_bar + me
@@ -40,7 +95,7 @@ def run():
 
         alpha = 1 - conf_level
         df = n - 1
-        t_crit = t.ppf(1 - alpha / 2, df)
+        t_crit = distributions.critical_value("t", alpha, df)
         se = s / np.sqrt(n)
         me = t_crit * se
         lower, upper = x_bar - me, x_bar + me
@@ -52,7 +107,7 @@ def run():
         st.write(f"Margin of Error: **{me:.4f}**")
         st.write(f"**Confidence Interval:** ({lower:.4f}, {upper:.4f})")
 
-    else:
+    elif ic_type == "Proportion":
         st.subheader("For Proportions")
         x = st.number_input("Number of Successes (x)", min_value=0, value=176)
         n = st.number_input("Sample Size (n)", min_value=1, value=225)
@@ -60,7 +115,7 @@ def run():
 
         alpha = 1 - conf_level
         p_hat = x / n
-        z_crit = norm.ppf(1 - alpha / 2)
+        z_crit = distributions.critical_value("norm", alpha)
         se = np.sqrt(p_hat * (1 - p_hat) / n)
         me = z_crit * se
         lower, upper = p_hat - me, p_hat + me
@@ -71,3 +126,6 @@ def run():
         st.write(f"Standard Error: **{se:.4f}**")
         st.write(f"Margin of Error: **{me:.4f}**")
         st.write(f"**Confidence Interval:** ({lower:.4f}, {upper:.4f})")
+
+    else:
+        _bootstrap_interval()
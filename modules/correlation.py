@@ -4,6 +4,7 @@ import seaborn as sns
 import pandas as pd
 from scipy.stats import pearsonr, spearmanr, kendalltau, pointbiserialr, chi2_contingency
 import numpy as np
+from modules import correlation_engine, plot_cache, plot_rendering
 
 def run_correlation(df, col1, col2, method='Pearson'):
     st.write(f"### 📈 {method} Correlation Analysis")
@@ -61,39 +62,64 @@ def run_correlation(df, col1, col2, method='Pearson'):
         st.write("### 🔍 Scatter Plot with Regression Line")
         col1_plot, col2_plot = st.columns([2, 1])
         with col1_plot:
-            fig, ax = plt.subplots(figsize=(4, 3))
-            sns.regplot(x=x, y=y, ax=ax, line_kws={'color': 'red'})
-            ax.set_title(f"{col1} vs {col2}", fontsize=8)
-            ax.set_xlabel(col1, fontsize=6)
-            ax.set_ylabel(col2, fontsize=6)
-            ax.tick_params(axis='both', labelsize=5)
+            def draw():
+                fig, ax = plt.subplots(figsize=(4, 3))
+                plot_rendering.scatter_with_fit(ax, x, y)
+                ax.set_title(f"{col1} vs {col2}", fontsize=8)
+                ax.set_xlabel(col1, fontsize=6)
+                ax.set_ylabel(col2, fontsize=6)
+                ax.tick_params(axis='both', labelsize=5)
+                return fig
+
+            png = plot_cache.cached_plot("correlation_scatter", plot_cache.data_fingerprint(x, y), (col1, col2), draw)
             col1_sp, col2_sp, col3_sp = st.columns([1, 2, 1])
             with col2_sp:
-                st.pyplot(fig)
+                plot_cache.show_plot(png)
+
+@st.cache_data(max_entries=8, show_spinner="🧮 Computing correlation matrices...")
+def _correlation_results(fingerprint, _num_cols):
+    return correlation_engine.correlation_matrices(_num_cols)
 
 def show_correlation_matrix(df):
     st.write("### 🧮 Correlation Matrices")
     num_cols = df.select_dtypes(include=[np.number])
+    # Las tres matrices salen de una sola pasada (rangos calculados una vez)
+    results = _correlation_results(plot_cache.data_fingerprint(num_cols), num_cols)
 
-    for method in ['pearson', 'spearman', 'kendall']:
+    low_n = results['pearson'].low_n_pairs()
+    if not low_n.empty:
+        st.warning(f"⚠️ {len(low_n)} pair(s) have fewer than {correlation_engine.MIN_PAIR_N} complete observations; "
+                   "their coefficients and p-values are unreliable.")
+        st.dataframe(low_n)
+    if num_cols.isna().to_numpy().any():
+        with st.expander("🔢 Pairwise complete observations (n)"):
+            st.dataframe(results['pearson'].n.astype(int))
+
+    for method in correlation_engine.METHODS:
         st.write(f"#### {method.title()} Correlation Matrix")
-        corr_matrix = num_cols.corr(method=method)
+        corr_matrix = results[method].r
         st.dataframe(corr_matrix.style.background_gradient(cmap='coolwarm', axis=None))
+        with st.expander(f"📄 {method.title()} p-values"):
+            st.dataframe(results[method].p.style.format("{:.4g}"))
         col1_plot, col2_plot = st.columns([2, 1])
         with col1_plot:
-            fig, ax = plt.subplots(figsize=(4, 3))
-            sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', fmt=".2f", linewidths=0.5,
-                        cbar_kws={"shrink": 0.6})
-            ax.set_title(f"{method.title()} Correlation Heatmap", fontsize=8)
-            ax.tick_params(axis='both', labelsize=5)
+            def draw():
+                fig, ax = plt.subplots(figsize=(4, 3))
+                sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', fmt=".2f", linewidths=0.5,
+                            cbar_kws={"shrink": 0.6})
+                ax.set_title(f"{method.title()} Correlation Heatmap", fontsize=8)
+                ax.tick_params(axis='both', labelsize=5)
+                return fig
+
+            png = plot_cache.cached_plot("correlation_heatmap", plot_cache.data_fingerprint(corr_matrix), (method,), draw)
             col1_m, col2_m, col3_m = st.columns([1, 2, 1])
             with col2_m:
-                st.pyplot(fig)
+                plot_cache.show_plot(png)
 
 def correlation_selector(df):
     st.subheader("Correlation Tool")
-    num_cols = df.select_dtypes(include=['float64', 'int64']).columns.tolist()
-    bin_cols = df.select_dtypes(include=['int64', 'object', 'bool']).nunique()
+    num_cols = df.select_dtypes(include='number').columns.tolist()
+    bin_cols = df.select_dtypes(include=['integer', 'object', 'bool', 'category']).nunique()
     bin_cols = bin_cols[bin_cols == 2].index.tolist()
     all_cols = list(set(num_cols + bin_cols))
 
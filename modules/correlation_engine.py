@@ -0,0 +1,219 @@
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from scipy import stats
+from modules import distributions, parallel
+
+METHODS = ("pearson", "spearman", "kendall")
+
+# Trabajo mínimo (filas × pares) para que compense abrir el pool de procesos
+KENDALL_PARALLEL_MIN_WORK = 20_000_000
+# Pares con menos observaciones comunes se señalan como poco fiables
+MIN_PAIR_N = 10
+
+
+@dataclass(frozen=True)
+class CorrelationResult:
+    method: str
+    r: pd.DataFrame
+    p: pd.DataFrame
+    n: pd.DataFrame
+
+    def low_n_pairs(self, min_n=MIN_PAIR_N):
+        """Pairs (upper triangle) whose pairwise-complete n is below ``min_n``."""
+        n = self.n.to_numpy()
+        i, j = np.triu_indices(len(n), k=1)
+        keep = n[i, j] < min_n
+        i, j = i[keep], j[keep]
+        return pd.DataFrame({
+            'Variable 1': self.n.index[i], 'Variable 2': self.n.columns[j],
+            'n': n[i, j].astype(np.int64), 'r': self.r.to_numpy()[i, j],
+        })
+
+
+def _pearson_blas(arr):
+    """Pearson matrix of complete columns as one matrix product on standardized data."""
+    centered = arr - arr.mean(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = centered / np.sqrt((centered * centered).sum(axis=0))
+        r = z.T @ z
+    return np.clip(r, -1.0, 1.0)
+
+
+def masked_pearson(arr, finite):
+    """Pairwise-complete Pearson matrix without copying the data per pair.
+
+    With M the 0/1 validity matrix and X the data with NaN set to 0, every
+    pairwise-complete sum is a matrix product: n = MᵀM, Σx (over rows where
+    the partner is valid) = XᵀM, Σx² = (X²)ᵀM and Σxy = XᵀX.
+    """
+    mask = finite.astype(np.float64)
+    # Centrar cada columna antes reduce la cancelación en Σxy - ΣxΣy/n
+    with np.errstate(invalid="ignore"):
+        shift = np.nanmean(np.where(finite, arr, np.nan), axis=0)
+    x = np.where(finite, arr - np.nan_to_num(shift), 0.0)
+    n = mask.T @ mask
+    sx = x.T @ mask                  # sx[i, j] = Σ x_i sobre filas donde j es válida
+    sxx = (x * x).T @ mask
+    sxy = x.T @ x
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sx.T / n
+        var_i = sxx - sx * sx / n
+        r = cov / np.sqrt(var_i * var_i.T)
+    r[n < 2] = np.nan
+    return np.clip(r, -1.0, 1.0), n
+
+
+def t_test_pvalues(r, n):
+    """Two-sided p-values of H0: rho = 0 via t = r·sqrt((n-2)/(1-r²)) (Pearson and Spearman)."""
+    r = np.asarray(r, dtype=np.float64)
+    dof = np.asarray(n, dtype=np.float64) - 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = r * np.sqrt(dof / ((1.0 - r) * (1.0 + r)))
+        p = distributions.p_value("t", t, dof)
+    return np.where(dof > 0, p, np.nan)
+
+
+def _tie_bounds(sorted_values):
+    """First and last sorted position of each value's tie group (per column)."""
+    n = len(sorted_values)
+    pos = np.arange(n)[:, None]
+    starts = np.ones(sorted_values.shape, dtype=bool)
+    starts[1:] = sorted_values[1:] != sorted_values[:-1]
+    ends = np.ones(sorted_values.shape, dtype=bool)
+    ends[:-1] = starts[1:]
+    first = np.maximum.accumulate(np.where(starts, pos, 0), axis=0)
+    last = np.minimum.accumulate(np.where(ends, pos, n - 1)[::-1], axis=0)[::-1]
+    return first, last
+
+
+def _masked_ranks(mask_sorted, first, last):
+    """Average ranks restricted to the rows of ``mask_sorted`` (given in sorted order).
+
+    Within the mask a value ranks after every masked value of an earlier tie
+    group and takes the mean position of its own group, so one cumulative sum
+    of the mask gives the ranks of all columns at once.
+    """
+    counts = np.zeros((len(mask_sorted) + 1, mask_sorted.shape[1]), dtype=np.int32)
+    np.cumsum(mask_sorted, axis=0, out=counts[1:])
+    if first.ndim == 1:
+        # Todas las columnas comparten el mismo orden: basta indexar filas
+        below, upto = counts[first], counts[last + 1]
+    else:
+        below = np.take_along_axis(counts, first, axis=0)
+        upto = np.take_along_axis(counts, last + 1, axis=0)
+    return np.where(mask_sorted, below + (upto - below + 1) / 2, 0.0)
+
+
+def masked_spearman(arr, finite, complete):
+    """Pairwise-complete Spearman matrix without a per-pair Python loop.
+
+    With NaNs each pair is ranked over its own common rows. Each column is
+    sorted once; for column i the ranks of every partner j (and of i itself)
+    within the rows valid for both come from ``_masked_ranks`` and the
+    correlations from column sums, so the cost is O(n·p) per column.
+    Columns without NaNs share one matrix product on the global ranks.
+    """
+    n, p = arr.shape
+    r = np.full((p, p), np.nan)
+    if complete.any():
+        idx = np.flatnonzero(complete)
+        r[np.ix_(idx, idx)] = _pearson_blas(stats.rankdata(arr[:, idx], axis=0))
+    order = np.argsort(arr, axis=0, kind="stable")
+    first, last = _tie_bounds(np.take_along_axis(arr, order, axis=0))
+    for i in range(p):
+        js = np.array([j for j in range(i, p) if not (complete[i] and complete[j])], dtype=np.intp)
+        if not len(js):
+            continue
+        both = finite[:, [i]] & finite[:, js]
+        # Rangos de cada j sobre las filas comunes con i, devueltos al orden de filas
+        rj = np.empty((n, len(js)))
+        np.put_along_axis(rj, order[:, js], _masked_ranks(np.take_along_axis(both, order[:, js], axis=0),
+                                                          first[:, js], last[:, js]), axis=0)
+        # Rangos de i sobre las filas comunes con cada j (un solo orden, el de la columna i)
+        oi = order[:, i]
+        ri = np.empty((n, len(js)))
+        ri[oi] = _masked_ranks(both[oi], first[:, i], last[:, i])
+        m = both.sum(axis=0).astype(np.float64)
+        mean = (m + 1) / 2
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = (ri * rj).sum(axis=0) - m * mean * mean
+            var_i = (ri * ri).sum(axis=0) - m * mean * mean
+            var_j = (rj * rj).sum(axis=0) - m * mean * mean
+            values = np.where(m >= 2, cov / np.sqrt(var_i * var_j), np.nan)
+        r[i, js] = r[js, i] = np.clip(values, -1.0, 1.0)
+    return r
+
+
+def _kendall_task(arrays, pairs):
+    ranks, finite = arrays["ranks"], arrays["finite"]
+    out = []
+    for i, j in pairs:
+        mask = finite[:, i] & finite[:, j]
+        x, y = ranks[mask, i], ranks[mask, j]
+        if len(x) < 2:
+            out.append((np.nan, np.nan))
+            continue
+        # Knight O(n log n): scipy ordena y cuenta intercambios con un merge sort en C
+        res = stats.kendalltau(x, y)
+        out.append((res.statistic, res.pvalue))
+    return out
+
+
+def correlation_matrices(df, methods=METHODS, workers=None):
+    """Pearson/Spearman/Kendall r, p-value and pairwise-n matrices for numeric ``df``.
+
+    Columns are ranked once; Pearson and Spearman are matrix products on the
+    standardized (ranked) data and Kendall pairs reuse the shared ranks, spread
+    over a process pool when the work is large. Missing values are handled
+    pairwise (same semantics as ``DataFrame.corr``); Pearson does it with
+    masked matrix products (see ``masked_pearson``).
+    """
+    columns = df.columns
+    arr = df.to_numpy(dtype=np.float64, na_value=np.nan)
+    finite = ~np.isnan(arr)
+    complete = finite.all(axis=0)
+    p = arr.shape[1]
+
+    def frame(values):
+        return pd.DataFrame(values, index=columns, columns=columns)
+
+    if complete.all():
+        n_pairs = np.full((p, p), float(len(arr)))
+        pearson = _pearson_blas(arr) if "pearson" in methods else None
+    else:
+        pearson, n_pairs = masked_pearson(arr, finite)
+
+    results = {}
+    ranks = None
+    if "spearman" in methods or "kendall" in methods:
+        # Rangos promedio por columna, calculados una sola vez
+        ranks = stats.rankdata(arr, axis=0, nan_policy="omit")
+
+    if "pearson" in methods:
+        results["pearson"] = CorrelationResult("pearson", frame(pearson), frame(t_test_pvalues(pearson, n_pairs)),
+                                               frame(n_pairs))
+
+    if "spearman" in methods:
+        if complete.all():
+            r = _pearson_blas(ranks)
+        else:
+            # Con NaN los rangos dependen de las filas válidas de cada par: solo esos pares se recalculan
+            r = masked_spearman(arr, finite, complete)
+        results["spearman"] = CorrelationResult("spearman", frame(r), frame(t_test_pvalues(r, n_pairs)), frame(n_pairs))
+
+    if "kendall" in methods:
+        pairs = [(i, j) for i in range(p) for j in range(i + 1, p)]
+        use_pool = len(arr) * len(pairs) >= KENDALL_PARALLEL_MIN_WORK
+        n_workers = parallel.worker_count(workers) if use_pool else 1
+        chunks = [chunk.tolist() for chunk in np.array_split(np.array(pairs, dtype=np.int64).reshape(-1, 2),
+                                                            max(1, min(len(pairs), n_workers * 4)))]
+        parts = parallel.run_tasks(_kendall_task, chunks, {"ranks": ranks, "finite": finite}, n_workers)
+        tau = np.eye(p)
+        pval = np.zeros((p, p))
+        for (i, j), (t, pv) in zip(pairs, (item for part in parts for item in part)):
+            tau[i, j] = tau[j, i] = t
+            pval[i, j] = pval[j, i] = pv
+        results["kendall"] = CorrelationResult("kendall", frame(tau), frame(pval), frame(n_pairs))
+
+    return results
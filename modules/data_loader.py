@@ -0,0 +1,211 @@
+import hashlib
+import io
+import os
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Número máximo de archivos parseados que se mantienen en memoria (LRU)
+MAX_CACHED_FILES = 4
+
+# Extensiones aceptadas por el uploader de la barra lateral
+SUPPORTED_EXTENSIONS = ["csv", "gz", "zst", "parquet", "pq", "feather", "arrow"]
+
+# Variable de entorno con el único directorio del servidor desde el que se leen archivos grandes
+DATA_DIR_ENV = "STATS_APP_DATA_DIR"
+
+# Columnas de texto con menos valores únicos que esta fracción de filas pasan a 'category'
+CATEGORY_MAX_RATIO = 0.5
+
+
+def file_fingerprint(raw_bytes):
+    return hashlib.blake2b(raw_bytes, digest_size=16).hexdigest()
+
+
+def detect_format(file_name):
+    name = (file_name or "").lower()
+    if name.endswith((".parquet", ".pq")):
+        return "parquet"
+    if name.endswith((".feather", ".arrow")):
+        return "feather"
+    if name.endswith(".gz"):
+        return "csv.gz"
+    if name.endswith(".zst"):
+        return "csv.zst"
+    return "csv"
+
+
+def read_table(source, file_format, columns=None):
+    """Read a CSV/Parquet/Feather source, loading only ``columns`` if given."""
+    if file_format == "parquet":
+        return pd.read_parquet(source, columns=columns)
+    if file_format == "feather":
+        return pd.read_feather(source, columns=columns)
+    compression = {"csv.gz": "gzip", "csv.zst": "zstd"}.get(file_format)
+    return pd.read_csv(source, usecols=columns, compression=compression)
+
+
+def iter_chunks(source, file_format, columns=None, chunksize=500_000):
+    """Yield DataFrames of at most ``chunksize`` rows without loading the whole file."""
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    elif file_format == "feather":
+        import pyarrow.ipc as ipc
+        reader = ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if columns:
+                batch = batch.select(columns)
+            for start in range(0, batch.num_rows, chunksize):
+                yield batch.slice(start, chunksize).to_pandas()
+    else:
+        compression = {"csv.gz": "gzip", "csv.zst": "zstd"}.get(file_format)
+        with pd.read_csv(source, usecols=columns, compression=compression, chunksize=chunksize) as reader:
+            yield from reader
+
+
+def _smallest_int_dtype(col):
+    lo, hi = col.min(), col.max()
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        # También debe caber el rango (max - min) para evitar overflow en restas
+        if info.min <= lo and hi <= info.max and hi - lo <= info.max:
+            return dtype
+    return None
+
+
+def optimize_dtypes(df, compact_numeric=False):
+    """Turn low-cardinality text into 'category' and optionally shrink numerics.
+
+    Floats are only downcast to float32 when the round trip is lossless.
+    """
+    out = {}
+    n_rows = max(len(df), 1)
+    for name, col in df.items():
+        if col.dtype == object or pd.api.types.is_string_dtype(col.dtype):
+            if col.nunique(dropna=True) / n_rows <= CATEGORY_MAX_RATIO:
+                col = col.astype("category")
+        elif compact_numeric and pd.api.types.is_integer_dtype(col.dtype) and len(col):
+            dtype = _smallest_int_dtype(col)
+            if dtype is not None:
+                col = col.astype(dtype)
+        elif compact_numeric and col.dtype == np.float64:
+            compact = col.astype(np.float32)
+            if np.array_equal(compact.to_numpy(np.float64), col.to_numpy(), equal_nan=True):
+                col = compact
+        out[name] = col
+    return pd.DataFrame(out, index=df.index)
+
+
+def read_column_names(source, file_format):
+    # Solo lee el esquema / cabecera, no los datos
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_schema(source).names
+    if file_format == "feather":
+        import pyarrow.ipc as ipc
+        return ipc.open_file(source).schema.names
+    compression = {"csv.gz": "gzip", "csv.zst": "zstd"}.get(file_format)
+    return pd.read_csv(source, nrows=0, compression=compression).columns.tolist()
+
+
+@st.cache_resource(max_entries=MAX_CACHED_FILES, show_spinner="📥 Parsing uploaded file...")
+def _parse_file(fingerprint, file_format, columns, compact_numeric, _raw_bytes):
+    # El argumento con "_" no se hashea: la clave es la huella del contenido + opciones
+    df = read_table(io.BytesIO(_raw_bytes), file_format, columns=list(columns) if columns else None)
+    return optimize_dtypes(df, compact_numeric=compact_numeric)
+
+
+def _uploaded_fingerprint(uploaded_file, raw_bytes):
+    # Evita re-hashear los mismos bytes en cada rerun del mismo upload
+    file_id = getattr(uploaded_file, "file_id", None)
+    cached = st.session_state.get("_upload_fingerprint")
+    if file_id is not None and cached and cached[0] == file_id:
+        return cached[1]
+    fingerprint = file_fingerprint(raw_bytes)
+    st.session_state["_upload_fingerprint"] = (file_id, fingerprint)
+    return fingerprint
+
+
+@st.cache_data(max_entries=MAX_CACHED_FILES, show_spinner=False)
+def _column_names(fingerprint, file_format, _raw_bytes):
+    return read_column_names(io.BytesIO(_raw_bytes), file_format)
+
+
+def uploaded_column_names(uploaded_file):
+    raw_bytes = uploaded_file.getvalue()
+    fingerprint = _uploaded_fingerprint(uploaded_file, raw_bytes)
+    return _column_names(fingerprint, detect_format(uploaded_file.name), raw_bytes)
+
+
+def load_uploaded_file(uploaded_file, columns=None, compact_numeric=False):
+    """Parse an uploaded file once per distinct content and share the frame.
+
+    ``columns`` restricts parsing to a subset (Parquet/Feather never read the
+    other columns). The returned DataFrame is shared between reruns and
+    sessions, so callers must treat it as read-only (copy before mutating).
+    """
+    raw_bytes = uploaded_file.getvalue()
+    fingerprint = _uploaded_fingerprint(uploaded_file, raw_bytes)
+    file_format = detect_format(uploaded_file.name)
+    columns = tuple(columns) if columns else None
+    df = _parse_file(fingerprint, file_format, columns, compact_numeric, raw_bytes)
+    # La huella del dataset incluye la proyección de columnas y el modo de dtypes
+    if columns or compact_numeric:
+        fingerprint = file_fingerprint(repr((fingerprint, columns, compact_numeric)).encode())
+    st.session_state["dataset_fingerprint"] = fingerprint
+    return df
+
+
+def dataset_fingerprint():
+    return st.session_state.get("dataset_fingerprint")
+
+
+def server_data_dir():
+    """The allow-listed data directory (resolved), or None when ``STATS_APP_DATA_DIR`` is not set."""
+    path = os.environ.get(DATA_DIR_ENV, "").strip()
+    return os.path.realpath(path) if path and os.path.isdir(path) else None
+
+
+def server_files():
+    """Supported data files inside the data directory, as sorted relative paths."""
+    root = server_data_dir()
+    if root is None:
+        return []
+    suffixes = tuple(f".{ext}" for ext in SUPPORTED_EXTENSIONS)
+    found = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            # Los enlaces simbólicos que apuntan fuera del directorio no se ofrecen
+            if name.lower().endswith(suffixes) and os.path.commonpath([root, os.path.realpath(path)]) == root:
+                found.append(os.path.relpath(path, root))
+    return sorted(found)
+
+
+def resolve_server_path(name):
+    """Absolute path of ``name`` inside the data directory; ValueError for anything else (``..``, symlinks out)."""
+    root = server_data_dir()
+    if root is None:
+        raise ValueError("No server data directory is configured.")
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+        raise ValueError(f"'{name}' is not a file in the server data directory.")
+    return path
+
+
+def server_file_picker(key, label="📂 Large file on the server:"):
+    """Selectbox over ``server_files()``; returns the resolved path, or None (with a hint) when unavailable."""
+    files = server_files()
+    if not files:
+        st.info(f"ℹ️ No server data files available. Set `{DATA_DIR_ENV}` to a directory of CSV, CSV.GZ, "
+                f"CSV.ZST, Parquet or Feather files to analyse them in chunks.")
+        return None
+    name = st.selectbox(label, files, key=key)
+    try:
+        return resolve_server_path(name)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        return None
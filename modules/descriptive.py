@@ -5,93 +5,163 @@ import streamlit as st
 from scipy import stats
 import pandas as pd
 import io
-from fpdf import FPDF
-import tempfile
+from modules import data_loader, plot_cache, plot_rendering, report_builder, streaming_stats, summary_kernel
+
+# Máximo de outliers listados en el PDF
+MAX_REPORT_OUTLIERS = 500
 
 def run_descriptive_analysis(series, column_name):
-    if len(series.dropna()) < 2:
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    summary = summary_kernel.summarize(values)
+    if summary is None:
         st.error("❌ Not enough data to compute descriptive statistics. At least 2 values are required.")
         return
 
     st.write("### 📊 Summary Statistics")
-    desc = {
-        'Count': series.count(),
-        'Mean': series.mean(),
-        'Median': series.median(),
-        'Mode': series.mode().values.tolist(),
-        'Min': series.min(),
-        'Max': series.max(),
-        'Range': series.max() - series.min(),
-        'Variance': series.var(),
-        'Standard Deviation': series.std(),
-        'Q1': series.quantile(0.25),
-        'Q2 (Median)': series.quantile(0.50),
-        'Q3': series.quantile(0.75),
-        'IQR': series.quantile(0.75) - series.quantile(0.25)
-    }
+    desc = summary.as_dict()
 
     for key, value in desc.items():
         st.write(f"**{key}:** {value}")
 
-    q1 = desc['Q1']
-    q3 = desc['Q3']
-    iqr = desc['IQR']
-    lower_bound = q1 - 1.5 * iqr
-    upper_bound = q3 + 1.5 * iqr
-    outliers = series[(series < lower_bound) | (series > upper_bound)]
+    outliers = series[summary.outlier_mask(values)]
     st.write(f"**Outliers detected ({len(outliers)}):** {outliers.values}")
 
     # 📈 Visualizaciones
     st.write("### 📈 Visualizations")
+
+    def draw():
+        fig, axs = plt.subplots(1, 3, figsize=(18, 5))
+
+        plot_rendering.histogram_with_kde(axs[0], series, bins=20)
+        axs[0].set_title(f"Histogram of {column_name}")
+
+        sns.boxplot(x=series, ax=axs[1])
+        axs[1].set_title(f"Boxplot of {column_name}")
+
+        sns.barplot(x=summary.top_values, y=summary.top_counts, ax=axs[2])
+        axs[2].set_title(f"Top 10 Frequencies of {column_name}")
+        axs[2].tick_params(axis='x', rotation=45)
+        return fig
+
+    fingerprint = plot_cache.data_fingerprint(series)
+    png = plot_cache.cached_plot("descriptive", fingerprint, (column_name,), draw)
+    plot_cache.show_plot(png)
+
+    # 📤 Exportación de resultados como PDF 
+    st.write("### 📤 Export Report as PDF")
+
+    def build():
+        shown = outliers.values.tolist()[:MAX_REPORT_OUTLIERS]
+        more = f" ... ({len(outliers) - len(shown)} more)" if len(outliers) > len(shown) else ""
+        return report_builder.build_pdf(
+            f"Descriptive Analysis Report for: {column_name}",
+            rows=list(desc.items()),
+            paragraphs=[f"Outliers detected ({len(outliers)}): {shown}{more}"],
+            images=[png]
+        )
+
+    report_builder.report_download_button(
+        "📄 Download PDF Report", ("descriptive", fingerprint, column_name), build, f"{column_name}_report.pdf"
+    )
+
+
+def _open_stream_source(uploaded_file, path):
+    if path:
+        return (lambda: path), data_loader.detect_format(path)
+    raw_bytes = uploaded_file.getvalue()
+    return (lambda: io.BytesIO(raw_bytes)), data_loader.detect_format(uploaded_file.name)
+
+
+def run_streaming_descriptive_page(uploaded_file):
+    st.write("### 🌊 Streaming Descriptive Statistics (constant memory)")
+    path = None
+    # Solo se leen archivos del directorio permitido del servidor, nunca rutas escritas por el usuario
+    if uploaded_file is None or st.radio("🗂️ Data source:", ["Uploaded file", "Large file on the server"],
+                                         horizontal=True, key="stream_source") != "Uploaded file":
+        path = data_loader.server_file_picker("stream_path")
+        if path is None:
+            if uploaded_file is None:
+                st.info("Upload a file to run the streaming analysis.")
+            return
+
+    try:
+        open_source, file_format = _open_stream_source(uploaded_file, path)
+        columns = data_loader.read_column_names(open_source(), file_format)
+    except Exception as e:
+        st.error(f"❌ Could not open the data source: {e}")
+        return
+
+    column_name = st.selectbox("🔢 Select a numeric column to analyze:", columns, key="stream_col")
+    chunksize = st.number_input("📦 Rows per chunk", min_value=10_000, max_value=5_000_000, value=500_000,
+                                step=100_000, key="stream_chunk")
+    compare_exact = st.checkbox("🔍 Compare with exact statistics (loads this column in memory)",
+                                key="stream_exact")
+
+    if not st.button("▶️ Run Streaming Analysis"):
+        return
+
+    with st.spinner("Streaming through the file..."):
+        result = streaming_stats.streaming_summary(open_source, file_format, column_name, chunksize=int(chunksize))
+    if result is None:
+        st.error("❌ Not enough numeric data to compute descriptive statistics. At least 2 values are required.")
+        return
+
+    summary = result['summary']
+    desc = summary.as_dict()
+    st.write("### 📊 Summary Statistics (quantiles and mode are sketch estimates)")
+    for key, value in desc.items():
+        st.write(f"**{key}:** {value}")
+
+    st.write(f"**Outlier bounds:** ({summary.lower_bound:.4f}, {summary.upper_bound:.4f})")
+    st.write(f"**Outliers detected ({result['n_outliers']}), first {len(result['outlier_sample'])}:** "
+             f"{np.array(result['outlier_sample'])}")
+
+    if compare_exact:
+        series = pd.to_numeric(data_loader.read_table(open_source(), file_format, columns=[column_name])[column_name],
+                               errors="coerce").dropna()
+        exact = {
+            'Count': series.count(), 'Mean': series.mean(), 'Median': series.median(),
+            'Min': series.min(), 'Max': series.max(), 'Variance': series.var(),
+            'Standard Deviation': series.std(), 'Q1': series.quantile(0.25), 'Q3': series.quantile(0.75),
+        }
+        comparison = pd.DataFrame({
+            'Streaming': [desc[key] for key in exact],
+            'Exact': list(exact.values()),
+        }, index=list(exact))
+        comparison['Abs. Difference'] = (comparison['Streaming'] - comparison['Exact']).abs()
+        st.write("### 🔍 Streaming vs Exact")
+        st.dataframe(comparison)
+
+    st.write("### 📈 Visualizations")
     fig, axs = plt.subplots(1, 3, figsize=(18, 5))
 
-    sns.histplot(series, kde=True, bins=20, ax=axs[0])
+    hist, edges = result['hist']
+    axs[0].stairs(hist, edges, fill=True, alpha=0.6)
     axs[0].set_title(f"Histogram of {column_name}")
 
-    sns.boxplot(x=series, ax=axs[1])
+    axs[1].bxp([{
+        'med': desc['Median'], 'q1': desc['Q1'], 'q3': desc['Q3'],
+        'whislo': max(summary.min, summary.lower_bound),
+        'whishi': min(summary.max, summary.upper_bound),
+        'fliers': result['outlier_sample'],
+    }], vert=False, showfliers=True)
+    axs[1].set_yticks([])
     axs[1].set_title(f"Boxplot of {column_name}")
 
-    freq = series.value_counts().nlargest(10)
-    sns.barplot(x=freq.index, y=freq.values, ax=axs[2])
-    axs[2].set_title(f"Top 10 Frequencies of {column_name}")
+    sns.barplot(x=summary.top_values, y=summary.top_counts, ax=axs[2])
+    axs[2].set_title(f"Top 10 Frequencies of {column_name} (lower bounds)")
     axs[2].tick_params(axis='x', rotation=45)
 
-    # Guardar gráfico como imagen temporal
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as tmpfile:
-        fig.savefig(tmpfile.name, bbox_inches='tight')
-        img_path = tmpfile.name
     st.pyplot(fig, use_container_width=True)
 
-    # 📤 Exportación de resultados como PDF 
-    st.write("### 📤 Export Report as PDF")
 
-    class PDF(FPDF):
-        def header(self):
-            self.set_font("Arial", 'B', 14)
-            self.cell(0, 10, f"Descriptive Analysis Report for: {column_name}", ln=True, align='C')
-            self.ln(10)
+def run_profile_all_columns(df):
+    st.write("### 📋 Profile of All Numeric Columns")
+    with st.spinner(f"Profiling {df.shape[1]} numeric columns..."):
+        profile = summary_kernel.profile_frame(df)
 
-    pdf = PDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=10)
-
-    for key, value in desc.items():
-        pdf.cell(0, 10, f"{key}: {value}", ln=True)
-    pdf.ln(5)
-    pdf.multi_cell(0, 10, f"Outliers detected ({len(outliers)}): {outliers.values.tolist()}")
-    pdf.ln(10)
-
-    pdf.image(img_path, x=10, w=190)
-
-    pdf_output = io.BytesIO()
-    pdf_bytes = pdf.output(dest='S').encode('latin1')
-    pdf_output.write(pdf_bytes)
-    pdf_output.seek(0)
-
-    st.download_button(
-        label="📄 Download PDF Report",
-        data=pdf_output,
-        file_name=f"{column_name}_report.pdf",
-        mime="application/pdf"
-    )
+    st.caption("Click a column header to sort. Outliers use the 1.5 × IQR rule.")
+    st.dataframe(profile, use_container_width=True)
 
+    csv = profile.to_csv().encode('utf-8')
+    st.download_button("📥 Download Profile CSV", data=csv, file_name="numeric_profile.csv", mime="text/csv")
@@ -0,0 +1,143 @@
+"""Shared distribution service: CDF, tail probabilities, quantiles and p-values.
+
+``scipy.stats`` distribution methods validate and broadcast their arguments
+on every call (tens of microseconds even for one number), and ``1 - cdf(x)``
+rounds to 0 in the upper tail. Here the normal, t, χ², F and beta functions go
+straight to the ``scipy.special`` ufuncs (same algorithms, ~1 µs per call,
+vectorized over arrays), upper tails use the survival function, and scalar
+quantiles are memoized by (distribution, probability, parameters). Other
+distributions fall back to ``scipy.stats``.
+"""
+from functools import lru_cache
+import numpy as np
+from scipy import special, stats
+
+QUANTILE_CACHE_SIZE = 4096
+
+
+def _chi2_ppf(q, df):
+    return 2 * special.gammaincinv(df / 2, q)
+
+
+def _chi2_isf(q, df):
+    return 2 * special.gammainccinv(df / 2, q)
+
+
+def _f_from_beta(b, d1, d2):
+    return d2 * b / (d1 * (1 - b))
+
+
+# Funciones de scipy.special por distribución; lo que falte se delega en scipy.stats
+_SPECIAL = {
+    "norm": {
+        "cdf": special.ndtr,
+        "sf": lambda x: special.ndtr(-np.asarray(x, dtype=np.float64)),
+        "logsf": lambda x: special.log_ndtr(-np.asarray(x, dtype=np.float64)),
+        "logcdf": special.log_ndtr,
+        "ppf": special.ndtri,
+        "isf": lambda q: -special.ndtri(q),
+        "pdf": lambda x: np.exp(-np.square(x) / 2) / np.sqrt(2 * np.pi),
+    },
+    "t": {
+        "cdf": lambda x, df: special.stdtr(df, x),
+        "sf": lambda x, df: special.stdtr(df, -np.asarray(x, dtype=np.float64)),
+        "ppf": lambda q, df: special.stdtrit(df, q),
+        "isf": lambda q, df: -special.stdtrit(df, q),
+    },
+    "chi2": {
+        "cdf": lambda x, df: special.chdtr(df, x),
+        "sf": lambda x, df: special.chdtrc(df, x),
+        "ppf": _chi2_ppf,
+        "isf": _chi2_isf,
+    },
+    "f": {
+        "cdf": lambda x, d1, d2: special.fdtr(d1, d2, x),
+        "sf": lambda x, d1, d2: special.fdtrc(d1, d2, x),
+        "ppf": lambda q, d1, d2: _f_from_beta(special.betaincinv(d1 / 2, d2 / 2, q), d1, d2),
+        "isf": lambda q, d1, d2: _f_from_beta(special.betainccinv(d1 / 2, d2 / 2, q), d1, d2),
+    },
+    "beta": {
+        "cdf": lambda x, a, b: special.betainc(a, b, x),
+        "sf": lambda x, a, b: special.betaincc(a, b, x),
+        "ppf": lambda q, a, b: special.betaincinv(a, b, q),
+        "isf": lambda q, a, b: special.betainccinv(a, b, q),
+    },
+}
+_SYMMETRIC = {"norm", "t"}
+
+
+def _function(dist, method):
+    func = _SPECIAL.get(dist, {}).get(method)
+    return func if func is not None else getattr(getattr(stats, dist), method)
+
+
+def _evaluate(dist, method, x, params):
+    out = _function(dist, method)(x, *params)
+    return float(out) if np.ndim(out) == 0 else out
+
+
+def cdf(dist, x, *params):
+    return _evaluate(dist, "cdf", x, params)
+
+
+def sf(dist, x, *params):
+    """P(X > x), accurate far into the upper tail (unlike ``1 - cdf``)."""
+    return _evaluate(dist, "sf", x, params)
+
+
+def logsf(dist, x, *params):
+    return _evaluate(dist, "logsf", x, params)
+
+
+def pdf(dist, x, *params):
+    return _evaluate(dist, "pdf", x, params)
+
+
+def pmf(dist, k, *params):
+    return _evaluate(dist, "pmf", k, params)
+
+
+@lru_cache(maxsize=QUANTILE_CACHE_SIZE)
+def _quantile(dist, method, q, params):
+    return float(_function(dist, method)(q, *params))
+
+
+def _memoized(dist, method, q, params):
+    if np.ndim(q) == 0 and all(np.ndim(p) == 0 for p in params):
+        return _quantile(dist, method, float(q), tuple(float(p) for p in params))
+    return _evaluate(dist, method, q, params)
+
+
+def ppf(dist, q, *params):
+    """Quantile (inverse CDF); scalar calls are memoized."""
+    return _memoized(dist, "ppf", q, params)
+
+
+def isf(dist, q, *params):
+    """Upper-tail quantile: the x with P(X > x) = q (memoized for scalars)."""
+    return _memoized(dist, "isf", q, params)
+
+
+def critical_value(dist, alpha, *params, tail="two-sided"):
+    """Critical value for a test at level ``alpha``: two-sided (α/2 in each tail), "upper" or "lower"."""
+    if tail == "two-sided":
+        return isf(dist, alpha / 2, *params)
+    if tail == "upper":
+        return isf(dist, alpha, *params)
+    return ppf(dist, alpha, *params)
+
+
+def p_value(dist, statistic, *params, alternative="two-sided"):
+    """p-value of ``statistic``: "two-sided" (symmetric distributions), "greater" or "less"."""
+    if alternative == "greater":
+        return sf(dist, statistic, *params)
+    if alternative == "less":
+        return cdf(dist, statistic, *params)
+    if dist not in _SYMMETRIC:
+        raise ValueError(f"Two-sided p-values need a symmetric distribution, not '{dist}'.")
+    p = 2 * sf(dist, np.abs(statistic), *params)
+    return min(p, 1.0) if np.ndim(p) == 0 else np.minimum(p, 1.0)
+
+
+def cache_info():
+    return _quantile.cache_info()
@@ -1,38 +1,128 @@
+import os
 import streamlit as st
-import pandas as pd
-from sklearn.preprocessing import LabelEncoder
+from modules import data_loader, encoding_engine, model_cache
+
+# Filas leídas del archivo del servidor para deducir qué columnas son categóricas
+SCHEMA_SAMPLE_ROWS = 1_000
+
+
+def _file_source():
+    path = data_loader.server_file_picker("encoding_path")
+    if path is None:
+        return None
+    file_format = data_loader.detect_format(path)
+    try:
+        sample = next(data_loader.iter_chunks(path, file_format, chunksize=SCHEMA_SAMPLE_ROWS))
+        stat = os.stat(path)
+    except Exception as e:
+        st.error(f"❌ Could not read the file: {e}")
+        return None
+    return sample, lambda: encoding_engine.file_chunks(path, file_format), ("file", path, stat.st_size, stat.st_mtime)
+
+
+def _discard_result():
+    previous = st.session_state.pop("encoding_result", None)
+    if previous and os.path.exists(previous["path"]):
+        os.remove(previous["path"])
+
+
+def _read_file(path):
+    # Se lee al pulsar, no en cada rerun; el archivo sigue ahí para otra descarga hasta que lo borre el barrido
+    with open(path, "rb") as handle:
+        return handle.read()
+
 
 def run_encoding_tool(df):
     st.header("📘 Categorical Encoding")
 
-    cat_cols = df.select_dtypes(include=["object", "category", "bool"]).columns.tolist()
+    source = st.radio("🗂️ Data source:", ["Uploaded data", "Large file on the server (chunked)"],
+                      horizontal=True, key="encoding_source")
+    if source == "Uploaded data":
+        sample, chunks = df, lambda: encoding_engine.frame_chunks(df)
+        source_key = ("upload", model_cache.frame_fingerprint(df))
+    else:
+        file_source = _file_source()
+        if file_source is None:
+            return
+        sample, chunks, source_key = file_source
+    # Otro dataset: el resultado anterior (y su archivo) ya no corresponde
+    result = st.session_state.get("encoding_result")
+    if result and result["source"] != source_key:
+        _discard_result()
 
-    if not cat_cols:
-        st.warning("⚠️ No categorical columns found in the dataset.")
-        return
+    saved = st.file_uploader("💾 Reapply saved encoder mappings (JSON, optional):", type=["json"],
+                             key="encoding_saved")
+    plan = None
+    if saved is not None:
+        try:
+            plan = encoding_engine.EncodingPlan.from_json(saved.getvalue().decode("utf-8"))
+        except Exception as e:
+            st.error(f"❌ Invalid encoder file: {e}")
+            return
+        missing = [col for col in plan.columns if col not in sample.columns]
+        if missing:
+            st.error(f"❌ Columns missing from the data: {', '.join(missing)}")
+            return
+        st.write("**Saved encoders:** " + ", ".join(f"{e.column} ({e.method})" for e in plan.encoders))
+    else:
+        cat_cols = sample.select_dtypes(include=["object", "category", "bool", "string"]).columns.tolist()
+
+        if not cat_cols:
+            st.warning("⚠️ No categorical columns found in the dataset.")
+            return
 
-    selected_cols = st.multiselect("🔠 Select categorical columns to encode:", cat_cols)
-    method = st.radio("🛠️ Select encoding method:", ["One-Hot Encoding", "Label Encoding"])
+        selected_cols = st.multiselect("🔠 Select categorical columns to encode:", cat_cols)
+        method_label = st.radio("🛠️ Select encoding method:", list(encoding_engine.METHODS), horizontal=True)
+        method = encoding_engine.METHODS[method_label]
+        target, n_features = None, 256
+        if method == "hash":
+            n_features = st.select_slider("🔢 Hash buckets per column:", [2 ** k for k in range(3, 17)], value=256)
+        elif method == "target":
+            numeric_cols = sample.select_dtypes(include='number').columns.tolist()
+            if not numeric_cols:
+                st.warning("⚠️ Target encoding needs a numeric target column.")
+                return
+            target = st.selectbox("🎯 Target column:", numeric_cols)
+        if not selected_cols:
+            return
 
-    if st.button("⚙️ Apply Encoding") and selected_cols:
-        df_encoded = df.copy()
+    format_label = st.selectbox("📦 Output format:", list(encoding_engine.OUTPUT_FORMATS))
+    output_format, mime = encoding_engine.OUTPUT_FORMATS[format_label]
 
-        if method == "One-Hot Encoding":
-            df_encoded = pd.get_dummies(df_encoded, columns=selected_cols)
-        else:
-            label_encoders = {}
-            for col in selected_cols:
-                le = LabelEncoder()
-                df_encoded[col] = le.fit_transform(df_encoded[col])
-                label_encoders[col] = le
+    if st.button("⚙️ Apply Encoding"):
+        try:
+            with st.spinner("Encoding in chunks..."):
+                if plan is None:
+                    plan = encoding_engine.fit_encoders(chunks(), {col: method for col in selected_cols},
+                                                        target=target, n_features=n_features)
+                path, rows, preview = encoding_engine.write_encoded(plan, chunks(), output_format)
+        except Exception as e:
+            st.error(f"🚫 Error applying encoding: {e}")
+            return
+        _discard_result()
+        st.session_state["encoding_result"] = {
+            "path": path, "rows": rows, "preview": preview, "format": output_format, "mime": mime,
+            "mappings": plan.to_json(), "source": source_key,
+        }
 
-        st.success("✅ Encoding applied successfully!")
+    result = st.session_state.get("encoding_result")
+    if result is None:
+        st.info("⚠️ Press the button above to apply encoding.")
+        return
 
-        st.subheader("🔍 Encoded Dataset Preview")
-        st.dataframe(df_encoded.head())
+    st.success(f"✅ Encoding applied successfully! {result['rows']:,} rows written.")
 
-        csv = df_encoded.to_csv(index=False).encode('utf-8')
-        st.download_button("📥 Download Encoded CSV", data=csv, file_name="encoded_data.csv", mime="text/csv")
+    st.subheader("🔍 Encoded Dataset Preview")
+    st.dataframe(result["preview"])
 
-    elif selected_cols:
-        st.info("⚠️ Press the button above to apply encoding.")
+    path = result["path"]
+    if os.path.exists(path):
+        st.download_button("📥 Download Encoded Data", data=lambda: _read_file(path),
+                           file_name=f"encoded_data.{result['format']}", mime=result["mime"],
+                           key="encoding_download")
+    else:
+        st.info("ℹ️ The encoded file expired and was removed from the server; apply the encoding again "
+                "for another copy.")
+    st.download_button("💾 Download Encoder Mappings (JSON)", data=result["mappings"],
+                       file_name="encoder_mappings.json", mime="application/json", key="encoding_mappings")
+    st.caption("Upload the mappings file above to encode new data with the same categories, without refitting.")
@@ -0,0 +1,311 @@
+"""Chunked categorical encoders whose fitted mappings are plain JSON.
+
+Fitting is one pass that merges per-chunk category counts (and target sums),
+so only the distinct categories are held in memory. Transforming works chunk
+by chunk: one-hot and hashing produce sparse CSR blocks, the other methods a
+single numeric column. Missing values are treated as their own category
+(``MISSING``), and categories unseen at fit time map to a fixed default.
+"""
+import json
+import os
+import tempfile
+import time
+import zipfile
+from dataclasses import asdict, dataclass, field
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from modules import data_loader
+
+CHUNK_ROWS = 200_000
+# Más columnas indicadoras que esto solo se escriben como matriz dispersa (.npz)
+DENSE_MAX_COLUMNS = 1_000
+# Salidas codificadas en un directorio propio; las que superan esta edad se borran (sesiones cerradas)
+OUTPUT_DIR = os.path.join(tempfile.gettempdir(), "encoded_outputs")
+OUTPUT_TTL_SECONDS = 3_600
+COPY_BYTES = 1 << 20
+MISSING = "<NA>"
+FORMAT_VERSION = 1
+METHODS = {
+    "One-Hot (sparse)": "onehot",
+    "Label": "label",
+    "Hashing": "hash",
+    "Frequency": "frequency",
+    "Target (smoothed mean)": "target",
+}
+OUTPUT_FORMATS = {
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "Parquet": ("parquet", "application/octet-stream"),
+    "Sparse matrix (.npz, encoded columns only)": ("npz", "application/octet-stream"),
+}
+
+
+def _factorize(series):
+    """Integer code of every row plus the text key of each distinct value.
+
+    Categories are compared as text so the same mapping works for CSV and
+    Parquet sources; only the distinct values are converted, not every row.
+    """
+    codes, uniques = pd.factorize(series)
+    keys = pd.Series(uniques).astype("string").tolist()
+    if (codes < 0).any():
+        codes = np.where(codes < 0, len(keys), codes)
+        keys.append(MISSING)
+    return codes, keys
+
+
+@dataclass
+class ColumnEncoder:
+    column: str
+    method: str
+    categories: list = field(default_factory=list)
+    values: list = field(default_factory=list)
+    default: float = 0.0
+    n_features: int = 0
+
+    @property
+    def is_sparse(self):
+        return self.method in ("onehot", "hash")
+
+    def output_names(self):
+        if self.method == "onehot":
+            return [f"{self.column}_{category}" for category in self.categories]
+        if self.method == "hash":
+            return [f"{self.column}_hash_{i}" for i in range(self.n_features)]
+        return [self.column]
+
+    def _codes(self, series):
+        codes, keys = _factorize(series)
+        return pd.Index(self.categories).get_indexer(keys)[codes]
+
+    def transform(self, series):
+        """CSR block (one-hot, hashing) or a 1-D float array (label, frequency, target)."""
+        n = len(series)
+        if self.method == "onehot":
+            codes = self._codes(series)
+            rows = np.flatnonzero(codes >= 0)
+            return sparse.csr_matrix((np.ones(len(rows), dtype=np.uint8), (rows, codes[rows])),
+                                     shape=(n, len(self.categories)))
+        if self.method == "hash":
+            # hash_array usa una clave fija: los cubos son reproducibles entre sesiones
+            codes, keys = _factorize(series)
+            buckets = (pd.util.hash_array(np.array(keys, dtype=object)) % np.uint64(self.n_features)).astype(np.int64)
+            return sparse.csr_matrix((np.ones(n, dtype=np.uint8), (np.arange(n), buckets[codes])),
+                                     shape=(n, self.n_features))
+        codes = self._codes(series)
+        if self.method == "label":
+            return codes.astype(np.float64)
+        lookup = np.append(np.asarray(self.values, dtype=np.float64), self.default)
+        return lookup[codes]  # código -1 (no visto) → último elemento = default
+
+
+class _FitState:
+    """Per-column category counts (and target sums) merged across chunks."""
+
+    def __init__(self):
+        self.counts = {}
+        self.target_sums = {}
+        self.target_total = 0.0
+        self.target_n = 0
+
+    def update(self, chunk, columns, target=None):
+        if target is not None:
+            y = pd.to_numeric(chunk[target], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            valid = ~np.isnan(y)
+            self.target_total += float(y[valid].sum())
+            self.target_n += int(valid.sum())
+        for column in columns:
+            codes, keys = _factorize(chunk[column])
+            # Dos valores distintos pueden dar el mismo texto (1 y "1"): agrupar por clave
+            counts = pd.Series(np.bincount(codes, minlength=len(keys)), index=keys).groupby(level=0).sum()
+            self.counts[column] = counts.add(self.counts.get(column, pd.Series(dtype=np.float64)), fill_value=0)
+            if target is not None:
+                sums = pd.DataFrame({
+                    'sum': np.bincount(codes[valid], weights=y[valid], minlength=len(keys)),
+                    'count': np.bincount(codes[valid], minlength=len(keys)),
+                }, index=keys).groupby(level=0).sum()
+                self.target_sums[column] = sums.add(self.target_sums.get(column, pd.DataFrame()), fill_value=0)
+
+
+def fit_encoders(chunks, methods, target=None, n_features=256, smoothing=10.0):
+    """Fit one ``ColumnEncoder`` per column of ``methods`` ({column: method key}) in one pass."""
+    columns = list(methods)
+    needs_target = any(method == "target" for method in methods.values())
+    if needs_target and target is None:
+        raise ValueError("Target encoding needs a numeric target column.")
+    state = _FitState()
+    for chunk in chunks:
+        state.update(chunk, columns, target if needs_target else None)
+
+    encoders = []
+    for column in columns:
+        method = methods[column]
+        counts = state.counts.get(column, pd.Series(dtype=np.float64))
+        categories = sorted(counts.index)
+        encoder = ColumnEncoder(column=column, method=method)
+        if method in ("onehot", "label"):
+            encoder.categories = categories
+        elif method == "hash":
+            encoder.n_features = int(n_features)
+        elif method == "frequency":
+            encoder.categories = categories
+            encoder.values = (counts[categories] / counts.sum()).tolist()
+        elif method == "target":
+            # Media suavizada hacia la media global: (Σy + m·prior) / (n + m)
+            prior = state.target_total / max(state.target_n, 1)
+            sums = state.target_sums.get(column, pd.DataFrame(columns=['sum', 'count'])).reindex(categories, fill_value=0)
+            encoder.categories = categories
+            encoder.values = ((sums['sum'] + smoothing * prior) / (sums['count'] + smoothing)).tolist()
+            encoder.default = prior
+        encoders.append(encoder)
+    return EncodingPlan(encoders)
+
+
+@dataclass
+class EncodingPlan:
+    encoders: list
+
+    @property
+    def columns(self):
+        return [encoder.column for encoder in self.encoders]
+
+    def transform_sparse(self, chunk):
+        """Encoded columns only, as one CSR block and its column names."""
+        blocks, names = [], []
+        for encoder in self.encoders:
+            out = encoder.transform(chunk[encoder.column])
+            blocks.append(out if encoder.is_sparse else sparse.csr_matrix(out[:, None]))
+            names += encoder.output_names()
+        return sparse.hstack(blocks, format='csr'), names
+
+    def transform_frame(self, chunk):
+        """Chunk with label/frequency/target columns replaced in place and indicator columns appended."""
+        out = chunk.drop(columns=[e.column for e in self.encoders if e.is_sparse])
+        indicators = []
+        for encoder in self.encoders:
+            values = encoder.transform(chunk[encoder.column])
+            if encoder.is_sparse:
+                indicators.append(pd.DataFrame(values.toarray(), columns=encoder.output_names(), index=chunk.index))
+            else:
+                out[encoder.column] = values.astype(np.int64) if encoder.method == "label" else values
+        return pd.concat([out] + indicators, axis=1) if indicators else out
+
+    def to_json(self):
+        return json.dumps({"version": FORMAT_VERSION, "encoders": [asdict(e) for e in self.encoders]}, indent=2)
+
+    @classmethod
+    def from_json(cls, text):
+        payload = json.loads(text)
+        if payload.get("version") != FORMAT_VERSION:
+            raise ValueError("Unsupported encoder file version.")
+        return cls([ColumnEncoder(**item) for item in payload["encoders"]])
+
+
+def frame_chunks(df, chunk_rows=CHUNK_ROWS):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def file_chunks(path, file_format, chunk_rows=CHUNK_ROWS):
+    return data_loader.iter_chunks(path, file_format, chunksize=chunk_rows)
+
+
+def _sweep_outputs(now=None):
+    """Delete encoded outputs older than ``OUTPUT_TTL_SECONDS`` (left behind by ended sessions)."""
+    now = time.time() if now is None else now
+    for entry in os.scandir(OUTPUT_DIR):
+        try:
+            if entry.is_file() and now - entry.stat().st_mtime > OUTPUT_TTL_SECONDS:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def _npy_member(archive, name, dtype, length, spool):
+    # Cabecera .npy con la longitud ya conocida y después los bytes volcados por bloques
+    with archive.open(f"{name}.npy", "w", force_zip64=True) as member:
+        np.lib.format.write_array_header_1_0(member, {"descr": np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                                                      "fortran_order": False, "shape": (length,)})
+        spool.seek(0)
+        for piece in iter(lambda: spool.read(COPY_BYTES), b""):
+            member.write(piece)
+
+
+def _write_npz(plan, chunks, path):
+    """Stream CSR blocks into a ``scipy.sparse.load_npz``-compatible archive, one block in memory at a time."""
+    rows = nnz = width = 0
+    dtype, preview = None, None
+    with tempfile.TemporaryFile() as data, tempfile.TemporaryFile() as indices, tempfile.TemporaryFile() as indptr:
+        indptr.write(np.zeros(1, dtype=np.int64).tobytes())
+        for chunk in chunks:
+            block, names = plan.transform_sparse(chunk)
+            if preview is None:
+                dtype = block.dtype
+                preview = pd.DataFrame(block[:5].toarray(), columns=names)
+            data.write(block.data.astype(dtype, copy=False).tobytes())
+            indices.write(block.indices.astype(np.int32, copy=False).tobytes())
+            indptr.write((block.indptr[1:].astype(np.int64) + nnz).tobytes())
+            rows, nnz, width = rows + block.shape[0], nnz + block.nnz, block.shape[1]
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+            _npy_member(archive, "indices", np.int32, nnz, indices)
+            _npy_member(archive, "indptr", np.int64, rows + 1, indptr)
+            _npy_member(archive, "data", dtype or np.float64, nnz, data)
+            for name, value in (("format", np.array(b"csr")), ("shape", np.array([rows, width]))):
+                with archive.open(f"{name}.npy", "w") as member:
+                    np.lib.format.write_array(member, value)
+    return rows, preview
+
+
+def write_encoded(plan, chunks, output_format, path=None):
+    """Transform ``chunks`` one at a time into a compressed CSV, Parquet or sparse .npz file.
+
+    Without ``path`` the file goes to ``OUTPUT_DIR`` (stale outputs there are
+    swept first); the caller deletes it when the result is replaced, and the
+    sweep removes it ``OUTPUT_TTL_SECONDS`` later otherwise. Returns (path,
+    rows written, preview of the first encoded rows).
+    """
+    if output_format != "npz":
+        width = sum(len(e.output_names()) for e in plan.encoders if e.is_sparse)
+        if width > DENSE_MAX_COLUMNS:
+            raise ValueError(f"{width} indicator columns are too many for a dense file; "
+                             "use the sparse .npz output or hashing.")
+    if path is None:
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        _sweep_outputs()
+        handle, path = tempfile.mkstemp(suffix=f".{output_format}", dir=OUTPUT_DIR)
+        os.close(handle)
+    rows, preview = 0, None
+
+    if output_format == "npz":
+        rows, preview = _write_npz(plan, chunks, path)
+        return path, rows, preview
+
+    if output_format == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        writer = None
+        try:
+            for chunk in chunks:
+                encoded = plan.transform_frame(chunk)
+                if writer is None:
+                    table = pa.Table.from_pandas(encoded, preserve_index=False)
+                    writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+                    preview = encoded.head()
+                else:
+                    table = pa.Table.from_pandas(encoded, schema=writer.schema, preserve_index=False)
+                writer.write_table(table)
+                rows += len(encoded)
+        finally:
+            if writer is not None:
+                writer.close()
+        return path, rows, preview
+
+    import gzip
+    with gzip.open(path, "wt", encoding="utf-8", newline="") as out:
+        for chunk in chunks:
+            encoded = plan.transform_frame(chunk)
+            encoded.to_csv(out, index=False, header=preview is None)
+            if preview is None:
+                preview = encoded.head()
+            rows += len(encoded)
+    return path, rows, preview
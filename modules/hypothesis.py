@@ -1,5 +1,5 @@
 import streamlit as st
-from modules import ttest_two_groups, ztest_population, anova_oneway, anova_twoway, tukey_posthoc
+from modules import ttest_two_groups, ztest_population, anova_oneway, anova_twoway, tukey_posthoc, batch_tests
 
 def hypothesis_test_menu(df):
     st.title("📊 Hypothesis Testing")
@@ -9,10 +9,11 @@ def hypothesis_test_menu(df):
         "Z-Test (Sample vs Population)",
         "One-Way ANOVA",
         "Two-Way ANOVA",
-        "Tukey Post-Hoc Test"
+        "Tukey Post-Hoc Test",
+        "Batch T/Z Tests (Many Metrics / Segments)"
     ])
 
-    numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns.tolist()
+    numeric_cols = df.select_dtypes(include='number').columns.tolist()
     categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
 
     if test_type == "T-Test (Two Groups)":
@@ -26,6 +27,9 @@ def hypothesis_test_menu(df):
             group_col = st.selectbox("🔠 Select categorical group column:", categorical_cols, key="anova1")
             value_col = st.selectbox("🔢 Select numeric value column:", numeric_cols, key="anova2")
             if st.button("📊 Run One-Way ANOVA"):
+                st.session_state["anova_run"] = (group_col, value_col)
+            # Visible en los reruns del test de permutación
+            if st.session_state.get("anova_run") == (group_col, value_col):
                 anova_oneway.run_anova_oneway(df.dropna(subset=[group_col, value_col]), group_col, value_col)
         else:
             st.warning("⚠️ You need at least one categorical and one numeric column.")
@@ -45,6 +49,12 @@ def hypothesis_test_menu(df):
             group_col = st.selectbox("🔠 Select categorical group column:", categorical_cols, key="tukey_group")
             value_col = st.selectbox("🔢 Select numeric value column:", numeric_cols, key="tukey_value")
             if st.button("📊 Run Tukey Test"):
+                st.session_state["tukey_run"] = (group_col, value_col)
+            # Se mantiene visible en los reruns (paginación, filtro, método)
+            if st.session_state.get("tukey_run") == (group_col, value_col):
                 tukey_posthoc.run_tukey_test(df.dropna(subset=[group_col, value_col]), group_col, value_col)
         else:
             st.warning("⚠️ You need at least one categorical and one numeric column.")
+
+    elif test_type == "Batch T/Z Tests (Many Metrics / Segments)":
+        batch_tests.run_batch_tests(df, numeric_cols, categorical_cols)
@@ -1,10 +1,48 @@
 import streamlit as st
-import pandas as pd
-import statsmodels.api as sm
+import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error
-import matplotlib.pyplot as plt
-import seaborn as sns
+from modules import data_loader, model_cache, ols_engine, plot_cache, resampling, residual_diagnostics
+
+TABLE_STYLE = {
+    'background-color': '#ffffff',
+    'color': '#0d2b45',
+    'border-color': '#4d82bc',
+    'font-family': 'Roboto',
+    'font-size': '14px'
+}
+
+
+def _show_model_tables(fit):
+    st.subheader("📊 Model Summary")
+    styled_summary = fit.model_table().style.set_properties(**TABLE_STYLE, width='200px')
+    st.write(styled_summary)
+
+    st.subheader("📈 Coefficients Table")
+    styled_coef = fit.coef_table().style.set_properties(**TABLE_STYLE)
+    st.write(styled_coef)
+
+    st.subheader("🩺 Residual Diagnostics")
+    styled_diag = fit.diagnostics_table().style.set_properties(**TABLE_STYLE, width='200px')
+    st.write(styled_diag)
+
+
+def _run_streaming_regression(dep_var, indep_vars):
+    path = data_loader.server_file_picker("ols_stream_path")
+    if path is None:
+        return
+    chunksize = st.number_input("📦 Rows per chunk", min_value=10_000, max_value=5_000_000, value=500_000,
+                                step=100_000, key="ols_stream_chunk")
+    if not st.button("▶️ Run Streaming Regression"):
+        return
+    try:
+        with st.spinner("Streaming through the file (two passes)..."):
+            fit = ols_engine.fit_ols_stream(lambda: path, data_loader.detect_format(path), indep_vars, dep_var,
+                                            chunksize=int(chunksize))
+    except Exception as e:
+        st.error(f"❌ Could not fit the model on the file: {e}")
+        return
+    _show_model_tables(fit)
+    st.success("✅ Linear regression analysis completed successfully.")
 
 
 def run_linear_regression():
@@ -15,7 +53,7 @@ def run_linear_regression():
         st.subheader("📄 Preview of Uploaded Dataset")
         st.dataframe(df.head())
 
-        numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns.tolist()
+        numeric_cols = df.select_dtypes(include='number').columns.tolist()
 
         if len(numeric_cols) >= 2:
             dep_var = st.selectbox("📌 Select the dependent variable:", numeric_cols)
@@ -23,49 +61,71 @@ def run_linear_regression():
                                         [col for col in numeric_cols if col != dep_var])
 
             if dep_var and indep_vars:
-                X = df[indep_vars]
-                y = df[dep_var]
-
-                X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-                X_train_const = sm.add_constant(X_train)
-                model = sm.OLS(y_train, X_train_const).fit()
-
-                X_test_const = sm.add_constant(X_test)
-                y_pred = model.predict(X_test_const)
-
-                st.subheader("📊 Model Summary")
-                summary_df = model.summary2().tables[0].copy()
-                styled_summary = summary_df.style.set_properties(**{
-                    'background-color': '#ffffff',
-                    'color': '#0d2b45',
-                    'border-color': '#4d82bc',
-                    'font-family': 'Roboto',
-                    'font-size': '14px',
-                    'width': '200px'
-                })
-                st.write(styled_summary)
-
-                st.subheader("📈 Coefficients Table")
-                coef_df = model.summary2().tables[1]
-                styled_coef = coef_df.style.set_properties(**{
-                    'background-color': '#ffffff',
-                    'color': '#0d2b45',
-                    'border-color': '#4d82bc',
-                    'font-family': 'Roboto',
-                    'font-size': '14px'
-                })
-                st.write(styled_coef)
-
-                st.subheader("📉 Residual Plot")
-                residuals = y_test - y_pred
-                fig, ax = plt.subplots(figsize=(15, 4))
-                sns.residplot(x=y_pred, y=residuals, ax=ax, color="#4d82bc", lowess=True)
-                ax.set_title("Residual Plot", fontsize=12)
-                ax.set_xlabel("Predicted Values", fontsize=10)
-                ax.set_ylabel("Residuals", fontsize=10)
-                ax.tick_params(labelsize=10)
-                st.pyplot(fig)
+                source = st.radio("🗂️ Data source:", ["Uploaded data (80/20 train/test split)",
+                                                      "Large file on the server (streamed, all rows)"],
+                                  horizontal=True, key="ols_source")
+                if source.startswith("Large file"):
+                    _run_streaming_regression(dep_var, indep_vars)
+                    return
+
+                split_seed = int(st.number_input("🎲 Train/test split seed", value=42, step=1, key="ols_seed"))
+                fingerprint = model_cache.frame_fingerprint(df)
+                train_rows, test_rows = model_cache.cached_model(
+                    "split", fingerprint, (len(df), split_seed),
+                    lambda: train_test_split(np.arange(len(df)), test_size=0.2, random_state=split_seed)
+                )
+                # XᵀX de todas las columnas numéricas una sola vez; cada modelo sale de sus sub-bloques
+                shared = model_cache.cached_model(
+                    "ols_gram", fingerprint, (tuple(numeric_cols), split_seed),
+                    lambda: ols_engine.SharedGram(df[numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan),
+                                                  numeric_cols, train_rows)
+                )
+
+                def fit_model():
+                    data = df[indep_vars + [dep_var]].to_numpy(dtype=np.float64, na_value=np.nan)
+                    fit = shared.fit(indep_vars, dep_var)
+                    if fit is None:
+                        # Distinto patrón de NaN: Gram propio del subconjunto
+                        return ols_engine.fit_ols_array(data, indep_vars, dep_var, rows=train_rows)
+                    return ols_engine.with_residual_pass(fit, data, train_rows)
+
+                spec = (dep_var, tuple(indep_vars), split_seed)
+                fit = model_cache.cached_model("ols", fingerprint, spec, fit_model)
+
+                _show_model_tables(fit)
+
+                test = df[indep_vars + [dep_var]].to_numpy(dtype=np.float64, na_value=np.nan)[test_rows]
+                test = test[~np.isnan(test).any(axis=1)]
+                if len(test):
+                    rmse = np.sqrt(np.mean((test[:, -1] - fit.predict(test[:, :-1])) ** 2))
+                    st.write(f"**Test RMSE ({len(test)} rows):** {rmse:.4f}")
+
+                st.subheader("📉 Residual & Influence Plots (training rows)")
+                smoother = st.radio("〰️ Trend line:", residual_diagnostics.SMOOTHERS, horizontal=True,
+                                    key="ols_smoother")
+
+                def influence_frame():
+                    train = df[indep_vars + [dep_var]].iloc[train_rows]
+                    train = train[train.notna().all(axis=1)]
+                    values = train.to_numpy(dtype=np.float64)
+                    return residual_diagnostics.influence(fit, values[:, :-1], values[:, -1], index=train.index)
+
+                try:
+                    frame = model_cache.cached_model("ols_influence", fingerprint, spec, influence_frame)
+                except ValueError as e:
+                    st.warning(f"⚠️ {e}")
+                else:
+                    plot_cache.show_plot(plot_cache.cached_plot(
+                        "ols_diagnostics", fingerprint, spec + (smoother,),
+                        lambda: residual_diagnostics.diagnostic_figure(frame, len(fit.params), smoother)
+                    ))
+                    top, n_flagged, threshold = residual_diagnostics.influential_rows(frame)
+                    st.write(f"**Most influential rows** — {n_flagged} of {len(frame)} have Cook's D > 4/n = {threshold:.3g}")
+                    st.dataframe(top.round(4))
+
+                complete = df[indep_vars + [dep_var]].dropna().to_numpy(dtype=np.float64)
+                resampling.show_resampling("ols", complete, indep_vars, fingerprint, (dep_var, tuple(indep_vars)),
+                                           key="ols_resampling")
 
                 st.success("✅ Linear regression analysis completed successfully.")
         else:
@@ -1,63 +1,152 @@
 import streamlit as st
-import pandas as pd
-import statsmodels.api as sm
+import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, confusion_matrix
+from sklearn.metrics import confusion_matrix
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.linear_model import LogisticRegression
-from sklearn.preprocessing import StandardScaler
+from modules import data_loader, logit_engine, model_cache, plot_cache, resampling
+
+TABLE_STYLE = {
+    'background-color': '#ffffff',
+    'color': '#0d2b45',
+    'border-color': '#4d82bc',
+    'font-family': 'Roboto',
+    'font-size': '14px'
+}
+# Columnas de texto con más niveles que esto no se ofrecen como predictores categóricos
+MAX_CATEGORY_LEVELS = 1000
+
+
+def _show_model_tables(fit):
+    if not fit.converged:
+        st.warning(f"⚠️ IRLS did not converge in {fit.iterations} iterations; estimates may be unreliable.")
+    st.subheader("📊 Model Summary")
+    st.write(fit.model_table().style.set_properties(**TABLE_STYLE, width='200px'))
+
+    st.subheader("📈 Coefficients and Odds Ratios")
+    st.write(fit.coef_table().style.set_properties(**TABLE_STYLE))
+
+
+def _roc_figure(roc, title):
+    fig, ax = plt.subplots(figsize=(5, 4))
+    ax.plot(roc.fpr, roc.tpr, color="#4d82bc", label=f"AUC = {roc.auc:.4f}")
+    ax.plot([0, 1], [0, 1], linestyle="--", color="gray", linewidth=1)
+    ax.set_xlabel("False Positive Rate", fontsize=9)
+    ax.set_ylabel("True Positive Rate", fontsize=9)
+    ax.set_title(title, fontsize=12)
+    ax.legend(loc="lower right", fontsize=9)
+    return fig
+
+
+def _run_streaming_logit(y_col, x_cols):
+    path = data_loader.server_file_picker("logit_stream_path")
+    if path is None:
+        return
+    positive_text = st.text_input("✅ Value of Y coded as 1 (positive class):", value="1", key="logit_stream_positive")
+    chunksize = st.number_input("📦 Rows per chunk", min_value=10_000, max_value=5_000_000, value=500_000,
+                                step=100_000, key="logit_stream_chunk")
+    if not st.button("▶️ Run Streaming Logistic Regression"):
+        return
+    try:
+        positive = float(positive_text)
+    except ValueError:
+        positive = positive_text
+    try:
+        with st.spinner("Streaming through the file (one pass per IRLS iteration)..."):
+            fit = logit_engine.fit_logit_stream(lambda: path, data_loader.detect_format(path), x_cols, y_col,
+                                                positive, chunksize=int(chunksize))
+    except Exception as e:
+        st.error(f"❌ Could not fit the model on the file: {e}")
+        return
+    _show_model_tables(fit)
+    st.subheader("📉 ROC Curve (all rows)")
+    st.pyplot(_roc_figure(fit.in_sample_roc, f"ROC Curve ({logit_engine.ROC_BINS} probability bins)"))
+
 
 def run_logistic_regression(df):
     st.header("📗 Logistic Regression")
 
     if df is not None:
         st.subheader("📄 Preview of Uploaded Dataset")
-        
-        numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns.tolist()
+
+        numeric_cols = df.select_dtypes(include='number').columns.tolist()
 
         if len(numeric_cols) >= 2:
             y_col = st.selectbox("🎯 Select dependent (binary) variable (Y):", numeric_cols, key="logreg_y")
             x_cols = st.multiselect("🔢 Select one or more independent variable(s) (X):",
                                     [col for col in numeric_cols if col != y_col], key="logreg_x_multi")
+            category_options = [col for col in df.columns if col not in numeric_cols
+                                and df[col].nunique() <= MAX_CATEGORY_LEVELS]
+            cat_cols = st.multiselect("🏷️ Categorical predictors (sparse one-hot, first level as reference):",
+                                      category_options, key="logreg_cat_multi") if category_options else []
+
+            if (x_cols or cat_cols) and y_col:
+                source = st.radio("🗂️ Data source:", ["Uploaded data (80/20 train/test split)",
+                                                      "Large file on the server (streamed, all rows)"],
+                                  horizontal=True, key="logit_source")
+                if source.startswith("Large file"):
+                    if not x_cols:
+                        st.warning("⚠️ Streaming fits use numeric predictors only.")
+                        return
+                    _run_streaming_logit(y_col, x_cols)
+                    return
+
+                data = df[x_cols + cat_cols + [y_col]].dropna()
+                classes = np.sort(data[y_col].unique())
+
+                if len(classes) == 2:
+                    st.write(f"**Positive class (coded 1):** {classes[1]}")
+                    y = (data[y_col].to_numpy() == classes[1]).astype(np.float64)
+                    X, names = logit_engine.design_matrix(data, x_cols, cat_cols)
+                    train_rows, test_rows = train_test_split(np.arange(len(data)), test_size=0.2, random_state=42)
+
+                    # Ajuste en las unidades originales de X: coeficientes y odds ratios interpretables
+                    fingerprint = model_cache.frame_fingerprint(df)
+                    spec = (y_col, tuple(x_cols), tuple(cat_cols))
+                    try:
+                        fit = model_cache.cached_model(
+                            "logit", fingerprint, spec,
+                            lambda: logit_engine.fit_logit(X[train_rows], y[train_rows], names, y_col)
+                        )
+                    except ValueError as e:
+                        st.error(f"❌ {e}")
+                        return
+
+                    _show_model_tables(fit)
+
+                    prob = fit.predict(X[test_rows])
+                    y_test, y_pred = y[test_rows], (prob >= 0.5).astype(np.float64)
+                    roc = logit_engine.roc_curve(y_test, prob)
+
+                    st.subheader("📊 Model Performance (test set)")
+                    st.write(f"**Accuracy:** {np.mean(y_pred == y_test):.4f}")
+                    st.write(f"**AUC:** {roc.auc:.4f}")
 
-            if x_cols and y_col:
-                data = df[x_cols + [y_col]].dropna()
-                X = data[x_cols]
-                y = data[y_col]
-
-                if y.nunique() == 2:
-                    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-                    scaler = StandardScaler()
-                    X_train_scaled = scaler.fit_transform(X_train)
-                    X_test_scaled = scaler.transform(X_test)
-
-                    model = LogisticRegression()
-                    model.fit(X_train_scaled, y_train)
-                    y_pred = model.predict(X_test_scaled)
-
-                    st.subheader("📊 Model Performance")
-                    acc = accuracy_score(y_test, y_pred)
-                    st.write(f"**Accuracy:** {acc:.4f}")
-                    st.subheader("📈 Model Coefficients")
-                    st.write("**Intercept (β₀):**", model.intercept_[0])
-                    for feature, coef in zip(x_cols, model.coef_[0]):
-                        st.write(f"**{feature} (β):** {coef:.4f}")
-                    
                     st.subheader("📋 Confusion Matrix")
-                    cm = confusion_matrix(y_test, y_pred)
+                    cm = confusion_matrix(y_test, y_pred, labels=[0.0, 1.0])
                     fig, ax = plt.subplots(figsize=(15, 4), dpi=100)
-                    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', ax=ax, cbar=False, annot_kws={"size": 10})
+                    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', ax=ax, cbar=False, annot_kws={"size": 10},
+                                xticklabels=classes, yticklabels=classes)
                     ax.set_xlabel("Predicted", fontsize=9)
                     ax.set_ylabel("Actual", fontsize=9)
                     ax.set_title("Confusion Matrix", fontsize=12)
                     ax.tick_params(axis='both', labelsize=9)
                     st.pyplot(fig)
+
+                    st.subheader("📉 ROC Curve")
+                    plot_cache.show_plot(plot_cache.cached_plot(
+                        "logit_roc", fingerprint, spec, lambda: _roc_figure(roc, "ROC Curve (test set)")
+                    ))
+
+                    if x_cols and not cat_cols:
+                        resampling.show_resampling(
+                            "logit", data[x_cols + [y_col]].to_numpy(dtype=float), x_cols, fingerprint,
+                            (y_col, tuple(x_cols)), key="logit_resampling"
+                        )
                 else:
                     st.error("❌ Dependent variable must be binary (contain only two distinct values).")
-                    
-                        
-        
+
+
+
         else:
             st.warning("⚠️ Please upload a dataset with at least two numeric columns.")
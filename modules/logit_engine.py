@@ -0,0 +1,331 @@
+"""Logistic regression by chunked IRLS (Newton-Raphson), dense or sparse, in memory or streamed.
+
+Each iteration is one pass over the rows in blocks that adds up the
+log-likelihood, the score Xᵀ(y - μ) and the information XᵀWX, so memory is
+O(p²) plus one block; a file larger than RAM is simply re-read once per
+iteration. The model is fitted on the original (unscaled) predictors and the
+inference matches ``statsmodels.Logit``: standard errors from the inverse
+information, z-tests, likelihood-ratio test and odds ratios.
+"""
+import datetime
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.special import expit
+from modules import data_loader, distributions, parallel
+
+IRLS_MAX_ITER = 35
+IRLS_TOL = 1e-8
+# Filas por bloque en memoria / por tarea en paralelo
+BLOCK_ROWS = 250_000
+PARALLEL_MIN_ROWS = 5_000_000
+# Intervalos de probabilidad para la curva ROC cuando las puntuaciones no caben en memoria
+ROC_BINS = 4096
+
+
+class IRLSAccumulator:
+    """Mergeable log-likelihood, score and information of one pass at fixed ``beta``.
+
+    Blocks hold the predictors without the intercept column (ndarray or CSR);
+    the intercept row/column is added here. Predicted probabilities are also
+    binned per class so a streamed fit still gets its ROC curve.
+    """
+
+    def __init__(self, n_params):
+        self.n = 0
+        self.n_pos = 0.0
+        self.llf = 0.0
+        self.score = np.zeros(n_params)
+        self.info = np.zeros((n_params, n_params))
+        self.pos_hist = np.zeros(ROC_BINS)
+        self.neg_hist = np.zeros(ROC_BINS)
+
+    def update(self, X, y, beta):
+        if X.shape[0] == 0:
+            return
+        eta = beta[0] + X @ beta[1:]
+        mu = expit(eta)
+        w = mu * (1 - mu)
+        r = y - mu
+        self.n += X.shape[0]
+        self.n_pos += float(y.sum())
+        self.llf += float(np.sum(y * eta - np.logaddexp(0, eta)))
+
+        self.score[0] += r.sum()
+        self.score[1:] += X.T @ r
+        wx = X.T @ w
+        self.info[0, 0] += w.sum()
+        self.info[0, 1:] += wx
+        self.info[1:, 0] += wx
+        if sparse.issparse(X):
+            self.info[1:, 1:] += (X.multiply(w[:, None]).T @ X).toarray()
+        else:
+            self.info[1:, 1:] += (X * w[:, None]).T @ X
+
+        bins = np.minimum((mu * ROC_BINS).astype(np.int64), ROC_BINS - 1)
+        self.pos_hist += np.bincount(bins, weights=y, minlength=ROC_BINS)
+        self.neg_hist += np.bincount(bins, weights=1 - y, minlength=ROC_BINS)
+
+    def merge(self, other):
+        self.n += other.n
+        self.n_pos += other.n_pos
+        self.llf += other.llf
+        self.score += other.score
+        self.info += other.info
+        self.pos_hist += other.pos_hist
+        self.neg_hist += other.neg_hist
+
+
+@dataclass(frozen=True)
+class ROCCurve:
+    fpr: np.ndarray
+    tpr: np.ndarray
+    thresholds: np.ndarray
+    auc: float
+
+
+def roc_from_counts(pos, neg, thresholds):
+    """ROC from positive/negative counts per threshold, ordered by decreasing score.
+
+    Cumulative sums give TP/FP at each cut; the trapezoidal area counts tied
+    scores as one half, i.e. it equals the Mann-Whitney AUC.
+    """
+    tp = np.concatenate(([0.0], np.cumsum(pos)))
+    fp = np.concatenate(([0.0], np.cumsum(neg)))
+    tpr, fpr = tp / tp[-1], fp / fp[-1]
+    auc = float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+    return ROCCurve(fpr=fpr, tpr=tpr, thresholds=np.concatenate(([np.inf], thresholds)), auc=auc)
+
+
+def roc_curve(y, score):
+    """Exact ROC/AUC: one sort, then counts per distinct score."""
+    y = np.asarray(y, dtype=np.float64)
+    score = np.asarray(score, dtype=np.float64)
+    order = np.argsort(-score, kind='stable')
+    score, y = score[order], y[order]
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(score)) + 1))
+    pos = np.add.reduceat(y, starts)
+    neg = np.diff(np.append(starts, len(y))) - pos
+    return roc_from_counts(pos, neg, score[starts])
+
+
+@dataclass(frozen=True)
+class LogitFit:
+    y_name: str
+    params: pd.Series
+    cov: pd.DataFrame
+    n: int
+    n_pos: float
+    llf: float
+    iterations: int
+    converged: bool
+    in_sample_roc: ROCCurve = None
+
+    @property
+    def df_model(self):
+        return len(self.params) - 1
+
+    @property
+    def df_resid(self):
+        return self.n - len(self.params)
+
+    @property
+    def bse(self):
+        return np.sqrt(pd.Series(np.diag(self.cov), index=self.params.index))
+
+    @property
+    def zvalues(self):
+        return self.params / self.bse
+
+    @property
+    def pvalues(self):
+        return pd.Series(distributions.p_value("norm", self.zvalues.to_numpy()), index=self.params.index)
+
+    @property
+    def llnull(self):
+        # Modelo solo con intercepto: forma cerrada con la proporción de positivos
+        p = self.n_pos / self.n
+        return self.n_pos * np.log(p) + (self.n - self.n_pos) * np.log1p(-p)
+
+    @property
+    def prsquared(self):
+        return 1 - self.llf / self.llnull
+
+    @property
+    def llr(self):
+        return 2 * (self.llf - self.llnull)
+
+    @property
+    def llr_pvalue(self):
+        return distributions.sf("chi2", self.llr, self.df_model)
+
+    @property
+    def aic(self):
+        return -2 * self.llf + 2 * len(self.params)
+
+    @property
+    def bic(self):
+        return -2 * self.llf + np.log(self.n) * len(self.params)
+
+    def predict(self, X):
+        """Predicted probabilities for predictors ``X`` (ndarray or sparse, no intercept column)."""
+        return expit(self.params.iloc[0] + X @ self.params.iloc[1:].to_numpy())
+
+    def coef_table(self, alpha=0.05):
+        """``summary2().tables[1]`` plus odds ratios and their confidence interval."""
+        crit = distributions.critical_value("norm", alpha)
+        bse = self.bse
+        lower, upper = self.params - crit * bse, self.params + crit * bse
+        return pd.DataFrame({
+            'Coef.': self.params, 'Std.Err.': bse, 'z': self.zvalues, 'P>|z|': self.pvalues,
+            f'[{alpha / 2:g}': lower, f'{1 - alpha / 2:g}]': upper,
+            'Odds Ratio': np.exp(self.params), f'OR [{alpha / 2:g}': np.exp(lower), f'OR {1 - alpha / 2:g}]': np.exp(upper),
+        })
+
+    def model_table(self):
+        """Same rows and number formats as ``summary2().tables[0]`` for a Logit model."""
+        left = [
+            ("Model:", "Logit"),
+            ("Dependent Variable:", self.y_name),
+            ("Date:", datetime.datetime.now().strftime("%Y-%m-%d %H:%M")),
+            ("No. Observations:", f"{int(self.n):#6d}"),
+            ("Df Model:", f"{int(self.df_model):#6d}"),
+            ("Df Residuals:", f"{int(self.df_resid):#6d}"),
+            ("Converged:", f"{float(self.converged):#6.4f}"),
+        ]
+        right = [
+            ("Pseudo R-squared:", f"{self.prsquared:#8.3f}"),
+            ("AIC:", f"{self.aic:8.4f}"),
+            ("BIC:", f"{self.bic:8.4f}"),
+            ("Log-Likelihood:", f"{self.llf:#8.5g}"),
+            ("LL-Null:", f"{self.llnull:#8.5g}"),
+            ("LLR p-value:", f"{self.llr_pvalue:#8.4g}"),
+            ("No. Iterations:", f"{float(self.iterations):#8.4f}"),
+        ]
+        return pd.DataFrame([[a, b, c, d] for (a, b), (c, d) in zip(left, right)])
+
+
+def _newton_step(acc):
+    # Escalado de Jacobi: predictores en unidades muy distintas no degradan la resolución
+    d = 1 / np.sqrt(np.maximum(np.diag(acc.info), 1e-300))
+    scaled = acc.info * d[:, None] * d[None, :]
+    try:
+        inv = np.linalg.inv(scaled)
+    except np.linalg.LinAlgError:
+        raise ValueError("The information matrix is singular: some predictors are collinear or constant.")
+    return d * (inv @ (d * acc.score)), inv * d[:, None] * d[None, :]
+
+
+def fit_irls(run_pass, x_names, y_name, max_iter=IRLS_MAX_ITER, tol=IRLS_TOL):
+    """Newton-Raphson from β = 0; ``run_pass(beta)`` returns the ``IRLSAccumulator`` of a full pass."""
+    beta = np.zeros(len(x_names) + 1)
+    converged = False
+    for iteration in range(1, max_iter + 1):
+        acc = run_pass(beta)
+        if acc.n_pos in (0, acc.n):
+            raise ValueError("The dependent variable has a single class in the fitted rows.")
+        step, cov = _newton_step(acc)
+        beta = beta + step
+        if not np.all(np.isfinite(beta)):
+            raise ValueError("IRLS diverged (perfect separation?).")
+        if np.max(np.abs(step)) <= tol * (1 + np.max(np.abs(beta))):
+            converged = True
+            break
+    if np.exp(acc.llf / acc.n) > 1 - 1e-6:
+        raise ValueError("Perfect separation: the predictors classify every row, so the MLE does not exist.")
+
+    names = ['const'] + list(x_names)
+    thresholds = (np.arange(ROC_BINS, 0, -1) - 1) / ROC_BINS
+    return LogitFit(
+        y_name=y_name, params=pd.Series(beta, index=names), cov=pd.DataFrame(cov, index=names, columns=names),
+        n=int(acc.n), n_pos=acc.n_pos, llf=acc.llf, iterations=iteration, converged=converged,
+        in_sample_roc=roc_from_counts(acc.pos_hist[::-1], acc.neg_hist[::-1], thresholds),
+    )
+
+
+def one_hot_sparse(frame, columns):
+    """Drop-first one-hot CSR block of ``columns`` with statsmodels-style names ``col[T.level]``."""
+    blocks, names = [], []
+    for column in columns:
+        codes, levels = pd.factorize(frame[column], sort=True)
+        if (codes < 0).any():
+            raise ValueError(f"Column '{column}' has missing values.")
+        rows = np.flatnonzero(codes > 0)
+        blocks.append(sparse.csr_matrix((np.ones(len(rows)), (rows, codes[rows] - 1)),
+                                        shape=(len(frame), max(len(levels) - 1, 0))))
+        names += [f"{column}[T.{level}]" for level in levels[1:]]
+    return sparse.hstack(blocks, format='csr'), names
+
+
+def design_matrix(frame, numeric, categorical=()):
+    """Predictor block: dense ndarray, or CSR once one-hot (sparse) columns are included."""
+    dense = frame[list(numeric)].to_numpy(dtype=np.float64)
+    if not categorical:
+        return dense, list(numeric)
+    one_hot, names = one_hot_sparse(frame, categorical)
+    return sparse.hstack([sparse.csr_matrix(dense), one_hot], format='csr'), list(numeric) + names
+
+
+def _pass_task(arrays, task):
+    (start, stop), beta = task
+    X, y = arrays["X"], arrays["y"]
+    acc = IRLSAccumulator(len(beta))
+    for lo in range(start, stop, BLOCK_ROWS):
+        hi = min(lo + BLOCK_ROWS, stop)
+        X_block, y_block = X[lo:hi], y[lo:hi]
+        if not sparse.issparse(X_block):
+            keep = ~(np.isnan(X_block).any(axis=1) | np.isnan(y_block))
+            X_block, y_block = X_block[keep], y_block[keep]
+        acc.update(X_block, y_block, beta)
+    return acc
+
+
+def fit_logit(X, y, x_names, y_name, workers=None, **kwargs):
+    """Logit of 0/1 ``y`` on ``X`` (ndarray or scipy sparse, without intercept), in row blocks.
+
+    Dense rows with any NaN are skipped; sparse input must be complete. Large
+    dense inputs spread each pass over a process pool (X and y in shared
+    memory); sparse inputs are processed serially in CSR row blocks.
+    """
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    n = len(y)
+    if sparse.issparse(X):
+        X = sparse.csr_matrix(X, dtype=np.float64)
+        n_tasks = 1
+    else:
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        n_tasks = parallel.worker_count(workers) if n >= PARALLEL_MIN_ROWS else 1
+    bounds = np.linspace(0, n, n_tasks + 1).astype(int)
+    tasks = list(zip(bounds[:-1], bounds[1:]))
+
+    # Un solo pool (y una sola copia de X, y en memoria compartida) para todas las iteraciones
+    with parallel.TaskPool({"X": X, "y": y}, n_tasks) as pool:
+        def run_pass(beta):
+            acc = IRLSAccumulator(len(beta))
+            for part in pool.map(_pass_task, [(task, beta) for task in tasks]):
+                acc.merge(part)
+            return acc
+
+        return fit_irls(run_pass, x_names, y_name, **kwargs)
+
+
+def fit_logit_stream(open_source, file_format, x_names, y_name, positive, chunksize=500_000, **kwargs):
+    """Chunked IRLS over a file, re-read once per iteration; rows with missing values are skipped.
+
+    ``positive`` is the value of ``y_name`` coded as 1; any other value is 0.
+    """
+    columns = list(x_names) + [y_name]
+
+    def run_pass(beta):
+        acc = IRLSAccumulator(len(beta))
+        for chunk in data_loader.iter_chunks(open_source(), file_format, columns=columns, chunksize=chunksize):
+            chunk = chunk[columns].dropna()
+            X = chunk[list(x_names)].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            keep = ~np.isnan(X).any(axis=1)
+            y = (chunk[y_name].to_numpy() == positive).astype(np.float64)
+            acc.update(X[keep], y[keep], beta)
+        return acc
+
+    return fit_irls(run_pass, x_names, y_name, **kwargs)
+
@@ -0,0 +1,61 @@
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Thread-safe LRU map bounded by entry count and, optionally, total size.
+
+    ``sizeof`` returns the cost of a value (e.g. ``len`` for bytes); the oldest
+    entries are evicted until both limits hold again.
+    """
+
+    def __init__(self, max_entries=64, max_size=None, sizeof=None):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.sizeof = sizeof or (lambda value: 0)
+        self._data = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            if key in self._data:
+                self._size -= self.sizeof(self._data.pop(key))
+            self._data[key] = value
+            self._size += self.sizeof(value)
+            while self._data and (len(self._data) > self.max_entries or
+                                  (self.max_size is not None and self._size > self.max_size and len(self._data) > 1)):
+                _, evicted = self._data.popitem(last=False)
+                self._size -= self.sizeof(evicted)
+
+    def get_or_create(self, key, factory):
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def discard(self, key, value):
+        """Drop ``key`` only while it still maps to ``value`` (a newer entry is kept)."""
+        with self._lock:
+            if self._data.get(key) is value:
+                self._size -= self.sizeof(self._data.pop(key))
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,39 @@
+"""Fitted-model cache shared across Streamlit reruns.
+
+Keys are (kind, data fingerprint, spec), where spec holds everything the fit
+depends on (target, predictor tuple, split seed, ...). Entries only leave
+through LRU eviction; a different dataset simply has a different fingerprint.
+"""
+import streamlit as st
+from modules import data_loader, plot_cache
+from modules.lru_cache import LRUCache
+
+MAX_CACHED_MODELS = 64
+
+
+@st.cache_resource
+def _model_store():
+    return LRUCache(max_entries=MAX_CACHED_MODELS)
+
+
+def frame_fingerprint(df, columns=None):
+    """Fingerprint of the frame actually passed, restricted to ``columns`` when given.
+
+    The loaded dataset itself (the same object) reuses its upload fingerprint;
+    any other frame, e.g. a filtered or ``dropna``'d copy, is hashed, so it
+    never shares a key with the full dataset.
+    """
+    columns = None if columns is None else list(columns)
+    fingerprint = data_loader.dataset_fingerprint()
+    if fingerprint and df is st.session_state.get("uploaded_file"):
+        return fingerprint if columns is None else plot_cache.data_fingerprint(fingerprint, tuple(columns))
+    return plot_cache.data_fingerprint(df if columns is None else df[columns])
+
+
+def cached_model(kind, fingerprint, spec, fit):
+    """Return the cached result for (kind, fingerprint, spec); ``fit`` runs only on a miss."""
+    return _model_store().get_or_create((kind, fingerprint) + tuple(spec), fit)
+
+
+def clear_model_cache():
+    _model_store().clear()
@@ -0,0 +1,46 @@
+import numpy as np
+
+ADJUSTMENTS = {
+    "holm": "Holm (FWER)",
+    "fdr_bh": "Benjamini-Hochberg (FDR)",
+    "bonferroni": "Bonferroni (FWER)",
+}
+
+
+def bonferroni(p):
+    p = np.asarray(p, dtype=np.float64)
+    return np.minimum(p * p.size, 1.0)
+
+
+def holm(p):
+    """Holm step-down adjusted p-values (same as statsmodels ``multipletests(method='holm')``)."""
+    p = np.asarray(p, dtype=np.float64)
+    m = p.size
+    order = np.argsort(p, kind="stable")
+    adjusted = np.maximum.accumulate((m - np.arange(m)) * p[order])
+    out = np.empty(m)
+    out[order] = np.minimum(adjusted, 1.0)
+    return out
+
+
+def benjamini_hochberg(p):
+    """Benjamini-Hochberg step-up adjusted p-values (q-values)."""
+    p = np.asarray(p, dtype=np.float64)
+    m = p.size
+    order = np.argsort(p, kind="stable")[::-1]
+    adjusted = np.minimum.accumulate(p[order] * m / np.arange(m, 0, -1))
+    out = np.empty(m)
+    out[order] = np.minimum(adjusted, 1.0)
+    return out
+
+
+def adjust_pvalues(p, method="holm"):
+    """Adjust a vector of p-values; NaNs are ignored and kept in place."""
+    funcs = {"holm": holm, "fdr_bh": benjamini_hochberg, "bonferroni": bonferroni}
+    if method not in funcs:
+        raise ValueError(f"Unknown adjustment method: {method}")
+    p = np.asarray(p, dtype=np.float64)
+    out = np.full(p.shape, np.nan)
+    valid = ~np.isnan(p)
+    out[valid] = funcs[method](p[valid])
+    return out
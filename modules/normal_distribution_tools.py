@@ -1,5 +1,5 @@
 import streamlit as st
-from scipy.stats import norm
+from modules import distributions
 
 def run():
     st.header("📊 Normal Distribution Tools")
@@ -17,8 +17,8 @@ def run():
         x = st.number_input("Value of X", value=60.0)
 
         z = (x - mu) / sigma
-        p_less = norm.cdf(z)
-        p_greater = 1 - p_less
+        p_less = distributions.cdf("norm", z)
+        p_greater = distributions.sf("norm", z)
 
         st.markdown("### 🔍 Results")
         st.write(f"Z-Score: **{z:.4f}**")
@@ -31,7 +31,7 @@ def run():
         sigma = st.number_input("Population Std Dev (σ)", min_value=0.0001, value=10.0, key="sigma_x")
         prob = st.number_input("Desired P(X ≤ x)", min_value=0.0, max_value=1.0, value=0.95)
 
-        z = norm.ppf(prob)
+        z = distributions.ppf("norm", prob)
         x = mu + z * sigma
 
         st.markdown("### 🎯 Results")
@@ -50,8 +50,8 @@ def run():
         z_low = (x_low - mu) / sigma
         z_high = (x_high - mu) / sigma
 
-        p_low = norm.cdf(z_low)
-        p_high = norm.cdf(z_high)
+        p_low = distributions.cdf("norm", z_low)
+        p_high = distributions.cdf("norm", z_high)
         p_exact = p_high - p_low
 
         st.markdown("### 🧾 Results")
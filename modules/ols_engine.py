@@ -0,0 +1,426 @@
+import datetime
+from dataclasses import dataclass, replace
+import numpy as np
+import pandas as pd
+from modules import data_loader, distributions, parallel
+
+# Filas por bloque al acumular en memoria / por tarea en paralelo
+GRAM_BLOCK_ROWS = 250_000
+PARALLEL_MIN_ROWS = 5_000_000
+
+
+class GramAccumulator:
+    """Mergeable cross-products of Z = [X | y] for OLS with an intercept.
+
+    Sums are kept around a fixed shift (the first block's mean) so that
+    centring afterwards does not suffer from catastrophic cancellation:
+    s1 = Σ(z - shift) and s2 = Σ(z - shift)(z - shift)ᵀ. Memory is O(p²).
+    """
+
+    def __init__(self, n_columns):
+        self.n = 0
+        self.shift = np.zeros(n_columns)
+        self.s1 = np.zeros(n_columns)
+        self.s2 = np.zeros((n_columns, n_columns))
+
+    def update(self, block):
+        """Add the rows of a 2-D block (columns: X..., y); rows with NaN must be dropped first."""
+        block = np.asarray(block, dtype=np.float64)
+        if len(block) == 0:
+            return
+        if self.n == 0:
+            self.shift = block.mean(axis=0)
+        centered = block - self.shift
+        self.n += len(block)
+        self.s1 += centered.sum(axis=0)
+        self.s2 += centered.T @ centered
+
+    def merge(self, other):
+        if other.n == 0:
+            return
+        if self.n == 0:
+            self.shift = other.shift.copy()
+        # Llevar las sumas del otro acumulador a nuestro desplazamiento
+        d = other.shift - self.shift
+        s1 = other.s1 + other.n * d
+        self.s2 += other.s2 + np.outer(other.s1, d) + np.outer(d, other.s1) + other.n * np.outer(d, d)
+        self.s1 += s1
+        self.n += other.n
+
+    def subset(self, columns):
+        """Accumulator restricted to ``columns`` (indices), read from the sub-blocks."""
+        columns = np.asarray(columns)
+        sub = GramAccumulator(len(columns))
+        sub.n = self.n
+        sub.shift = self.shift[columns]
+        sub.s1 = self.s1[columns]
+        sub.s2 = self.s2[np.ix_(columns, columns)]
+        return sub
+
+    @property
+    def mean(self):
+        return self.shift + self.s1 / self.n
+
+    def scatter(self):
+        """Cross-products centred at the column means."""
+        return self.s2 - np.outer(self.s1, self.s1) / self.n
+
+    def raw_design_gram(self):
+        """Uncentred [1 | X]ᵀ[1 | X] (for the condition number)."""
+        p = len(self.shift) - 1
+        shift, s1 = self.shift[:p], self.s1[:p]
+        xx = self.s2[:p, :p] + np.outer(s1, shift) + np.outer(shift, s1) + self.n * np.outer(shift, shift)
+        total = s1 + self.n * shift
+        gram = np.empty((p + 1, p + 1))
+        gram[0, 0] = self.n
+        gram[0, 1:] = gram[1:, 0] = total
+        gram[1:, 1:] = xx
+        return gram
+
+
+class ResidualAccumulator:
+    """Mergeable residual moments plus the Durbin-Watson numerator (blocks merged in row order)."""
+
+    def __init__(self):
+        self.n = 0
+        self.power_sums = np.zeros(4)
+        self.dw_num = 0.0
+        self.first = None
+        self.last = None
+
+    def update(self, residuals):
+        residuals = np.asarray(residuals, dtype=np.float64)
+        if residuals.size == 0:
+            return
+        chunk = ResidualAccumulator()
+        chunk.n = residuals.size
+        chunk.power_sums = np.array([np.sum(residuals ** k) for k in (1, 2, 3, 4)])
+        chunk.dw_num = float(np.sum(np.diff(residuals) ** 2))
+        chunk.first, chunk.last = residuals[0], residuals[-1]
+        self.merge(chunk)
+
+    def merge(self, other):
+        if other.n == 0:
+            return
+        if self.n:
+            self.dw_num += (other.first - self.last) ** 2
+        else:
+            self.first = other.first
+        self.dw_num += other.dw_num
+        self.last = other.last
+        self.n += other.n
+        self.power_sums += other.power_sums
+
+    def diagnostics(self):
+        """Omnibus, Jarque-Bera, skew, kurtosis and Durbin-Watson as in statsmodels' summary2."""
+        n = self.n
+        s1, s2, s3, s4 = self.power_sums / n
+        m2 = s2 - s1 ** 2
+        m3 = s3 - 3 * s1 * s2 + 2 * s1 ** 3
+        m4 = s4 - 4 * s1 * s3 + 6 * s1 ** 2 * s2 - 3 * s1 ** 4
+        skew = m3 / m2 ** 1.5
+        kurtosis = m4 / m2 ** 2
+        jb = n / 6 * (skew ** 2 + (kurtosis - 3) ** 2 / 4)
+        omnibus = _skew_z(skew, n) ** 2 + _kurtosis_z(kurtosis, n) ** 2
+        return {
+            'omnibus': omnibus, 'omnibus_p': distributions.sf("chi2", omnibus, 2),
+            'skew': skew, 'kurtosis': kurtosis,
+            'durbin_watson': self.dw_num / self.power_sums[1],
+            'jarque_bera': jb, 'jarque_bera_p': distributions.sf("chi2", jb, 2),
+        }
+
+
+def _skew_z(b2, n):
+    # D'Agostino (igual que scipy.stats.skewtest), a partir del sesgo muestral
+    y = b2 * np.sqrt(((n + 1) * (n + 3)) / (6.0 * (n - 2)))
+    beta2 = 3.0 * (n ** 2 + 27 * n - 70) * (n + 1) * (n + 3) / ((n - 2.0) * (n + 5) * (n + 7) * (n + 9))
+    w2 = -1 + np.sqrt(2 * (beta2 - 1))
+    delta = 1 / np.sqrt(0.5 * np.log(w2))
+    alpha = np.sqrt(2.0 / (w2 - 1))
+    y = 1.0 if y == 0 else y
+    return delta * np.log(y / alpha + np.sqrt((y / alpha) ** 2 + 1))
+
+
+def _kurtosis_z(b2, n):
+    # Anscombe-Glynn (igual que scipy.stats.kurtosistest)
+    e = 3.0 * (n - 1) / (n + 1)
+    varb2 = 24.0 * n * (n - 2) * (n - 3) / ((n + 1) * (n + 1.0) * (n + 3) * (n + 5))
+    x = (b2 - e) / np.sqrt(varb2)
+    sqrtbeta1 = 6.0 * (n * n - 5 * n + 2) / ((n + 7) * (n + 9)) * np.sqrt((6.0 * (n + 3) * (n + 5)) / (n * (n - 2) * (n - 3)))
+    a = 6.0 + 8.0 / sqrtbeta1 * (2.0 / sqrtbeta1 + np.sqrt(1 + 4.0 / sqrtbeta1 ** 2))
+    term1 = 1 - 2 / (9.0 * a)
+    denom = 1 + x * np.sqrt(2 / (a - 4.0))
+    term2 = np.sign(denom) * ((1 - 2.0 / a) / abs(denom)) ** (1 / 3) if denom != 0 else np.nan
+    return (term1 - term2) / np.sqrt(2 / (9.0 * a))
+
+
+@dataclass(frozen=True)
+class OLSFit:
+    y_name: str
+    params: pd.Series
+    cov: pd.DataFrame
+    n: int
+    df_model: int
+    df_resid: int
+    ssr: float
+    centered_tss: float
+    condition_number: float
+    residuals: dict = None
+    # Media de X y factor de Cholesky de su matriz de dispersión centrada (para la diagonal de H)
+    x_mean: np.ndarray = None
+    scatter_chol: np.ndarray = None
+
+    @property
+    def bse(self):
+        return np.sqrt(pd.Series(np.diag(self.cov), index=self.params.index))
+
+    @property
+    def tvalues(self):
+        return self.params / self.bse
+
+    @property
+    def pvalues(self):
+        return pd.Series(distributions.p_value("t", self.tvalues.to_numpy(), self.df_resid), index=self.params.index)
+
+    @property
+    def scale(self):
+        return self.ssr / self.df_resid
+
+    @property
+    def rsquared(self):
+        return 1 - self.ssr / self.centered_tss
+
+    @property
+    def rsquared_adj(self):
+        return 1 - (self.n - 1) / self.df_resid * (1 - self.rsquared)
+
+    @property
+    def fvalue(self):
+        return (self.centered_tss - self.ssr) / self.df_model / self.scale
+
+    @property
+    def f_pvalue(self):
+        return distributions.sf("f", self.fvalue, self.df_model, self.df_resid)
+
+    @property
+    def llf(self):
+        return -self.n / 2 * (np.log(2 * np.pi) + np.log(self.ssr / self.n) + 1)
+
+    @property
+    def aic(self):
+        return -2 * self.llf + 2 * (self.df_model + 1)
+
+    @property
+    def bic(self):
+        return -2 * self.llf + np.log(self.n) * (self.df_model + 1)
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        return self.params.iloc[0] + X @ self.params.iloc[1:].to_numpy()
+
+    def coef_table(self, alpha=0.05):
+        """Same layout as ``summary2().tables[1]``."""
+        crit = distributions.critical_value("t", alpha, self.df_resid)
+        bse = self.bse
+        return pd.DataFrame({
+            'Coef.': self.params, 'Std.Err.': bse, 't': self.tvalues, 'P>|t|': self.pvalues,
+            f'[{alpha / 2:g}': self.params - crit * bse, f'{1 - alpha / 2:g}]': self.params + crit * bse,
+        })
+
+    def model_table(self):
+        """Same rows and number formats as ``summary2().tables[0]``."""
+        left = [
+            ("Model:", "OLS"),
+            ("Dependent Variable:", self.y_name),
+            ("Date:", datetime.datetime.now().strftime("%Y-%m-%d %H:%M")),
+            ("No. Observations:", f"{int(self.n):#6d}"),
+            ("Df Model:", f"{int(self.df_model):#6d}"),
+            ("Df Residuals:", f"{int(self.df_resid):#6d}"),
+            ("R-squared:", f"{self.rsquared:#8.3f}"),
+        ]
+        right = [
+            ("Adj. R-squared:", f"{self.rsquared_adj:#8.3f}"),
+            ("AIC:", f"{self.aic:8.4f}"),
+            ("BIC:", f"{self.bic:8.4f}"),
+            ("Log-Likelihood:", f"{self.llf:#8.5g}"),
+            ("F-statistic:", f"{self.fvalue:#8.4g}"),
+            ("Prob (F-statistic):", f"{self.f_pvalue:#6.3g}"),
+            ("Scale:", f"{self.scale:#8.5g}"),
+        ]
+        return _two_column_table(left, right)
+
+    def diagnostics_table(self):
+        """Same rows as ``summary2().tables[2]`` (needs the residual pass)."""
+        d = self.residuals
+        left = [("Omnibus:", f"{d['omnibus']:.3f}"), ("Prob(Omnibus):", f"{d['omnibus_p']:.3f}"),
+                ("Skew:", f"{d['skew']:.3f}"), ("Kurtosis:", f"{d['kurtosis']:.3f}")]
+        right = [("Durbin-Watson:", f"{d['durbin_watson']:.3f}"), ("Jarque-Bera (JB):", f"{d['jarque_bera']:.3f}"),
+                 ("Prob(JB):", f"{d['jarque_bera_p']:.3f}"), ("Condition No.:", f"{self.condition_number:.0f}")]
+        return _two_column_table(left, right)
+
+
+def _two_column_table(left, right):
+    return pd.DataFrame([[a, b, c, d] for (a, b), (c, d) in zip(left, right)])
+
+
+def fit_from_gram(acc, x_names, y_name):
+    """OLS with intercept from a ``GramAccumulator``.
+
+    Slopes solve the centred normal equations; the intercept's variance and
+    covariances are mapped back from the centred parametrisation.
+    """
+    p = len(x_names)
+    scatter = acc.scatter()
+    sxx, sxy, syy = scatter[:p, :p], scatter[:p, p], scatter[p, p]
+    sxx_inv = np.linalg.pinv(sxx, hermitian=True)
+    beta = sxx_inv @ sxy
+    rank = np.linalg.matrix_rank(sxx, hermitian=True)
+    ssr = max(float(syy - beta @ sxy), 0.0)
+    df_resid = acc.n - rank - 1
+    scale = ssr / df_resid
+
+    x_mean = acc.mean[:p]
+    intercept = acc.mean[p] - x_mean @ beta
+    cov = np.empty((p + 1, p + 1))
+    cov_beta = scale * sxx_inv
+    cov[1:, 1:] = cov_beta
+    cov[0, 1:] = cov[1:, 0] = -cov_beta @ x_mean
+    cov[0, 0] = scale / acc.n + x_mean @ cov_beta @ x_mean
+
+    try:
+        scatter_chol = np.linalg.cholesky(sxx)
+    except np.linalg.LinAlgError:
+        scatter_chol = None  # diseño de rango incompleto
+
+    eigvals = np.linalg.eigvalsh(acc.raw_design_gram())
+    condition_number = np.sqrt(eigvals[-1] / eigvals[0]) if eigvals[0] > 0 else np.inf
+    names = ['const'] + list(x_names)
+    return OLSFit(
+        y_name=y_name, params=pd.Series(np.concatenate(([intercept], beta)), index=names),
+        cov=pd.DataFrame(cov, index=names, columns=names),
+        n=int(acc.n), df_model=int(rank), df_resid=int(df_resid), ssr=ssr, centered_tss=float(syy),
+        condition_number=float(condition_number), x_mean=x_mean, scatter_chol=scatter_chol,
+    )
+
+
+def _complete_rows(block):
+    return block[~np.isnan(block).any(axis=1)]
+
+
+def gram_rows(data, rows):
+    """Serial ``GramAccumulator`` over ``data[rows]``, gathered in bounded row blocks."""
+    acc = GramAccumulator(data.shape[1])
+    for lo in range(0, len(rows), GRAM_BLOCK_ROWS):
+        acc.update(_complete_rows(data[rows[lo:lo + GRAM_BLOCK_ROWS]]))
+    return acc
+
+
+def _gram_task(arrays, bounds):
+    start, stop = bounds
+    return gram_rows(arrays["data"], arrays["rows"][start:stop])
+
+
+def _residual_task(arrays, bounds, params):
+    start, stop = bounds
+    data, rows = arrays["data"], arrays["rows"]
+    acc = ResidualAccumulator()
+    for lo in range(start, stop, GRAM_BLOCK_ROWS):
+        block = _complete_rows(data[rows[lo:min(lo + GRAM_BLOCK_ROWS, stop)]])
+        acc.update(block[:, -1] - params[0] - block[:, :-1] @ params[1:])
+    return acc
+
+
+def _residual_job(arrays, task):
+    bounds, params = task
+    return _residual_task(arrays, bounds, params)
+
+
+def _row_tasks(rows, workers):
+    n_tasks = parallel.worker_count(workers) if len(rows) >= PARALLEL_MIN_ROWS else 1
+    bounds = np.linspace(0, len(rows), n_tasks + 1).astype(int)
+    return list(zip(bounds[:-1], bounds[1:])), n_tasks
+
+
+def gram_array(data, rows, workers=None):
+    """``GramAccumulator`` of the complete rows among ``rows``; large inputs use the process pool."""
+    tasks, n_tasks = _row_tasks(rows, workers)
+    acc = GramAccumulator(data.shape[1])
+    for part in parallel.run_tasks(_gram_task, tasks, {"data": data, "rows": rows}, n_tasks):
+        acc.merge(part)
+    return acc
+
+
+def with_residual_pass(fit, data, rows, workers=None):
+    """Attach residual diagnostics from one ordered pass over ``data`` (columns: X..., y)."""
+    tasks, n_tasks = _row_tasks(rows, workers)
+    residuals = ResidualAccumulator()
+    params = fit.params.to_numpy()
+    jobs = [(task, params) for task in tasks]
+    for part in parallel.run_tasks(_residual_job, jobs, {"data": data, "rows": rows}, n_tasks):
+        residuals.merge(part)  # en orden de filas: el Durbin-Watson une los bordes
+    return replace(fit, residuals=residuals.diagnostics())
+
+
+def fit_ols_array(data, x_names, y_name, rows=None, workers=None):
+    """OLS on a 2-D array (columns: X..., y) restricted to ``rows``, in row blocks.
+
+    Rows with any NaN are skipped. Large problems split the rows over a
+    process pool; each worker returns a partial accumulator that is merged.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    rows = np.arange(len(data)) if rows is None else np.asarray(rows)
+    fit = fit_from_gram(gram_array(data, rows, workers), x_names, y_name)
+    return with_residual_pass(fit, data, rows, workers)
+
+
+class SharedGram:
+    """Gram matrix over every numeric column, built once, from which any subset model is solved.
+
+    Only valid for a subset whose complete rows are the same as those of the
+    whole column set; ``covers`` checks that with one bit-mask per column
+    that has missing values.
+    """
+
+    def __init__(self, data, names, rows, workers=None):
+        data = np.asarray(data, dtype=np.float64)
+        self.names = list(names)
+        self.rows = np.asarray(rows)
+        missing = np.isnan(data)[self.rows]
+        self.incomplete = int(missing.any(axis=1).sum())
+        self.nan_masks = {j: np.packbits(missing[:, j]) for j in np.flatnonzero(missing.any(axis=0))}
+        self.acc = gram_array(data, self.rows, workers)
+
+    def covers(self, columns):
+        if self.incomplete == 0:
+            return True
+        masks = [self.nan_masks[j] for j in columns if j in self.nan_masks]
+        if not masks:
+            return False
+        return int(np.unpackbits(np.bitwise_or.reduce(masks)).sum()) == self.incomplete
+
+    def fit(self, x_names, y_name):
+        """``OLSFit`` (without residual diagnostics) from the sub-blocks, or None if the NaN rows differ."""
+        columns = [self.names.index(name) for name in list(x_names) + [y_name]]
+        if not self.covers(columns):
+            return None
+        return fit_from_gram(self.acc.subset(columns), x_names, y_name)
+
+
+def fit_ols_stream(open_source, file_format, x_names, y_name, chunksize=500_000):
+    """Two passes over a file in chunks (Gram, then residuals): memory O(p²), not O(n·p)."""
+    columns = list(x_names) + [y_name]
+
+    def blocks():
+        for chunk in data_loader.iter_chunks(open_source(), file_format, columns=columns, chunksize=chunksize):
+            block = chunk[columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            yield _complete_rows(block)
+
+    acc = GramAccumulator(len(columns))
+    for block in blocks():
+        acc.update(block)
+    fit = fit_from_gram(acc, x_names, y_name)
+
+    residuals = ResidualAccumulator()
+    for block in blocks():
+        residuals.update(block[:, -1] - fit.predict(block[:, :-1]))
+    return replace(fit, residuals=residuals.diagnostics())
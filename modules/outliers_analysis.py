@@ -4,11 +4,12 @@ import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
 from scipy import stats
+from modules import plot_rendering, summary_kernel
 
 def run_outlier_analysis(df):
     st.header("📘 Outlier Detection")
 
-    numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns.tolist()
+    numeric_cols = df.select_dtypes(include='number').columns.tolist()
 
     if not numeric_cols:
         st.warning("⚠️ You need at least one numeric column.")
@@ -24,12 +25,9 @@ def run_outlier_analysis(df):
         z_scores = np.abs(stats.zscore(data))
         outliers = data[z_scores > threshold]
     else:
-        q1 = data.quantile(0.25)
-        q3 = data.quantile(0.75)
-        iqr = q3 - q1
-        lower = q1 - 1.5 * iqr
-        upper = q3 + 1.5 * iqr
-        outliers = data[(data < lower) | (data > upper)]
+        values = data.to_numpy(dtype=np.float64)
+        summary = summary_kernel.summarize(values)
+        outliers = data[summary.outlier_mask(values)] if summary is not None else data.iloc[:0]
 
     st.subheader("🔍 Outlier Summary")
     st.write(f"**Total values analyzed:** {len(data)}")
@@ -52,13 +50,12 @@ def run_outlier_analysis(df):
 
     # Histogram
     fig2, ax2 = plt.subplots(figsize=(3, 2))
-    sns.histplot(data, kde=True, ax=ax2, color='skyblue')
+    plot_rendering.histogram_with_kde(ax2, data, bins='auto', color='skyblue')
     ax2.set_title("Distribution with Outliers", fontsize=8)
     ax2.set_xlabel(selected_col, fontsize=6)
     ax2.set_ylabel("Frequency", fontsize=6)
     ax2.tick_params(labelsize=5)
-    for val in outliers:
-        ax2.axvline(val, color='red', linestyle='--', linewidth=0.5)
+    plot_rendering.mark_values(ax2, outliers, color='red', linestyle='--', linewidth=0.5)
     col1h, col2h, col3h = st.columns([1, 2, 1])
     with col2h:
         st.pyplot(fig2)
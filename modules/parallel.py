@@ -0,0 +1,128 @@
+"""Process-pool helpers that share large NumPy arrays through shared memory.
+
+Workers receive a (name, shape, dtype) handle instead of a pickled copy of
+each array, so fanning a task list out over many cores costs one copy of the
+data in total, not one per task.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+_WORKER_ARRAYS = {}
+_WORKER_SEGMENTS = []
+
+
+def worker_count(max_workers=None):
+    cpus = os.cpu_count() or 1
+    return max(1, min(max_workers or cpus, cpus))
+
+
+def spawn_seeds(seed, n):
+    """Independent, reproducible seeds for ``n`` workers/batches."""
+    return np.random.SeedSequence(seed).spawn(n)
+
+
+class SharedArray:
+    def __init__(self, array):
+        array = np.ascontiguousarray(array)
+        self.shape, self.dtype = array.shape, array.dtype
+        self.segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=self.segment.buf)[...] = array
+
+    @property
+    def handle(self):
+        return self.segment.name, self.shape, self.dtype.str
+
+    def release(self):
+        self.segment.close()
+        self.segment.unlink()
+
+
+def _attach(handle):
+    name, shape, dtype = handle
+    segment = shared_memory.SharedMemory(name=name)
+    _WORKER_SEGMENTS.append(segment)  # mantener viva la referencia mientras dure el worker
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+
+
+def _init_worker(handles):
+    _WORKER_ARRAYS.clear()
+    for key, handle in handles.items():
+        _WORKER_ARRAYS[key] = _attach(handle)
+
+
+def _call(job):
+    func, task = job
+    return func(_WORKER_ARRAYS, task)
+
+
+class TaskPool:
+    """Process pool whose workers attach to ``arrays`` once and serve several batches of tasks.
+
+    Use as a context manager; ``imap``/``map`` follow the ``run_tasks``
+    contract. Iterative fits (one batch per iteration) keep the shared-memory
+    copies and the worker processes alive between batches. With one worker
+    everything runs in-process.
+    """
+
+    def __init__(self, arrays=None, workers=None):
+        self.arrays = arrays or {}
+        self.workers = worker_count(workers)
+        self._shared, self._pool = {}, None
+
+    def __enter__(self):
+        if self.workers > 1:
+            try:
+                self._shared = {key: SharedArray(value) for key, value in self.arrays.items()}
+                handles = {key: value.handle for key, value in self._shared.items()}
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                 initargs=(handles,))
+            except BaseException:
+                self.close()
+                raise
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        for value in self._shared.values():
+            value.release()
+        self._shared = {}
+
+    def imap(self, func, tasks):
+        """Yield ``func(arrays, task)`` for each task, in task order."""
+        if self._pool is None:
+            for task in tasks:
+                yield func(self.arrays, task)
+            return
+        yield from self._pool.map(_call, [(func, task) for task in tasks])
+
+    def map(self, func, tasks):
+        return list(self.imap(func, tasks))
+
+
+def iter_tasks(func, tasks, arrays=None, workers=None):
+    """Yield ``func(arrays, task)`` for each task, in task order, computed on a process pool.
+
+    Same contract as ``run_tasks``. Closing the generator early (e.g. when a
+    stopping rule is met) cancels the tasks that have not started yet.
+    """
+    tasks = list(tasks)
+    workers = min(worker_count(workers), len(tasks)) if tasks else 1
+    with TaskPool(arrays, workers) as pool:
+        yield from pool.imap(func, tasks)
+
+
+def run_tasks(func, tasks, arrays=None, workers=None):
+    """Return ``[func(arrays, task) for task in tasks]``, spread over a process pool.
+
+    ``func`` must be a module-level function. ``arrays`` is a dict of NumPy
+    arrays placed in shared memory once; workers see read-only views of them.
+    With one worker (or one task) everything runs in-process.
+    """
+    return list(iter_tasks(func, tasks, arrays, workers))
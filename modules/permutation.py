@@ -0,0 +1,327 @@
+"""Permutation (randomization) tests: two samples, one-way ANOVA and χ² independence.
+
+Each batch of permutations is an index matrix with one row per permutation;
+it is gathered from the data and reduced to the test statistic in a few
+array operations (group sums via ``reduceat``, contingency counts via one
+``bincount``). Batches run as ``parallel.iter_tasks`` tasks, each with its
+own SeedSequence child, and are consumed in task order, so the p-value for a
+seed does not depend on the number of workers. Monte-Carlo runs stop as soon
+as a Clopper–Pearson interval for the p-value lies entirely on one side of
+α. Two-sample tests small enough to enumerate are exact.
+"""
+from dataclasses import dataclass
+from itertools import combinations, islice
+from math import comb
+import numpy as np
+import matplotlib.pyplot as plt
+import streamlit as st
+from modules import distributions, model_cache, parallel, plot_cache
+
+# Permutaciones por tarea: unidad de reparto entre núcleos y de comprobación de parada
+TASK_PERMUTATIONS = 1_000
+# Celdas (permutaciones × filas) por lote dentro de una tarea: acota la memoria
+BATCH_CELLS = 1 << 22
+MIN_PERMUTATIONS = 1_000
+STOP_CONFIDENCE = 0.99
+# Reordenaciones distintas hasta las que el test de dos muestras se enumera entero
+EXACT_LIMIT = 1_000_000
+# Filas × permutaciones a partir de las cuales compensa abrir el pool
+PARALLEL_MIN_WORK = 50_000_000
+# Estadísticos guardados (por tarea / en total si es exacto) para dibujar la distribución nula
+NULL_SAMPLE = 500
+EXACT_NULL_SAMPLE = 10_000
+TIE_TOLERANCE = 1e-9
+
+STATISTICS = {
+    "mean_diff": "Difference in means (equivalent to Student's t)",
+    "welch_t": "Welch t",
+    "f": "One-way ANOVA F",
+    "chi2": "Pearson χ²",
+}
+ALTERNATIVES = {"two-sided": "two-sided", "greater": "greater (right-tailed)", "less": "less (left-tailed)"}
+
+
+@dataclass(frozen=True)
+class _Design:
+    kind: str
+    sizes: tuple
+    total: float = 0.0
+    total_sq: float = 0.0
+    expected: tuple = ()
+
+
+@dataclass(frozen=True)
+class PermutationResult:
+    statistic: str
+    observed: float
+    p_value: float
+    n_permutations: int
+    exact: bool
+    stopped_early: bool
+    ci_low: float
+    ci_high: float
+    null_sample: np.ndarray
+
+    def summary_rows(self):
+        method = "Exact (all rearrangements)" if self.exact else "Monte-Carlo"
+        rows = [
+            ("Statistic", STATISTICS[self.statistic]),
+            ("Observed value", f"{self.observed:.4f}"),
+            ("Permutation p-value", f"{self.p_value:.4g}"),
+            ("Method", method),
+            ("Permutations evaluated", f"{self.n_permutations:,}"),
+        ]
+        if not self.exact:
+            rows.append((f"{STOP_CONFIDENCE:.0%} CI for the p-value", f"({self.ci_low:.4g}, {self.ci_high:.4g})"))
+            rows.append(("Stopped early", "Yes" if self.stopped_early else "No"))
+        return rows
+
+
+def clopper_pearson(hits, n, confidence=STOP_CONFIDENCE):
+    """Exact binomial confidence interval for the proportion ``hits / n``."""
+    tail = (1 - confidence) / 2
+    low = distributions.ppf("beta", tail, hits, n - hits + 1) if hits > 0 else 0.0
+    high = distributions.isf("beta", tail, hits + 1, n - hits) if hits < n else 1.0
+    return low, high
+
+
+def _two_sample_statistic(design, sum_small, sq_small):
+    """Statistic from the sum (and sum of squares) of the smaller group, rows of a batch at once."""
+    n1, n2 = design.sizes
+    sum_large = design.total - sum_small
+    s1, s2 = (sum_small, sum_large) if n1 <= n2 else (sum_large, sum_small)
+    diff = s1 / n1 - s2 / n2
+    if design.kind == "mean_diff":
+        return diff
+    sq_large = design.total_sq - sq_small
+    q1, q2 = (sq_small, sq_large) if n1 <= n2 else (sq_large, sq_small)
+    var1 = np.maximum(q1 - s1 * s1 / n1, 0.0) / (n1 - 1)
+    var2 = np.maximum(q2 - s2 * s2 / n2, 0.0) / (n2 - 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return diff / np.sqrt(var1 / n1 + var2 / n2)
+
+
+def _subset_statistics(design, values, subset):
+    """Two-sample statistic for each row of ``subset`` (indices forming the smaller group)."""
+    gathered = values[subset]
+    sq = np.einsum("ij,ij->i", gathered, gathered) if design.kind == "welch_t" else None
+    return _two_sample_statistic(design, gathered.sum(axis=1), sq)
+
+
+def _grouped_statistics(design, permuted):
+    """F or χ² for each row of ``permuted`` (data reordered; groups are contiguous runs of columns)."""
+    sizes = np.asarray(design.sizes)
+    if design.kind == "f":
+        n, k = permuted.shape[1], len(sizes)
+        sums = np.add.reduceat(permuted, np.r_[0, np.cumsum(sizes)[:-1]], axis=1)
+        ssb = np.sum(sums * sums / sizes, axis=1) - design.total ** 2 / n
+        ssw = design.total_sq - design.total ** 2 / n - ssb
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (ssb / (k - 1)) / (ssw / (n - k))
+    expected = np.asarray(design.expected)
+    n_rows, n_cols = expected.shape
+    rows = np.repeat(np.arange(n_rows), sizes)
+    cells = (np.arange(len(permuted))[:, None] * n_rows + rows) * n_cols + permuted
+    observed = np.bincount(cells.ravel(), minlength=len(permuted) * n_rows * n_cols)
+    observed = observed.reshape(len(permuted), n_rows, n_cols)
+    return np.sum((observed - expected) ** 2 / expected, axis=(1, 2))
+
+
+def _random_statistics(design, values, rng, count):
+    n = len(values)
+    if design.kind in ("mean_diff", "welch_t"):
+        m = min(design.sizes)
+        # Un subconjunto aleatorio de tamaño m basta: argpartition de claves uniformes (O(n) por fila)
+        keys = rng.random((count, n))
+        return _subset_statistics(design, values, np.argpartition(keys, m - 1, axis=1)[:, :m])
+    index = np.tile(np.arange(n), (count, 1))
+    rng.permuted(index, axis=1, out=index)
+    return _grouped_statistics(design, values[index])
+
+
+def _exceeds(statistics, observed, alternative):
+    tolerance = TIE_TOLERANCE * max(1.0, abs(observed))
+    # Una reordenación sin variabilidad (Welch t = 0/0) cuenta como empate, no se descarta en silencio
+    undefined = np.isnan(statistics)
+    if alternative == "greater":
+        return (statistics >= observed - tolerance) | undefined
+    if alternative == "less":
+        return (statistics <= observed + tolerance) | undefined
+    return (np.abs(statistics) >= abs(observed) - tolerance) | undefined
+
+
+def _permutation_task(arrays, task):
+    design, alternative, observed, seed, count = task
+    values = arrays["values"]
+    rng = np.random.default_rng(seed)
+    batch = max(1, BATCH_CELLS // len(values))
+    hits, null = 0, []
+    for start in range(0, count, batch):
+        statistics = _random_statistics(design, values, rng, min(batch, count - start))
+        hits += int(np.count_nonzero(_exceeds(statistics, observed, alternative)))
+        null.append(statistics[:NULL_SAMPLE - sum(len(part) for part in null)])
+    return hits, count, np.concatenate(null)
+
+
+def _exact_two_sample(design, values, observed, alternative):
+    n, m = len(values), min(design.sizes)
+    total = comb(n, m)
+    batch = max(1, BATCH_CELLS // m)
+    rearrangements = combinations(range(n), m)
+    # La enumeración va en orden lexicográfico: el histograma usa posiciones al azar, no las primeras
+    keep = np.sort(np.random.default_rng(0).choice(total, size=min(total, EXACT_NULL_SAMPLE), replace=False))
+    hits, null = 0, []
+    for start in range(0, total, batch):
+        count = min(batch, total - start)
+        flat = np.fromiter((i for subset in islice(rearrangements, count) for i in subset), dtype=np.int64,
+                           count=count * m)
+        statistics = _subset_statistics(design, values, flat.reshape(count, m))
+        hits += int(np.count_nonzero(_exceeds(statistics, observed, alternative)))
+        positions = keep[(keep >= start) & (keep < start + count)] - start
+        null.append(statistics[positions])
+    p = hits / total
+    return PermutationResult(design.kind, observed, p, total, True, False, p, p, np.concatenate(null))
+
+
+def _monte_carlo(design, values, observed, alternative, n_permutations, alpha, seed, workers, stop_early):
+    n_tasks = -(-n_permutations // TASK_PERMUTATIONS)
+    seeds = parallel.spawn_seeds(seed, n_tasks)
+    tasks = [(design, alternative, observed, child, min(TASK_PERMUTATIONS, n_permutations - i * TASK_PERMUTATIONS))
+             for i, child in enumerate(seeds)]
+    n_workers = parallel.worker_count(workers) if len(values) * n_permutations >= PARALLEL_MIN_WORK else 1
+
+    hits = done = 0
+    null, stopped = [], False
+    results = parallel.iter_tasks(_permutation_task, tasks, {"values": values}, n_workers)
+    try:
+        for task_hits, count, sample in results:
+            hits, done = hits + task_hits, done + count
+            null.append(sample)
+            if stop_early and MIN_PERMUTATIONS <= done < n_permutations:
+                low, high = clopper_pearson(hits, done)
+                if high < alpha or low > alpha:
+                    stopped = True
+                    break
+    finally:
+        results.close()
+    low, high = clopper_pearson(hits, done)
+    # (hits + 1) / (B + 1): la permutación observada cuenta, el p-valor nunca es 0
+    p = (hits + 1) / (done + 1)
+    return PermutationResult(design.kind, observed, p, done, False, stopped, low, high, np.concatenate(null))
+
+
+def two_sample_test(x, y, statistic="mean_diff", alternative="two-sided", n_permutations=10_000, alpha=0.05,
+                    seed=42, workers=None, exact="auto", stop_early=True):
+    """Permutation test of mean(x) = mean(y) with the mean difference or Welch t as statistic.
+
+    ``exact="auto"`` enumerates every split of the pooled data when there are
+    at most ``EXACT_LIMIT`` of them; otherwise ``n_permutations`` random splits
+    are drawn (stopping early when ``stop_early`` and the decision at ``alpha``
+    is settled). Two-sided p-values count rearrangements with |statistic| at
+    least the observed one.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    x, y = x[~np.isnan(x)], y[~np.isnan(y)]
+    if len(x) < 2 or len(y) < 2:
+        raise ValueError("Each sample needs at least two values.")
+    values = np.concatenate([x, y])
+    # Centrar no cambia las permutaciones y evita perder precisión en las sumas de cuadrados
+    values = values - values.mean()
+    design = _Design(statistic, (len(x), len(y)), float(values.sum()), float(np.dot(values, values)))
+    small = values[:len(x)] if len(x) <= len(y) else values[len(x):]
+    observed = float(_two_sample_statistic(design, small.sum(), np.dot(small, small)))
+    if not np.isfinite(observed):
+        raise ValueError("The samples have no variability within groups, so the Welch t statistic is "
+                         "undefined; use the mean difference instead.")
+    if exact is True or (exact == "auto" and comb(len(values), min(design.sizes)) <= EXACT_LIMIT):
+        return _exact_two_sample(design, values, observed, alternative)
+    return _monte_carlo(design, values, observed, alternative, n_permutations, alpha, seed, workers, stop_early)
+
+
+def anova_test(values, groups, n_permutations=10_000, alpha=0.05, seed=42, workers=None, stop_early=True):
+    """Permutation one-way ANOVA: F of ``values`` grouped by ``groups`` against random relabellings."""
+    values = np.asarray(values, dtype=np.float64)
+    groups = np.asarray(groups)
+    keep = ~np.isnan(values)
+    values, groups = values[keep], groups[keep]
+    labels, codes = np.unique(groups, return_inverse=True)
+    if len(labels) < 2:
+        raise ValueError("At least two groups are needed.")
+    order = np.argsort(codes, kind="stable")
+    values = values[order] - values.mean()
+    sizes = np.bincount(codes, minlength=len(labels))
+    if len(values) <= len(labels):
+        raise ValueError("There must be more observations than groups.")
+    design = _Design("f", tuple(int(s) for s in sizes), float(values.sum()), float(np.dot(values, values)))
+    observed = float(_grouped_statistics(design, values[None, :])[0])
+    if not np.isfinite(observed):
+        raise ValueError("The values have no variability within groups, so the F statistic is undefined.")
+    return _monte_carlo(design, values, observed, "greater", n_permutations, alpha, seed, workers, stop_early)
+
+
+def chi2_test(table, n_permutations=10_000, alpha=0.05, seed=42, workers=None, stop_early=True):
+    """Permutation χ² test of independence for a contingency table of counts (margins held fixed)."""
+    table = np.asarray(table, dtype=np.float64)
+    if np.any(table < 0) or not np.all(table == np.round(table)):
+        raise ValueError("The permutation χ² test needs non-negative integer counts.")
+    table = table.astype(np.int64)
+    table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+    if min(table.shape) < 2:
+        raise ValueError("The table needs at least two non-empty rows and columns.")
+    n_rows, n_cols = table.shape
+    # Una observación por unidad: filas contiguas, el valor es el código de columna
+    values = np.repeat(np.tile(np.arange(n_cols), n_rows), table.ravel())
+    expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / table.sum()
+    design = _Design("chi2", tuple(int(s) for s in table.sum(axis=1)),
+                     expected=tuple(map(tuple, expected)))
+    observed = float(np.sum((table - expected) ** 2 / expected))
+    return _monte_carlo(design, values, observed, "greater", n_permutations, alpha, seed, workers, stop_early)
+
+
+def show_permutation_test(run, fingerprint, spec, key, alpha=0.05):
+    """Expander with permutation-test controls; ``run(n_permutations, seed, stop_early)`` returns the result."""
+    with st.expander("🔀 Permutation test (distribution-free)"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            n_permutations = int(st.number_input("Permutations", min_value=1_000, max_value=1_000_000,
+                                                 value=10_000, step=1_000, key=f"{key}_perm_n"))
+        with col2:
+            seed = int(st.number_input("Seed", value=42, step=1, key=f"{key}_perm_seed"))
+        with col3:
+            stop_early = st.checkbox("Stop once decided", value=True, key=f"{key}_perm_stop",
+                                     help=f"Stop when the {STOP_CONFIDENCE:.0%} interval for the p-value "
+                                          f"lies entirely above or below α.")
+        run_spec = tuple(spec) + (n_permutations, seed, stop_early, alpha)
+        if st.button("▶️ Run Permutation Test", key=f"{key}_perm_button"):
+            st.session_state[f"{key}_perm_run"] = run_spec
+        if st.session_state.get(f"{key}_perm_run") != run_spec:
+            return
+
+        try:
+            with st.spinner("Permuting..."):
+                result = model_cache.cached_model(f"permutation_{key}", fingerprint, run_spec,
+                                                  lambda: run(n_permutations, seed, stop_early))
+        except Exception as e:
+            st.error(f"🚫 Error running the permutation test: {e}")
+            return
+
+        for label, value in result.summary_rows():
+            st.write(f"**{label}:** {value}")
+        if result.p_value < alpha:
+            st.success(f"✅ Reject H₀ at α = {alpha} (permutation p-value).")
+        else:
+            st.info(f"ℹ️ Fail to reject H₀ at α = {alpha} (permutation p-value).")
+
+        def draw():
+            fig, ax = plt.subplots(figsize=(6, 2.8))
+            null = result.null_sample[np.isfinite(result.null_sample)]
+            ax.hist(null, bins=40, color="#4d82bc", edgecolor="white")
+            ax.axvline(result.observed, color="#c0392b", linewidth=1.5, label="Observed")
+            ax.set_title("Permutation distribution (sample)", fontsize=9)
+            ax.tick_params(labelsize=7)
+            ax.legend(fontsize=7)
+            fig.tight_layout()
+            return fig
+
+        plot_cache.show_plot(plot_cache.cached_plot(f"permutation_{key}", fingerprint, run_spec, draw))
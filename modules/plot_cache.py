@@ -0,0 +1,66 @@
+"""Rendered-figure cache so Streamlit reruns don't redraw matplotlib/seaborn plots.
+
+Invalidation rule: the cache key is (PLOT_CACHE_VERSION, plot name, data
+fingerprint, plot spec). A figure is redrawn only when the data content, any
+parameter in the spec (columns, bins, thresholds, ...) or the cache version
+changes. Bump PLOT_CACHE_VERSION whenever drawing code changes; otherwise
+entries only leave through LRU eviction (entry count and total bytes).
+"""
+import hashlib
+import io
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import streamlit as st
+from modules.lru_cache import LRUCache
+
+PLOT_CACHE_VERSION = 2
+MAX_PLOT_ENTRIES = 128
+MAX_PLOT_BYTES = 64 * 2**20
+
+
+@st.cache_resource
+def _plot_store():
+    # Compartido entre sesiones: la clave ya identifica el contenido de los datos
+    return LRUCache(max_entries=MAX_PLOT_ENTRIES, max_size=MAX_PLOT_BYTES, sizeof=len)
+
+
+def data_fingerprint(*objects):
+    digest = hashlib.blake2b(digest_size=16)
+    for obj in objects:
+        if isinstance(obj, (pd.Series, pd.DataFrame)):
+            digest.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+            names = obj.columns if isinstance(obj, pd.DataFrame) else [obj.name]
+            digest.update(repr(list(names)).encode())
+        elif isinstance(obj, np.ndarray):
+            digest.update(np.ascontiguousarray(obj).tobytes())
+            digest.update(repr((obj.dtype.str, obj.shape)).encode())
+        else:
+            digest.update(repr(obj).encode())
+    return digest.hexdigest()
+
+
+def render_png(fig, dpi=100):
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight")
+    plt.close(fig)
+    return buf.getvalue()
+
+
+def cached_plot(name, fingerprint, spec, draw, dpi=100):
+    """Return PNG bytes for ``draw()`` (a function returning a Figure), drawing only on a miss."""
+    key = (PLOT_CACHE_VERSION, name, fingerprint, spec, dpi)
+    store = _plot_store()
+    png = store.get(key)
+    if png is None:
+        png = render_png(draw(), dpi=dpi)
+        store.put(key, png)
+    return png
+
+
+def show_plot(png, use_container_width=True):
+    st.image(png, use_container_width=use_container_width)
+
+
+def clear_plot_cache():
+    _plot_store().clear()
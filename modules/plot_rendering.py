@@ -0,0 +1,88 @@
+import numpy as np
+import seaborn as sns
+from scipy.stats import gaussian_kde
+
+# Por encima de estos tamaños se cambia a una representación de coste acotado
+SCATTER_MAX_POINTS = 20_000
+LINE_MAX_POINTS = 2_000
+KDE_MAX_POINTS = 20_000
+MARKER_MAX_LINES = 2_000
+
+
+def lttb(x, y, n_out):
+    """Largest-Triangle-Three-Buckets downsampling to ``n_out`` points (keeps first and last)."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return x, y
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return x[selected], y[selected]
+
+
+def line_plot(ax, x, y, max_points=LINE_MAX_POINTS, marker=None, **kwargs):
+    """``ax.plot`` that LTTB-downsamples long series (markers are dropped once downsampled)."""
+    x = np.asarray(x)
+    if not np.issubdtype(x.dtype, np.number):
+        x = np.arange(len(x))
+    if len(x) > max_points:
+        x, y = lttb(x, y, max_points)
+        marker = None
+    return ax.plot(x, y, marker=marker, **kwargs)
+
+
+def scatter_with_fit(ax, x, y, max_points=SCATTER_MAX_POINTS, line_color='red'):
+    """Scatter + regression line, switching to a hexbin density plot for large N."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if len(x) <= max_points:
+        sns.regplot(x=x, y=y, ax=ax, line_kws={'color': line_color})
+        return
+    ax.hexbin(x, y, gridsize=60, bins='log', mincnt=1, cmap='Blues')
+    slope, intercept = np.polyfit(x, y, 1)
+    grid = np.array([x.min(), x.max()])
+    ax.plot(grid, intercept + slope * grid, color=line_color)
+
+
+def histogram_with_kde(ax, data, bins=20, color=None, max_kde_points=KDE_MAX_POINTS, seed=0):
+    """Histogram with a KDE curve; the KDE is fitted on a sample once N is large."""
+    data = np.asarray(data, dtype=np.float64)
+    data = data[~np.isnan(data)]
+    if len(data) <= max_kde_points:
+        sns.histplot(data, kde=True, bins=bins, ax=ax, color=color)
+        return
+    counts, edges, _ = ax.hist(data, bins=bins, color=color, alpha=0.6, edgecolor='white')
+    sample = np.random.default_rng(seed).choice(data, size=max_kde_points, replace=False)
+    if np.ptp(sample) > 0:
+        grid = np.linspace(edges[0], edges[-1], 200)
+        # Escalar la densidad a conteos, como hace seaborn con kde=True
+        density = gaussian_kde(sample)(grid) * len(data) * (edges[1] - edges[0])
+        ax.plot(grid, density, color=color)
+    ax.set_ylabel("Count")
+
+
+def mark_values(ax, values, max_lines=MARKER_MAX_LINES, **kwargs):
+    """Vertical markers as a single LineCollection, quantized when there are too many."""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return None
+    if len(values) > max_lines:
+        # Una línea por "píxel" del eje es indistinguible de una por valor
+        lo, hi = values.min(), values.max()
+        if hi > lo:
+            values = np.unique(np.round((values - lo) / (hi - lo) * max_lines)) / max_lines * (hi - lo) + lo
+        else:
+            values = values[:1]
+    return ax.vlines(values, 0, 1, transform=ax.get_xaxis_transform(), **kwargs)
@@ -1,7 +1,7 @@
 import streamlit as st
-from scipy.stats import poisson
 import matplotlib.pyplot as plt
 import numpy as np
+from modules import distributions
 
 def run():
     st.header("🔢 Poisson Distribution Calculator")
@@ -18,18 +18,18 @@ def run():
     ])
 
     if calc_type == "P(X = x)":
-        prob = poisson.pmf(x, lam)
+        prob = distributions.pmf("poisson", x, lam)
     elif calc_type == "P(X ≤ x)":
-        prob = poisson.cdf(x, lam)
+        prob = distributions.cdf("poisson", x, lam)
     else:
-        prob = 1 - poisson.cdf(x - 1, lam)
+        prob = distributions.sf("poisson", x - 1, lam)
 
     st.markdown("### 📊 Result")
     st.write(f"**{calc_type} = {prob:.4f}**")
 
     st.markdown("### 📈 Poisson Distribution Plot")
     x_vals = np.arange(0, int(lam + 4 * np.sqrt(lam)) + 1)
-    y_vals = poisson.pmf(x_vals, lam)
+    y_vals = distributions.pmf("poisson", x_vals, lam)
 
     fig, ax = plt.subplots(figsize=(15, 5))
     bars = ax.bar(x_vals, y_vals, color="lightblue", edgecolor="black")
@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+from scipy.interpolate import CubicSpline, PchipInterpolator
+from modules import distributions, multiple_testing
+
+# Por debajo de este número de evaluaciones se llama a scipy directamente
+SR_EXACT_MAX = 48
+SR_COARSE_POINTS = 12
+SR_GRID_POINTS = 32
+# Nodos en df (espaciado logarítmico, como mucho un factor SR_DF_RATIO entre nodos)
+SR_DF_NODES = 8
+SR_DF_RATIO = 1.7
+# Con df pequeños (Welch en Games-Howell) la distribución cambia muy deprisa: nodos más densos
+SR_SMALL_DF = 5.0
+SR_SMALL_DF_RATIO = 1.15
+SR_P_FLOOR = 1e-300
+# Por debajo de este p no hace falta resolución: la cola se extrapola
+SR_P_TAIL = 1e-20
+
+
+def _sr_curve(k, df, q_max):
+    """log-sf of the studentized range on a grid in log(1 + q).
+
+    A coarse pass locates where the sf drops from ~1 to ~0; the fine grid is
+    spent only on that stretch.
+    """
+    def log_sf(grid):
+        values = np.log(np.clip(distributions.sf("studentized_range", grid, k, df), SR_P_FLOOR, 1.0))
+        # La cuadratura puede devolver colas ligeramente no monótonas: forzarlas
+        return np.minimum.accumulate(values)
+
+    coarse = np.expm1(np.linspace(0.0, np.log1p(q_max), SR_COARSE_POINTS))
+    coarse_sf = log_sf(coarse)
+    lo = max(np.searchsorted(-coarse_sf, -np.log1p(-1e-12)) - 1, 0)
+    hi = min(np.searchsorted(-coarse_sf, -np.log(SR_P_TAIL)), len(coarse) - 1)
+    fine = np.expm1(np.linspace(np.log1p(coarse[lo]), np.log1p(coarse[hi]), SR_GRID_POINTS))
+    grid = np.concatenate((coarse[:lo], fine, coarse[hi + 1:]))
+    values = np.minimum.accumulate(np.concatenate((coarse_sf[:lo], log_sf(fine), coarse_sf[hi + 1:])))
+    return np.log1p(grid), values
+
+
+def _df_nodes(df):
+    unique = np.unique(df)
+    if len(unique) <= SR_DF_NODES:
+        return unique
+    lo, hi = unique[0], unique[-1]
+    nodes = []
+    if lo < SR_SMALL_DF:
+        top = min(hi, SR_SMALL_DF)
+        nodes.append(np.geomspace(lo, top, int(np.ceil(np.log(top / lo) / np.log(SR_SMALL_DF_RATIO))) + 1))
+        lo = top
+    if hi > lo:
+        n_nodes = int(np.clip(np.ceil(np.log(hi / lo) / np.log(SR_DF_RATIO)) + 1, 2, SR_DF_NODES))
+        nodes.append(np.geomspace(lo, hi, n_nodes)[1 if nodes else 0:])
+    return np.concatenate(nodes)
+
+
+def _across_df(values, nodes, df):
+    """Cubic spline in log(df) through per-node rows ``values[node, pair]``, evaluated per pair."""
+    if len(nodes) == 1:
+        return values[0]
+    x = np.log(nodes)
+    coef = CubicSpline(x, values, axis=0).c
+    log_df = np.log(df)
+    idx = np.clip(np.searchsorted(x, log_df) - 1, 0, len(x) - 2)
+    dx = log_df - x[idx]
+    cols = np.arange(values.shape[1])
+    c = coef[:, idx, cols]
+    return ((c[0] * dx + c[1]) * dx + c[2]) * dx + c[3]
+
+
+def studentized_range_test(q, k, df, alpha=0.05):
+    """Upper-tail p-values and critical values of the studentized range for many pairs.
+
+    Each scipy evaluation is a numerical integral (~10 ms), so large batches
+    are answered from a few log-sf curves (one per df node, monotone
+    interpolation in q, cubic spline in log df) instead of one integral per
+    pair. Returns ``(p, q_crit)`` with the shape of ``q``.
+    """
+    q = np.asarray(q, dtype=np.float64)
+    df = np.broadcast_to(np.asarray(df, dtype=np.float64), q.shape)
+    nodes = _df_nodes(df)
+    if q.size <= SR_EXACT_MAX and len(nodes) <= 2:
+        crit = {d: distributions.ppf("studentized_range", 1 - alpha, k, d) for d in nodes}
+        return distributions.sf("studentized_range", q, k, df), np.vectorize(crit.get, otypes=[float])(df)
+
+    q_max = max(float(np.nanmax(q)), 10.0)
+    log_sf, q_crit = [], []
+    for node in nodes:
+        x, values = _sr_curve(k, node, q_max)
+        extra = q_max
+        while values[-1] > np.log(alpha):  # colas pesadas con df pequeños
+            extra *= 4
+            x, values = _sr_curve(k, node, extra)
+        log_sf.append(PchipInterpolator(x, values, extrapolate=True)(np.log1p(q)))
+        q_crit.append(np.expm1(np.interp(np.log(alpha), values[::-1], x[::-1])))
+    p = np.clip(np.exp(_across_df(np.vstack(log_sf), nodes, df)), 0.0, 1.0)
+    crit = _across_df(np.repeat(np.array(q_crit)[:, None], q.size, axis=1), nodes, df.ravel())
+    return p, crit.reshape(q.shape)
+
+
+def _pairs(gs):
+    i, j = np.triu_indices(gs.k, k=1)
+    return i, j, gs.mean[j] - gs.mean[i]
+
+
+def _pooled_msw(gs):
+    df_within = gs.n - gs.k
+    return gs.m2.sum() / df_within, df_within
+
+
+def tukey_hsd(gs, alpha=0.05):
+    """Tukey-Kramer HSD for every pair of groups from ``GroupStats`` (uses the pooled MSW).
+
+    Same columns as statsmodels' ``pairwise_tukeyhsd`` summary table, plus q.
+    """
+    msw, df_within = _pooled_msw(gs)
+    i, j, diff = _pairs(gs)
+    se = np.sqrt(msw / 2 * (1 / gs.count[i] + 1 / gs.count[j]))
+    q = np.abs(diff) / se
+    p_adj, q_crit = studentized_range_test(q, gs.k, df_within, alpha)
+    return pd.DataFrame({
+        'group1': gs.labels[i], 'group2': gs.labels[j], 'meandiff': diff, 'q': q,
+        'p-adj': p_adj, 'lower': diff - q_crit * se, 'upper': diff + q_crit * se,
+        'reject': p_adj < alpha,
+    })
+
+
+def games_howell(gs, alpha=0.05):
+    """Games-Howell comparisons: unequal variances, Welch df per pair."""
+    i, j, diff = _pairs(gs)
+    var_n = gs.variance / gs.count
+    a, b = var_n[i], var_n[j]
+    se = np.sqrt((a + b) / 2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        df = (a + b) ** 2 / (a ** 2 / (gs.count[i] - 1) + b ** 2 / (gs.count[j] - 1))
+        q = np.abs(diff) / se
+    # Grupos con n = 1 o sin varianza dejan el df de Welch indefinido: esos pares no se contrastan
+    valid = np.isfinite(df) & np.isfinite(q)
+    p_adj, q_crit = np.full(len(q), np.nan), np.full(len(q), np.nan)
+    if valid.any():
+        p_adj[valid], q_crit[valid] = studentized_range_test(q[valid], gs.k, df[valid], alpha)
+    table = pd.DataFrame({
+        'group1': gs.labels[i], 'group2': gs.labels[j], 'meandiff': diff, 'q': q, 'df': df,
+        'p-adj': p_adj, 'lower': diff - q_crit * se, 'upper': diff + q_crit * se,
+        'reject': p_adj < alpha,
+    })
+    if not valid.all():
+        table['note'] = np.where(valid, "", "skipped: a group has n < 2 or zero variance")
+    return table
+
+
+def pairwise_t(gs, alpha=0.05, adjust="holm"):
+    """Pairwise t-tests on the pooled MSW with Holm/BH/Bonferroni-adjusted p-values."""
+    msw, df_within = _pooled_msw(gs)
+    i, j, diff = _pairs(gs)
+    se = np.sqrt(msw * (1 / gs.count[i] + 1 / gs.count[j]))
+    t = diff / se
+    p = distributions.p_value("t", t, df_within)
+    p_adj = multiple_testing.adjust_pvalues(p, adjust)
+    return pd.DataFrame({
+        'group1': gs.labels[i], 'group2': gs.labels[j], 'meandiff': diff, 't': t,
+        'p-value': p, 'p-adj': p_adj, 'reject': p_adj < alpha,
+    })
+
+
+METHODS = {
+    "Tukey HSD": tukey_hsd,
+    "Games-Howell": games_howell,
+    "Pairwise t (Holm)": lambda gs, alpha: pairwise_t(gs, alpha, "holm"),
+    "Pairwise t (Benjamini-Hochberg)": lambda gs, alpha: pairwise_t(gs, alpha, "fdr_bh"),
+}
+
+
+def simultaneous_intervals(gs, alpha=0.05):
+    """Per-group mean ± half-width whose overlap matches the Tukey decision (balanced case)."""
+    msw, df_within = _pooled_msw(gs)
+    q_crit = distributions.ppf("studentized_range", 1 - alpha, gs.k, df_within)
+    return q_crit / np.sqrt(2) * np.sqrt(msw / gs.count)
@@ -10,7 +10,7 @@ def run_proportion_test(df):
 
     test_type = st.radio("Select test type:", ["One Proportion", "Two Proportions", "Fisher Exact Test"])
 
-    binary_cols = df.select_dtypes(include=["int64", "float64"]).columns.tolist()
+    binary_cols = df.select_dtypes(include='number').columns.tolist()
     if not binary_cols:
         st.warning("⚠️ No numeric columns found.")
         return
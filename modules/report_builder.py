@@ -0,0 +1,143 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from xml.sax.saxutils import escape
+import streamlit as st
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import landscape, letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+from modules.lru_cache import LRUCache
+
+FONT_PATH = "assets/fonts/ttf/DejaVuSans.ttf"
+MAX_CACHED_REPORTS = 32
+# Hilos para generar PDFs: ReportLab es Python puro, más hilos solo compiten por el GIL
+REPORT_WORKERS = 2
+# Columnas de datos por página en las tablas anchas (el resto continúa en otra sección)
+TABLE_PDF_COLUMNS = 12
+
+
+def _font_name():
+    # DejaVuSans cubre símbolos como x̄, ±, σ y subíndices que Helvetica no tiene
+    if "DejaVuSans" in pdfmetrics.getRegisteredFontNames():
+        return "DejaVuSans"
+    if os.path.exists(FONT_PATH):
+        pdfmetrics.registerFont(TTFont("DejaVuSans", FONT_PATH))
+        return "DejaVuSans"
+    return "Helvetica"
+
+
+def _styles():
+    font = _font_name()
+    styles = getSampleStyleSheet()
+    for style in styles.byName.values():
+        style.fontName = font
+    return font, styles
+
+
+def build_pdf(title, rows=(), images=(), paragraphs=()):
+    """Render a PDF entirely in memory.
+
+    ``rows`` are (label, value) pairs shown as a table, ``images`` are PNG bytes
+    and ``paragraphs`` are free text blocks placed after the table.
+    """
+    font, styles = _styles()
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, title=title,
+                            leftMargin=0.7 * inch, rightMargin=0.7 * inch, topMargin=0.7 * inch)
+
+    story = [Paragraph(escape(title), styles["Title"]), Spacer(1, 8)]
+    if rows:
+        table = Table([[str(label), str(value)] for label, value in rows], colWidths=[2.4 * inch, None])
+        table.setStyle(TableStyle([
+            ("FONTNAME", (0, 0), (-1, -1), font),
+            ("FONTSIZE", (0, 0), (-1, -1), 9),
+            ("TEXTCOLOR", (0, 0), (0, -1), colors.HexColor("#0d2b45")),
+            ("LINEBELOW", (0, 0), (-1, -1), 0.25, colors.HexColor("#4d82bc")),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ]))
+        story += [table, Spacer(1, 10)]
+    for text in paragraphs:
+        story += [Paragraph(escape(text), styles["BodyText"]), Spacer(1, 6)]
+    for png in images:
+        reader = ImageReader(io.BytesIO(png))
+        width, height = reader.getSize()
+        scale = min(doc.width / width, 0.8 * doc.height / height)
+        story += [Spacer(1, 8), Image(io.BytesIO(png), width=width * scale, height=height * scale)]
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def build_table_pdf(title, frame, paragraphs=()):
+    """Render a DataFrame as a landscape PDF grid; the header row repeats on every page."""
+    font, styles = _styles()
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=landscape(letter), title=title,
+                            leftMargin=0.5 * inch, rightMargin=0.5 * inch, topMargin=0.5 * inch)
+    story = [Paragraph(escape(title), styles["Title"]), Spacer(1, 6)]
+    for text in paragraphs:
+        story += [Paragraph(escape(text), styles["BodyText"]), Spacer(1, 6)]
+
+    labels = frame.index.to_flat_index()
+    row_labels = [" / ".join(map(str, label)) if isinstance(label, tuple) else str(label) for label in labels]
+    index_name = " / ".join(str(name) for name in frame.index.names if name is not None)
+    for start in range(0, frame.shape[1], TABLE_PDF_COLUMNS):
+        block = frame.iloc[:, start:start + TABLE_PDF_COLUMNS]
+        header = [index_name] + [str(column) for column in block.columns]
+        body = [[label] + [f"{value:g}" for value in values] for label, values in zip(row_labels, block.to_numpy())]
+        table = Table([header] + body, repeatRows=1)
+        table.setStyle(TableStyle([
+            ("FONTNAME", (0, 0), (-1, -1), font),
+            ("FONTSIZE", (0, 0), (-1, -1), 7),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.HexColor("#0d2b45")),
+            ("TEXTCOLOR", (0, 1), (0, -1), colors.HexColor("#0d2b45")),
+            ("LINEBELOW", (0, 0), (-1, 0), 0.5, colors.HexColor("#4d82bc")),
+            ("LINEAFTER", (0, 0), (0, -1), 0.5, colors.HexColor("#4d82bc")),
+            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#eef3f9")]),
+            ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
+        ]))
+        story += [table, Spacer(1, 12)]
+    doc.build(story)
+    return buffer.getvalue()
+
+
+@st.cache_resource
+def _report_store():
+    return LRUCache(max_entries=MAX_CACHED_REPORTS)
+
+
+@st.cache_resource
+def _report_pool():
+    return ThreadPoolExecutor(max_workers=REPORT_WORKERS, thread_name_prefix="report")
+
+
+def get_report(fingerprint, build):
+    """PDF bytes for ``fingerprint``; ``build`` runs on a miss and only successful builds are cached.
+
+    Builds run on a small dedicated pool whatever thread calls this, and the
+    pending future is stored, so concurrent clicks on the same report share
+    one build. A build that raises is dropped from the store.
+    """
+    store = _report_store()
+    future = store.get_or_create(fingerprint, lambda: _report_pool().submit(build))
+    try:
+        return future.result()
+    except Exception:
+        # Un fallo no se queda en caché: el siguiente clic lo vuelve a intentar
+        store.discard(fingerprint, future)
+        raise
+
+
+def report_download_button(label, fingerprint, build, file_name, key=None):
+    # El PDF se genera solo cuando el usuario pulsa el botón (data diferida)
+    st.download_button(
+        label=label,
+        data=lambda: get_report(fingerprint, build),
+        file_name=file_name,
+        mime="application/pdf",
+        key=key
+    )
@@ -0,0 +1,172 @@
+"""k-fold cross-validation and bootstrap refits for the regression pages.
+
+All folds and bootstrap batches go to one process pool; X and y live in
+shared memory (see ``parallel.run_tasks``), so each task only receives a fold
+number or a list of seeds. Every bootstrap replicate has its own
+SeedSequence child, so results do not depend on the number of workers.
+"""
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import streamlit as st
+from modules import logit_engine, model_cache, ols_engine, parallel, plot_cache
+
+# Filas × réplicas a partir de las cuales compensa abrir el pool
+PARALLEL_MIN_WORK = 2_000_000
+# Réplicas bootstrap por tarea (granularidad del reparto entre núcleos)
+BOOT_BATCH = 8
+
+
+def fold_assignments(n, k, seed):
+    """Fold number (0..k-1) of each row after a seeded shuffle."""
+    folds = np.empty(n, dtype=np.int64)
+    folds[np.random.default_rng(seed).permutation(n)] = np.arange(n) % k
+    return folds
+
+
+def _ols_metrics(data, train, test, names):
+    fit = ols_engine.fit_from_gram(ols_engine.gram_rows(data, train), names, "y")
+    row = dict(fit.params)
+    if len(test):
+        residuals = data[test, -1] - fit.predict(data[test, :-1])
+        row['RMSE'] = float(np.sqrt(np.mean(residuals ** 2)))
+    else:
+        row['RMSE'] = np.nan
+    return row
+
+
+def _logit_metrics(data, train, test, names):
+    X, y = data[:, :-1], data[:, -1]
+    if len(np.unique(y[train])) < 2:
+        # Con positivos raros un fold o réplica puede quedar con una sola clase: no se ajusta, queda NaN
+        return dict.fromkeys(['const', *names, 'Accuracy', 'AUC'], np.nan)
+    # Mismo IRLS sin escalar ni penalizar que la tabla principal del Logit: coeficientes comparables
+    try:
+        fit = logit_engine.fit_logit(X[train], y[train], names, "y", workers=1)
+    except ValueError:
+        # Separación perfecta o colinealidad en la muestra: el MLE no existe para esta réplica
+        return dict.fromkeys(['const', *names, 'Accuracy', 'AUC'], np.nan)
+    row = dict(fit.params)
+    if len(test):
+        prob = fit.predict(X[test])
+        row['Accuracy'] = float(np.mean((prob > 0.5) == y[test]))
+        both = len(np.unique(y[test])) == 2
+        row['AUC'] = logit_engine.roc_curve(y[test], prob).auc if both else np.nan
+    else:
+        row['Accuracy'] = row['AUC'] = np.nan
+    return row
+
+
+_METRICS = {"ols": _ols_metrics, "logit": _logit_metrics}
+
+
+def _resample_task(arrays, task):
+    kind, payload, names = task
+    data, folds = arrays["data"], arrays["folds"]
+    metrics = _METRICS[kind]
+    if payload[0] == "fold":
+        fold = payload[1]
+        train, test = np.flatnonzero(folds != fold), np.flatnonzero(folds == fold)
+        return [dict(metrics(data, train, test, names), Fold=fold + 1)]
+
+    rows = []
+    n = len(data)
+    for replicate, seed in payload[1]:
+        sample = np.random.default_rng(seed).integers(0, n, n)
+        out_of_bag = np.flatnonzero(np.bincount(sample, minlength=n) == 0)
+        rows.append(dict(metrics(data, sample, out_of_bag, names), Replicate=replicate + 1))
+    return rows
+
+
+def resample(kind, data, names, k=5, n_boot=200, seed=42, workers=None):
+    """k-fold CV and ``n_boot`` bootstrap refits of an OLS ("ols") or logistic ("logit") model.
+
+    ``data`` holds the predictors followed by the target, without missing
+    values. Returns (cv, bootstrap) DataFrames with one row per fold/replicate:
+    coefficients plus RMSE (OLS) or accuracy and AUC (logistic); bootstrap
+    metrics are measured on the out-of-bag rows.
+    """
+    data = np.ascontiguousarray(data, dtype=np.float64)
+    names = list(names)
+    seeds = parallel.spawn_seeds(seed, n_boot + 1)
+    folds = fold_assignments(len(data), k, seeds[0]) if k > 1 else np.zeros(len(data), dtype=np.int64)
+
+    tasks = [(kind, ("fold", fold), names) for fold in range(k)] if k > 1 else []
+    replicates = list(enumerate(seeds[1:]))
+    for start in range(0, n_boot, BOOT_BATCH):
+        tasks.append((kind, ("boot", replicates[start:start + BOOT_BATCH]), names))
+
+    work = len(data) * (k + n_boot)
+    n_workers = parallel.worker_count(workers) if work >= PARALLEL_MIN_WORK else 1
+    parts = parallel.run_tasks(_resample_task, tasks, {"data": data, "folds": folds}, n_workers)
+    rows = [row for part in parts for row in part]
+    cv = pd.DataFrame([row for row in rows if 'Fold' in row]).set_index('Fold') if k > 1 else pd.DataFrame()
+    boot = pd.DataFrame([row for row in rows if 'Replicate' in row])
+    return cv, boot.set_index('Replicate') if n_boot else boot
+
+
+def summarize(frame, alpha=0.05):
+    """Mean, SD and percentile interval of every column (coefficients and metrics)."""
+    return pd.DataFrame({
+        'Mean': frame.mean(),
+        'Std': frame.std(),
+        f'{100 * alpha / 2:g}%': frame.quantile(alpha / 2),
+        f'{100 * (1 - alpha / 2):g}%': frame.quantile(1 - alpha / 2),
+    })
+
+
+def show_resampling(kind, data, names, fingerprint, spec, key):
+    """Expander with k-fold CV / bootstrap controls, summary tables and distributions."""
+    with st.expander("🔁 Resampling: k-fold cross-validation & bootstrap"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            k = int(st.number_input("Folds (k)", min_value=2, max_value=20, value=5, key=f"{key}_k"))
+        with col2:
+            n_boot = int(st.number_input("Bootstrap refits (B)", min_value=0, max_value=5000, value=200,
+                                         step=50, key=f"{key}_b"))
+        with col3:
+            seed = int(st.number_input("Seed", value=42, step=1, key=f"{key}_seed"))
+        run_spec = tuple(spec) + (k, n_boot, seed)
+        if st.button("▶️ Run Resampling", key=f"{key}_run_button"):
+            st.session_state[f"{key}_run"] = run_spec
+        if st.session_state.get(f"{key}_run") != run_spec:
+            return
+
+        try:
+            with st.spinner(f"Running {k} folds and {n_boot} bootstrap refits..."):
+                cv, boot = model_cache.cached_model(
+                    f"resample_{kind}", fingerprint, run_spec,
+                    lambda: resample(kind, data, names, k=k, n_boot=n_boot, seed=seed)
+                )
+        except Exception as e:
+            st.error(f"🚫 Error during resampling: {e}")
+            return
+
+        skipped = int(cv['const'].isna().sum()) + (int(boot['const'].isna().sum()) if n_boot else 0)
+        if skipped:
+            st.warning(f"⚠️ {skipped} fold(s)/refit(s) could not be fitted (a single class or perfect "
+                       f"separation in the training rows) and were left out of the summaries.")
+
+        st.write(f"**{k}-fold cross-validation**")
+        st.dataframe(summarize(cv))
+        if n_boot:
+            st.write(f"**Bootstrap ({n_boot} refits, metrics on out-of-bag rows)**")
+            st.dataframe(summarize(boot))
+
+        frame = boot if n_boot else cv
+
+        def draw():
+            columns = list(frame.columns)
+            n_cols = min(4, len(columns))
+            n_rows = -(-len(columns) // n_cols)
+            fig, axes = plt.subplots(n_rows, n_cols, figsize=(3 * n_cols, 2.2 * n_rows), squeeze=False)
+            for ax, column in zip(axes.flat, columns):
+                ax.hist(frame[column].dropna(), bins=30, color="#4d82bc", edgecolor="white")
+                ax.set_title(column, fontsize=8)
+                ax.tick_params(labelsize=6)
+            for ax in axes.flat[len(columns):]:
+                ax.axis("off")
+            fig.tight_layout()
+            return fig
+
+        plot_cache.show_plot(plot_cache.cached_plot(f"resampling_{kind}", fingerprint, run_spec, draw))
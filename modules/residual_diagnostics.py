@@ -0,0 +1,129 @@
+"""Residual and influence diagnostics for ``OLSFit`` without forming the hat matrix.
+
+The leverage of row i is h_i = 1/n + ‖L⁻¹(x_i - x̄)‖², with L the Cholesky
+factor of the centred scatter matrix already computed by the fit: one
+triangular solve per block of rows, O(n·p²) time and O(block·p) memory.
+Trend lines use binned means (O(n)) or LOWESS on a fixed-size sample instead
+of LOWESS on every point (O(n²)), and plots draw a thinned set of points.
+"""
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from scipy import linalg
+from statsmodels.nonparametric.smoothers_lowess import lowess
+from modules import distributions
+
+BLOCK_ROWS = 250_000
+SMOOTH_BINS = 50
+LOWESS_SAMPLE = 2_000
+# Puntos dibujados como máximo en cada dispersión (y cuantiles del Q-Q)
+PLOT_POINTS = 20_000
+QQ_POINTS = 1_000
+SMOOTHERS = ["Binned means", f"LOWESS (sample of {LOWESS_SAMPLE:,})"]
+
+
+def hat_diagonal(fit, X):
+    """Diagonal of H = X(XᵀX)⁻¹Xᵀ for the rows ``X`` (predictors only) used in ``fit``."""
+    if fit.scatter_chol is None:
+        raise ValueError("Leverage needs a full-rank design (some predictors are collinear).")
+    X = np.asarray(X, dtype=np.float64)
+    h = np.empty(len(X))
+    for lo in range(0, len(X), BLOCK_ROWS):
+        z = linalg.solve_triangular(fit.scatter_chol, (X[lo:lo + BLOCK_ROWS] - fit.x_mean).T, lower=True)
+        h[lo:lo + BLOCK_ROWS] = 1 / fit.n + np.einsum('ij,ij->j', z, z)
+    return h
+
+
+def influence(fit, X, y, index=None):
+    """Fitted values, residuals, leverage, internally studentized residuals and Cook's distance."""
+    y = np.asarray(y, dtype=np.float64)
+    fitted = fit.predict(X)
+    resid = y - fitted
+    h = hat_diagonal(fit, X)
+    student = resid / np.sqrt(fit.scale * (1 - h))
+    cooks = student ** 2 / (fit.df_model + 1) * h / (1 - h)
+    return pd.DataFrame({'Fitted': fitted, 'Residual': resid, 'Leverage': h,
+                         'Std. Residual': student, "Cook's D": cooks}, index=index)
+
+
+def binned_smooth(x, y, bins=SMOOTH_BINS):
+    """Mean of ``y`` within quantile bins of ``x`` (x at the bin means)."""
+    edges = np.unique(np.quantile(x, np.linspace(0, 1, bins + 1)))
+    which = np.clip(np.searchsorted(edges, x, side='right') - 1, 0, len(edges) - 2)
+    count = np.bincount(which, minlength=len(edges) - 1)
+    keep = count > 0
+    x_mean = np.bincount(which, weights=x, minlength=len(edges) - 1)[keep] / count[keep]
+    y_mean = np.bincount(which, weights=y, minlength=len(edges) - 1)[keep] / count[keep]
+    return x_mean, y_mean
+
+
+def sampled_lowess(x, y, size=LOWESS_SAMPLE, seed=0):
+    rows = _sample_rows(len(x), size, seed)
+    fitted = lowess(y[rows], x[rows], frac=2 / 3, return_sorted=True)
+    return fitted[:, 0], fitted[:, 1]
+
+
+def _sample_rows(n, size, seed=0):
+    if n <= size:
+        return np.arange(n)
+    return np.sort(np.random.default_rng(seed).choice(n, size, replace=False))
+
+
+def _trend(ax, x, y, smoother):
+    tx, ty = sampled_lowess(x, y) if smoother.startswith("LOWESS") else binned_smooth(x, y)
+    ax.plot(tx, ty, color="#d62728", linewidth=1.5)
+
+
+def diagnostic_figure(frame, n_params, smoother=SMOOTHERS[0]):
+    """Residuals vs fitted, normal Q-Q, scale-location and residuals vs leverage (2×2)."""
+    fitted, resid = frame['Fitted'].to_numpy(), frame['Residual'].to_numpy()
+    student, h = frame['Std. Residual'].to_numpy(), frame['Leverage'].to_numpy()
+    # Muestra fija para dibujar, más las filas más influyentes (que no deben perderse al aclarar)
+    shown = np.union1d(_sample_rows(len(frame), PLOT_POINTS), np.argsort(frame["Cook's D"].to_numpy())[-100:])
+    point = dict(s=6, alpha=0.4, color="#4d82bc", edgecolors="none")
+
+    fig, axes = plt.subplots(2, 2, figsize=(12, 8))
+    ax = axes[0, 0]
+    ax.scatter(fitted[shown], resid[shown], **point)
+    _trend(ax, fitted, resid, smoother)
+    ax.axhline(0, color="gray", linestyle="--", linewidth=1)
+    ax.set(title="Residuals vs Fitted", xlabel="Fitted values", ylabel="Residuals")
+
+    # Q-Q sobre cuantiles de la muestra, no sobre cada punto
+    ax = axes[0, 1]
+    levels = (np.arange(1, QQ_POINTS + 1) - 0.5) / QQ_POINTS if len(frame) > QQ_POINTS \
+        else (np.arange(1, len(frame) + 1) - 0.5) / len(frame)
+    ax.scatter(distributions.ppf("norm", levels), np.quantile(student, levels), **point)
+    lim = np.abs(distributions.ppf("norm", levels[[0, -1]])).max()
+    ax.plot([-lim, lim], [-lim, lim], color="#d62728", linewidth=1)
+    ax.set(title="Normal Q-Q", xlabel="Theoretical quantiles", ylabel="Std. residual quantiles")
+
+    ax = axes[1, 0]
+    root = np.sqrt(np.abs(student))
+    ax.scatter(fitted[shown], root[shown], **point)
+    _trend(ax, fitted, root, smoother)
+    ax.set(title="Scale-Location", xlabel="Fitted values", ylabel="√|Std. residual|")
+
+    ax = axes[1, 1]
+    ax.scatter(h[shown], student[shown], **point)
+    # Contornos de Cook: D = r²·h / (p·(1-h))
+    grid = np.linspace(max(h.min(), 1e-12), h.max(), 200)
+    for level in (0.5, 1.0):
+        bound = np.sqrt(level * n_params * (1 - grid) / grid)
+        ax.plot(grid, bound, color="#d62728", linestyle="--", linewidth=1)
+        ax.plot(grid, -bound, color="#d62728", linestyle="--", linewidth=1)
+    spread = np.abs(student).max() * 1.1
+    ax.set_ylim(-spread, spread)
+    ax.axhline(0, color="gray", linewidth=1)
+    ax.set(title="Residuals vs Leverage (Cook's D 0.5, 1)", xlabel="Leverage", ylabel="Std. residual")
+
+    for ax in axes.flat:
+        ax.title.set_fontsize(11)
+    fig.tight_layout()
+    return fig
+
+
+def influential_rows(frame, top=10):
+    """Rows sorted by Cook's distance, with how many exceed the usual 4/n cut-off."""
+    threshold = 4 / len(frame)
+    return frame.nlargest(top, "Cook's D"), int((frame["Cook's D"] > threshold).sum()), threshold
@@ -1,15 +1,23 @@
 
 import numpy as np
 import streamlit as st
-from scipy import stats
 import matplotlib.pyplot as plt
-import seaborn as sns
-import io
-import tempfile
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
+from modules import bootstrap_engine, distributions, model_cache, plot_cache, plot_rendering, report_builder
 
-def run_sampling_analysis(series, confidence_level):
+INTERVAL_METHODS = {"t": "t interval (closed form)", **bootstrap_engine.METHODS}
+# Opcionales: piden potencias hasta la 4ª y medianas por réplica (unas 2× más lento que solo la media)
+EXTRA_STATISTICS = ("median", "var", "cv")
+
+
+def _bootstrap(series, n_boot, seed, statistics):
+    # Las réplicas no dependen del nivel de confianza: se guardan una vez por (datos, estadísticos, B, semilla)
+    return model_cache.cached_model(
+        "bootstrap", plot_cache.data_fingerprint(series), (statistics, n_boot, seed),
+        lambda: bootstrap_engine.bootstrap(series.to_numpy(), statistics, n_boot=n_boot, seed=seed)
+    )
+
+
+def run_sampling_analysis(series, confidence_level, method="t", n_boot=2_000, seed=42, extra_statistics=False):
     st.write("### 📊 Sampling Statistics")
 
     if confidence_level < 50 or confidence_level >= 100:
@@ -17,18 +25,37 @@ def run_sampling_analysis(series, confidence_level):
         return
 
     n = len(series)
+    if n < 3:
+        st.error("Please select a column with at least 3 non-missing values.")
+        return
     sample_mean = np.mean(series)
     sample_std = np.std(series, ddof=1)
     cv = (sample_std / sample_mean) * 100 
     se = sample_std / np.sqrt(n)
 
     alpha = 1 - (confidence_level / 100)
-    z_score = stats.norm.ppf(1 - alpha / 2)
-    margin_error = z_score * se
+    # σ desconocido: t de Student con n − 1 gl (converge a z para n grande)
+    t_score = distributions.critical_value("t", alpha, n - 1)
+    margin_error = t_score * se
 
     ci_lower = sample_mean - margin_error
     ci_upper = sample_mean + margin_error
 
+    result = None
+    if method != "t":
+        try:
+            with st.spinner(f"Bootstrapping {n_boot:,} resamples..."):
+                result = _bootstrap(series, n_boot, seed, ("mean",) + (EXTRA_STATISTICS if extra_statistics else ()))
+        except Exception as e:
+            st.error(f"🚫 Error running the bootstrap: {e}")
+            return
+        ci_lower, ci_upper = result.interval("mean", method, confidence_level / 100)
+        if not np.isfinite(ci_lower) or not np.isfinite(ci_upper):
+            st.error("🚫 The bootstrap interval could not be computed for this column.")
+            return
+    margin_text = f"±{margin_error:.4f}" if result is None else \
+        f"−{sample_mean - ci_lower:.4f} / +{ci_upper - sample_mean:.4f}"
+
     ucl = sample_mean + 3 * se
     lcl = sample_mean - 3 * se
 
@@ -36,94 +63,87 @@ def run_sampling_analysis(series, confidence_level):
     st.write(f"**Sample Mean (x̄):** {sample_mean:.4f}")
     st.write(f"**Sample Std Dev (s):** {sample_std:.4f}")
     st.write(f"**Standard Error (SE):** {se:.4f}")
-    st.write(f"**Z-critical ({confidence_level}%):** {z_score:.4f}")
-    st.write(f"**Margin of Error:** ±{margin_error:.4f}")
+    st.write(f"**Interval Method:** {INTERVAL_METHODS[method]}")
+    if result is None:
+        st.write(f"**T-critical ({confidence_level}%, df = {n - 1}):** {t_score:.4f}")
+    else:
+        st.write(f"**Bootstrap Resamples (B):** {n_boot:,} (seed {seed})")
+    st.write(f"**Margin of Error:** {margin_text}")
     st.write(f"**{confidence_level}% Confidence Interval:** ({ci_lower:.4f}, {ci_upper:.4f})")
     st.write(f"**Coefficient of Variation (CV):** {cv:.2f}%")
     st.write(f"**Upper Control Limit (UCL):** {ucl:.4f}")
     st.write(f"**Lower Control Limit (LCL):** {lcl:.4f}")
 
+    if result is not None:
+        st.write(f"#### 🔁 Bootstrap Intervals ({confidence_level}%)")
+        st.dataframe(result.table(confidence_level / 100).round(4), width="stretch")
+        if "median" in result.statistics:
+            st.caption("Studentized intervals need a per-resample standard error, so they are not given for the "
+                       "median.")
+
     st.write("\n### 📈 Visualizations")
-    fig, axs = plt.subplots(1, 3, figsize=(20, 5))
-
-    sns.histplot(series, kde=True, bins=20, ax=axs[0], color='skyblue')
-    axs[0].set_title("Sample Distribution")
-    axs[0].set_xlabel("Values")
-    axs[0].set_ylabel("Frequency")
-
-    axs[1].errorbar(x=0, y=sample_mean, yerr=margin_error, fmt='o', capsize=10, color='green')
-    axs[1].set_xlim(-1, 1)
-    axs[1].set_ylim(series.min() - se, series.max() + se)
-    axs[1].set_title("Confidence Interval")
-    axs[1].set_xticks([])
-    axs[1].set_ylabel("Value")
-
-    axs[2].plot(series.index, series.values, marker='o', linestyle='-', color='black')
-    axs[2].axhline(ucl, color='red', linestyle='--', label='UCL')
-    axs[2].axhline(sample_mean, color='blue', linestyle='-', label='Mean')
-    axs[2].axhline(lcl, color='red', linestyle='--', label='LCL')
-    axs[2].set_title("Control Limits")
-    axs[2].set_xlabel("Sample Index")
-    axs[2].set_ylabel("Value")
-    axs[2].legend()
-
-    plt.tight_layout()
-    st.pyplot(fig)
+
+    def draw():
+        fig, axs = plt.subplots(1, 3, figsize=(20, 5))
+
+        plot_rendering.histogram_with_kde(axs[0], series, bins=20, color='skyblue')
+        axs[0].set_title("Sample Distribution")
+        axs[0].set_xlabel("Values")
+        axs[0].set_ylabel("Frequency")
+
+        axs[1].errorbar(x=0, y=sample_mean, yerr=[[sample_mean - ci_lower], [ci_upper - sample_mean]], fmt='o', capsize=10, color='green')
+        axs[1].set_xlim(-1, 1)
+        axs[1].set_ylim(series.min() - se, series.max() + se)
+        axs[1].set_title(f"Confidence Interval ({INTERVAL_METHODS[method].split(' (')[0]})")
+        axs[1].set_xticks([])
+        axs[1].set_ylabel("Value")
+
+        plot_rendering.line_plot(axs[2], series.index, series.values, marker='o', linestyle='-', color='black')
+        axs[2].axhline(ucl, color='red', linestyle='--', label='UCL')
+        axs[2].axhline(sample_mean, color='blue', linestyle='-', label='Mean')
+        axs[2].axhline(lcl, color='red', linestyle='--', label='LCL')
+        axs[2].set_title("Control Limits")
+        axs[2].set_xlabel("Sample Index")
+        axs[2].set_ylabel("Value")
+        axs[2].legend()
+
+        plt.tight_layout()
+        return fig
+
+    fingerprint = plot_cache.data_fingerprint(series)
+    spec = (confidence_level, method) if result is None else (confidence_level, method, n_boot, seed)
+    png = plot_cache.cached_plot("sampling", fingerprint, spec, draw)
+    plot_cache.show_plot(png)
 
     # Exportación con ReportLab
     st.write("### 📤 Export Report as PDF")
 
-    # Generar PDF al vuelo
-    pdf_buffer = io.BytesIO()
-    c = canvas.Canvas(pdf_buffer, pagesize=letter)
-
-    y = 750
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(50, y, "📊 Sampling Report")
-
-    y -= 25  # bajar antes de comenzar con el contenido
-
-    c.setFont("Helvetica", 10)
-    line_spacing = 18
-
     report_values = [
         ("Sample Size (n):", n),
         ("Sample Mean (x̄):", f"{sample_mean:.4f}"),
         ("Sample Std Dev (s):", f"{sample_std:.4f}"),
         ("Standard Error (SE):", f"{se:.4f}"),
-        (f"Z-critical ({confidence_level}%):", f"{z_score:.4f}"),
-        ("Margin of Error:", f"±{margin_error:.4f}"),
+        ("Interval Method:", INTERVAL_METHODS[method]),
+        (f"T-critical ({confidence_level}%, df = {n - 1}):", f"{t_score:.4f}") if result is None
+        else ("Bootstrap Resamples (B):", f"{n_boot:,} (seed {seed})"),
+        ("Margin of Error:", margin_text),
         (f"{confidence_level}% Confidence Interval:", f"({ci_lower:.4f}, {ci_upper:.4f})"),
         ("Coefficient of Variation (CV):", f"{cv:.2f}%"),
         ("Upper Control Limit (UCL):", f"{ucl:.4f}"),
         ("Lower Control Limit (LCL):", f"{lcl:.4f}")
     ]
-
-    for label, value in report_values:
-        c.setFont("Helvetica-Bold", 10)
-        c.drawString(50, y, label)
-        c.setFont("Helvetica", 10)
-        c.drawString(200, y, str(value))
-        y -= line_spacing
-
-    # Calcular posición segura para el gráfico
-    graphic_y = y - 20
-    if graphic_y < 250:
-        graphic_y = 250
-
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as tmpfile:
-        fig.savefig(tmpfile.name, bbox_inches="tight")
-        img_path = tmpfile.name
-
-    c.drawImage(img_path, 50, 350, width=500, height=200, preserveAspectRatio=True, mask="auto")
-    c.save()
-
-    pdf_buffer.seek(0)
-
-    # Mostrar botón funcional
-    st.download_button(
-        label="📄 Download PDF Report",
-        data=pdf_buffer.getvalue(),
-        file_name="sampling_report.pdf",
-        mime="application/pdf"
+    if result is not None:
+        for statistic in result.statistics[1:]:
+            low, high = result.interval(statistic, method, confidence_level / 100)
+            if not (np.isfinite(low) and np.isfinite(high)):
+                continue
+            label = bootstrap_engine.STATISTICS[statistic]
+            text = f"({low * 100:.2f}%, {high * 100:.2f}%)" if statistic == "cv" else f"({low:.4f}, {high:.4f})"
+            report_values.append((f"{confidence_level}% CI for {label}:", text))
+
+    report_builder.report_download_button(
+        "📄 Download PDF Report",
+        ("sampling", fingerprint) + spec + (extra_statistics,),
+        lambda: report_builder.build_pdf("Sampling Report", rows=report_values, images=[png]),
+        "sampling_report.pdf"
     )
@@ -1,11 +1,11 @@
 import streamlit as st
-from scipy.stats import norm
 import numpy as np
 import matplotlib.pyplot as plt
+from modules import distributions
 
 def plot_distribution(z_score, tail="less"):
     x = np.linspace(-4, 4, 1000)
-    y = norm.pdf(x)
+    y = distributions.pdf("norm", x)
 
     fig, ax = plt.subplots(figsize=(15, 5))
     ax.plot(x, y, label="Standard Normal Distribution")
@@ -43,7 +43,7 @@ def run():
 
         se = sigma / np.sqrt(n)
         z = (x - mu) / se
-        p = norm.cdf(z) if direction == "P(X ≤ x)" else 1 - norm.cdf(z)
+        p = distributions.cdf("norm", z) if direction == "P(X ≤ x)" else distributions.sf("norm", z)
 
         st.markdown("### 🧾 Results")
         st.write(f"Standard Error (SE): **{se:.4f}**")
@@ -76,13 +76,13 @@ def run():
         st.write(f"Conditions: nP = {np_check:.2f}, n(1-P) = {nq_check:.2f} → {'✅ Normal Approx OK' if normal_ok else '❌ Use Binomial'}")
 
         if tail_type == "P(x̂ ≤ x)":
-            p = norm.cdf(z) if normal_ok else np.nan
+            p = distributions.cdf("norm", z) if normal_ok else np.nan
             st.write(f"Probability: **{p:.4f}**")
             if normal_ok:
                 plot_distribution(z, "less")
 
         elif tail_type == "P(x̂ > x)":
-            p = 1 - norm.cdf(z) if normal_ok else np.nan
+            p = distributions.sf("norm", z) if normal_ok else np.nan
             st.write(f"Probability: **{p:.4f}**")
             if normal_ok:
                 plot_distribution(z, "greater")
@@ -92,7 +92,7 @@ def run():
             b = st.number_input("Upper Bound (b)", min_value=0.0, max_value=1.0, value=0.4667)
             za = (a - P) / se
             zb = (b - P) / se
-            p = norm.cdf(zb) - norm.cdf(za) if normal_ok else np.nan
+            p = distributions.cdf("norm", zb) - distributions.cdf("norm", za) if normal_ok else np.nan
             st.write(f"Z-scores: a = {za:.4f}, b = {zb:.4f}")
             st.write(f"Probability between a and b: **{p:.4f}**")
             if normal_ok:
@@ -0,0 +1,182 @@
+import numpy as np
+import pandas as pd
+from modules import data_loader
+from modules.summary_kernel import SummaryStats
+
+
+class MomentAccumulator:
+    """Mergeable count/mean/M2/min/max (Welford updates combined with Chan's formula)."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+        chunk = MomentAccumulator()
+        chunk.n = values.size
+        chunk.mean = float(values.mean())
+        chunk.m2 = float(np.dot(values - chunk.mean, values - chunk.mean))
+        chunk.min = float(values.min())
+        chunk.max = float(values.max())
+        self.merge(chunk)
+
+    def merge(self, other):
+        if other.n == 0:
+            return
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else np.nan
+
+
+class KLLSketch:
+    """KLL quantile sketch: rank error shrinks roughly as 1/k, memory is O(k)."""
+
+    def __init__(self, k=1000, seed=None):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(8, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            buf = self.levels[level]
+            if len(buf) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                buf = np.sort(buf)
+                # Con tamaño impar, el último elemento se queda en su nivel
+                keep = buf[-1:] if len(buf) % 2 else buf[:0]
+                paired = buf[:len(buf) - len(keep)]
+                promoted = paired[self._rng.integers(2)::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.n += values.size
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, buf in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], buf])
+        self.n += other.n
+        self._compress()
+
+    def quantile(self, q):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(buf), 2.0 ** level) for level, buf in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, weights = items[order], weights[order]
+        # Rango aproximado del centro de cada item, en la escala 0..n-1 de la interpolación lineal
+        centers = (np.cumsum(weights) - weights / 2) / weights.sum() * self.n - 0.5
+        return np.interp(np.asarray(q) * (self.n - 1), centers, items)
+
+
+class HeavyHitters:
+    """Misra-Gries summary: every count is a lower bound, off by at most ``error_bound``."""
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.n = 0
+        self.counts = pd.Series(dtype=np.float64)
+        self.error_bound = 0.0
+
+    def _trim(self, counts):
+        if len(counts) > self.capacity:
+            cut = counts.nlargest(self.capacity + 1).iloc[-1]
+            counts = counts - cut
+            counts = counts[counts > 0]
+            self.error_bound += cut
+        return counts
+
+    def update(self, values):
+        values = pd.Series(values)
+        self.n += len(values)
+        chunk_counts = values.value_counts().astype(np.float64)
+        self.counts = self._trim(self.counts.add(chunk_counts, fill_value=0))
+
+    def merge(self, other):
+        self.n += other.n
+        self.error_bound += other.error_bound
+        self.counts = self._trim(self.counts.add(other.counts, fill_value=0))
+
+    def top(self, n=10):
+        return self.counts.nlargest(n)
+
+
+def iter_numeric_chunks(open_source, file_format, column, chunksize):
+    for chunk in data_loader.iter_chunks(open_source(), file_format, [column], chunksize):
+        values = pd.to_numeric(chunk[column], errors="coerce").to_numpy(dtype=np.float64)
+        yield values[~np.isnan(values)]
+
+
+def streaming_summary(open_source, file_format, column, chunksize=500_000, k=1000, capacity=1000,
+                      bins=20, max_outliers=100, seed=0):
+    """Two passes over ``column`` in chunks at constant memory.
+
+    ``open_source`` is a callable returning a fresh path or buffer for each pass.
+    Pass 1 feeds the moments, the quantile sketch and the heavy hitters; pass 2
+    counts outliers against the sketch IQR bounds and fills a fixed-range histogram.
+    """
+    moments = MomentAccumulator()
+    sketch = KLLSketch(k=k, seed=seed)
+    hitters = HeavyHitters(capacity=capacity)
+    for values in iter_numeric_chunks(open_source, file_format, column, chunksize):
+        moments.update(values)
+        sketch.update(values)
+        hitters.update(values)
+
+    if moments.n < 2:
+        return None
+
+    q1, median, q3 = sketch.quantile([0.25, 0.50, 0.75])
+    top = hitters.top(10)
+    summary = SummaryStats(
+        count=moments.n, mean=moments.mean, variance=moments.variance,
+        min=moments.min, max=moments.max,
+        q1=float(q1), median=float(median), q3=float(q3),
+        mode=top[top == top.max()].index.tolist() if len(top) else [],
+        top_values=top.index.to_numpy(), top_counts=top.to_numpy(),
+    )
+
+    edges = np.linspace(summary.min, summary.max, bins + 1)
+    hist = np.zeros(bins, dtype=np.int64)
+    n_outliers = 0
+    outlier_sample = []
+    for values in iter_numeric_chunks(open_source, file_format, column, chunksize):
+        hist += np.histogram(values, bins=edges)[0]
+        mask = summary.outlier_mask(values)
+        n_outliers += int(mask.sum())
+        if len(outlier_sample) < max_outliers:
+            outlier_sample.extend(values[mask][:max_outliers - len(outlier_sample)].tolist())
+
+    return {
+        'summary': summary,
+        'n_outliers': n_outliers,
+        'outlier_sample': outlier_sample,
+        'hist': (hist, edges),
+        'frequency_error_bound': hitters.error_bound,
+    }
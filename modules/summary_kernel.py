@@ -0,0 +1,175 @@
+from dataclasses import dataclass
+import numpy as np
+
+
+@dataclass(frozen=True)
+class SummaryStats:
+    count: int
+    mean: float
+    variance: float
+    min: float
+    max: float
+    q1: float
+    median: float
+    q3: float
+    mode: list
+    top_values: np.ndarray
+    top_counts: np.ndarray
+
+    @property
+    def std(self):
+        return float(np.sqrt(self.variance))
+
+    @property
+    def range(self):
+        return self.max - self.min
+
+    @property
+    def iqr(self):
+        return self.q3 - self.q1
+
+    @property
+    def lower_bound(self):
+        return self.q1 - 1.5 * self.iqr
+
+    @property
+    def upper_bound(self):
+        return self.q3 + 1.5 * self.iqr
+
+    def outlier_mask(self, values):
+        values = np.asarray(values)
+        return (values < self.lower_bound) | (values > self.upper_bound)
+
+    def as_dict(self):
+        # Mismas claves y orden que la tabla original de descriptive.py
+        return {
+            'Count': self.count,
+            'Mean': self.mean,
+            'Median': self.median,
+            'Mode': self.mode,
+            'Min': self.min,
+            'Max': self.max,
+            'Range': self.range,
+            'Variance': self.variance,
+            'Standard Deviation': self.std,
+            'Q1': self.q1,
+            'Q2 (Median)': self.median,
+            'Q3': self.q3,
+            'IQR': self.iqr
+        }
+
+
+def sorted_quantiles(sorted_values, qs):
+    # Interpolación lineal, igual que pandas.Series.quantile por defecto
+    pos = np.asarray(qs, dtype=np.float64) * (len(sorted_values) - 1)
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.minimum(lo + 1, len(sorted_values) - 1)
+    frac = pos - lo
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * frac
+
+
+def run_lengths(sorted_values):
+    """Distinct values and their counts from an already sorted array."""
+    starts = np.flatnonzero(np.concatenate(([True], sorted_values[1:] != sorted_values[:-1])))
+    counts = np.diff(np.append(starts, len(sorted_values)))
+    return sorted_values[starts], counts
+
+
+def summarize(values, top=10):
+    """Every descriptive statistic from one sort and one moments pass.
+
+    NaNs are dropped. Returns None when fewer than 2 values remain.
+    """
+    arr = np.ascontiguousarray(values, dtype=np.float64)
+    arr = np.sort(arr[~np.isnan(arr)])
+    n = arr.size
+    if n < 2:
+        return None
+
+    mean = arr.sum() / n
+    centered = arr - mean
+    variance = np.dot(centered, centered) / (n - 1)
+    q1, median, q3 = sorted_quantiles(arr, [0.25, 0.50, 0.75])
+
+    distinct, counts = run_lengths(arr)
+    mode = distinct[counts == counts.max()].tolist()
+    order = np.argsort(-counts, kind="stable")[:top]
+
+    return SummaryStats(
+        count=int(n), mean=float(mean), variance=float(variance),
+        min=float(arr[0]), max=float(arr[-1]),
+        q1=float(q1), median=float(median), q3=float(q3),
+        mode=mode, top_values=distinct[order], top_counts=counts[order],
+    )
+
+
+# A partir de este número de celdas el perfil se reparte entre procesos
+PARALLEL_MIN_CELLS = 50_000_000
+
+
+def _profile_block(arr):
+    """Summary statistics for every row of a 2-D float64 block (one row per column of the data)."""
+    if arr.shape[1] == 0:
+        arr = np.full((len(arr), 1), np.nan)
+    arr = np.sort(arr, axis=1)  # los NaN quedan al final de cada fila
+    counts = (~np.isnan(arr)).sum(axis=1)
+    valid = counts >= 2
+    # Con menos de 2 filas los índices se acotan al array; esas columnas salen NaN (salvo Count)
+    safe_counts = np.minimum(np.maximum(counts, 2), arr.shape[1])
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.nansum(arr, axis=1) / counts
+        variance = np.nansum((arr - mean[:, None]) ** 2, axis=1) / (counts - 1)
+
+    # Cuartiles con interpolación lineal, cada columna con su propio n
+    pos = np.outer(safe_counts - 1, [0.25, 0.50, 0.75])
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.minimum(lo + 1, (safe_counts - 1)[:, None])
+    q_lo = np.take_along_axis(arr, lo, axis=1)
+    q_hi = np.take_along_axis(arr, hi, axis=1)
+    q1, median, q3 = (q_lo + (q_hi - q_lo) * (pos - lo)).T
+    iqr = q3 - q1
+    n_outliers = ((arr < (q1 - 1.5 * iqr)[:, None]) | (arr > (q3 + 1.5 * iqr)[:, None])).sum(axis=1)
+
+    col_min = arr[:, 0]
+    col_max = arr[np.arange(len(arr)), safe_counts - 1]
+    mode = np.full(len(arr), np.nan)
+    mode_count = np.zeros(len(arr), dtype=np.int64)
+    for j in np.flatnonzero(valid):
+        distinct, run_counts = run_lengths(arr[j, :counts[j]])
+        best = run_counts.argmax()
+        mode[j], mode_count[j] = distinct[best], run_counts[best]
+
+    table = {
+        'Count': counts, 'Mean': mean, 'Median': median, 'Mode': mode, 'Mode Frequency': mode_count,
+        'Min': col_min, 'Max': col_max, 'Range': col_max - col_min, 'Variance': variance,
+        'Standard Deviation': np.sqrt(variance), 'Q1': q1, 'Q3': q3, 'IQR': iqr, 'Outliers (IQR)': n_outliers,
+    }
+    for key in table:
+        if key != 'Count':
+            table[key] = np.where(valid, table[key], np.nan)
+    return table
+
+
+def _profile_task(arrays, rows):
+    start, stop = rows
+    return _profile_block(arrays["data"][start:stop])
+
+
+def profile_frame(df, workers=None):
+    """Descriptive statistics for every column of a numeric DataFrame, one row per column.
+
+    Wide/large frames are split into column blocks processed in a process pool.
+    """
+    import pandas as pd
+    from modules import parallel
+
+    # Una fila contigua por columna del DataFrame
+    arr = np.ascontiguousarray(df.to_numpy(dtype=np.float64, na_value=np.nan).T)
+    if arr.size >= PARALLEL_MIN_CELLS and len(arr) > 1:
+        bounds = np.linspace(0, len(arr), min(parallel.worker_count(workers), len(arr)) + 1).astype(int)
+        parts = parallel.run_tasks(_profile_task, list(zip(bounds[:-1], bounds[1:])), {"data": arr}, workers)
+        table = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+    else:
+        table = _profile_block(arr)
+    return pd.DataFrame(table, index=pd.Index(df.columns, name='Column'))
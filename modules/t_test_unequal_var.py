@@ -1,7 +1,13 @@
 
 import streamlit as st
-from scipy.stats import t
 import numpy as np
+from modules import distributions, permutation, plot_cache
+
+ALTERNATIVES = {
+    "μ₁ ≠ μ₂ (Two-tailed)": "two-sided",
+    "μ₁ > μ₂ (Right-tailed)": "greater",
+    "μ₁ < μ₂ (Left-tailed)": "less",
+}
 
 def run():
     st.header("📊 T-Test for Independent Samples (Unequal Variances)")
@@ -16,10 +22,7 @@ def run():
 
         alpha = st.number_input("Significance Level (α)", min_value=0.01, max_value=0.10, step=0.01, value=0.05)
 
-        alternative = st.selectbox(
-            "Alternative Hypothesis (H₁)",
-            ["μ₁ ≠ μ₂ (Two-tailed)", "μ₁ > μ₂ (Right-tailed)", "μ₁ < μ₂ (Left-tailed)"]
-        )
+        alternative = st.selectbox("Alternative Hypothesis (H₁)", list(ALTERNATIVES))
 
         submitted = st.form_submit_button("Run Welch's T-Test")
 
@@ -38,11 +41,11 @@ def run():
             df = (var1/n1 + var2/n2)**2 / ((var1**2)/((n1**2)*(n1-1)) + (var2**2)/((n2**2)*(n2-1)))
 
             if alternative == "μ₁ ≠ μ₂ (Two-tailed)":
-                p_value = 2 * (1 - t.cdf(abs(t_stat), df))
+                p_value = distributions.p_value("t", t_stat, df)
             elif alternative == "μ₁ > μ₂ (Right-tailed)":
-                p_value = 1 - t.cdf(t_stat, df)
+                p_value = distributions.sf("t", t_stat, df)
             else:
-                p_value = t.cdf(t_stat, df)
+                p_value = distributions.cdf("t", t_stat, df)
 
             st.subheader("🧾 Results")
             st.write(f"T-Statistic: **{t_stat:.4f}**")
@@ -58,3 +61,15 @@ def run():
 
         except:
             st.error("❌ Please check your input data. It must be comma-separated numeric values.")
+
+    # Versión de permutación del mismo test; fuera del formulario para que su botón no lo oculte
+    try:
+        x1 = np.array([float(i.strip()) for i in data1.split(",")])
+        x2 = np.array([float(i.strip()) for i in data2.split(",")])
+    except ValueError:
+        return
+    tail = ALTERNATIVES[alternative]
+    permutation.show_permutation_test(
+        lambda n, seed, stop: permutation.two_sample_test(x1, x2, "welch_t", tail, n, alpha, seed, stop_early=stop),
+        plot_cache.data_fingerprint(x1, x2), ("welch_t", tail), "t_unequal", alpha=alpha
+    )
@@ -0,0 +1,210 @@
+"""Statistical reference tables computed on demand.
+
+Every builder evaluates the whole grid in one broadcast call to the
+distribution service (rows × columns at once) and returns a labelled
+DataFrame ready to display or export. Grids come from short text specs such
+as ``"1-30, 40, 60, 120, inf"`` (see ``parse_values``).
+"""
+import numpy as np
+import pandas as pd
+from modules import distributions
+
+# Límite de celdas por tabla: mantiene la página y el PDF manejables
+MAX_CELLS = 250_000
+DECIMALS = 4
+
+DEFAULT_DFS = "1-30, 40, 50, 60, 80, 100, 120, inf"
+DEFAULT_ALPHAS = "0.10, 0.05, 0.025, 0.01, 0.005, 0.001"
+DEFAULT_CHI2_AREAS = "0.995, 0.99, 0.975, 0.95, 0.90, 0.10, 0.05, 0.025, 0.01, 0.005"
+DEFAULT_PROBS = "0.05, 0.10, 0.20, 0.25, 0.30, 0.40, 0.50, 0.60, 0.70, 0.75, 0.80, 0.90, 0.95"
+
+
+def parse_values(text, integer=False):
+    """Parse ``"1-5, 10, 0.5, inf"`` into a sorted array of unique values (``a-b`` ranges are integers)."""
+    values = []
+    for token in str(text).replace(";", ",").split(","):
+        token = token.strip().lower()
+        if not token:
+            continue
+        try:
+            if token in ("inf", "∞"):
+                values.append(np.inf)
+                continue
+            if "-" not in token[1:]:
+                values.append(float(token))
+                continue
+            split = token.index("-", 1)
+            lo, hi = int(token[:split]), int(token[split + 1:])
+        except ValueError:
+            raise ValueError(f"Could not read '{token}' (use numbers, whole-number ranges like 1-30, or inf).")
+        # El rango se valida antes de expandirlo: "1-1000000000" no llega a crear la lista
+        if hi - lo + 1 > MAX_CELLS - len(values):
+            raise ValueError(f"The range '{token}' is too long (at most {MAX_CELLS:,} values in total).")
+        values.extend(range(lo, hi + 1))
+    if not values:
+        raise ValueError("Enter at least one value.")
+    if len(values) > MAX_CELLS:
+        raise ValueError(f"Too many values (at most {MAX_CELLS:,}).")
+    array = np.unique(np.asarray(values, dtype=np.float64))
+    if integer and not np.all((array == np.floor(array)) | np.isinf(array)):
+        raise ValueError("Degrees of freedom and counts must be whole numbers.")
+    return array
+
+
+def _label(value):
+    if np.isinf(value):
+        return "∞"
+    return f"{value:g}"
+
+
+def _check_cells(count):
+    # Se comprueba antes de construir la rejilla, no después
+    if count > MAX_CELLS:
+        raise ValueError(f"The table would have {int(count):,} cells (limit {MAX_CELLS:,}); narrow the grid.")
+
+
+def _frame(values, rows, columns, index_name, columns_name):
+    values = np.asarray(values)
+    _check_cells(values.size)
+    index = rows if isinstance(rows, pd.MultiIndex) else pd.Index(rows, name=index_name)
+    return pd.DataFrame(np.round(values, DECIMALS), index=index, columns=pd.Index(columns, name=columns_name))
+
+
+def _check_probabilities(alphas):
+    if np.any((alphas <= 0) | (alphas >= 1)):
+        raise ValueError("Probabilities must lie strictly between 0 and 1.")
+
+
+def _check_positive(values, name):
+    if np.any(values <= 0):
+        raise ValueError(f"{name} must be positive.")
+
+
+def _tail_area(alphas, tails):
+    return alphas / 2 if tails == 2 else alphas
+
+
+def z_cumulative_table(max_z=3.9, negative=False):
+    """Φ(z) with z = row + column (row in tenths, column the hundredths digit); ``negative`` gives Φ(-z)."""
+    rows = np.round(np.arange(0, max_z + 1e-9, 0.1), 1)
+    columns = np.round(np.arange(0, 0.1, 0.01), 2)
+    z = np.add.outer(rows, columns)
+    values = distributions.cdf("norm", -z if negative else z)
+    labels = [f"-{r:.1f}" if negative else f"{r:.1f}" for r in rows]
+    return _frame(values, labels, [f"{c:.2f}" for c in columns], "z", "hundredths")
+
+
+def z_critical_table(alphas):
+    """Critical z for each α, one- and two-tailed."""
+    _check_probabilities(alphas)
+    _check_cells(2 * len(alphas))
+    values = np.column_stack([distributions.isf("norm", alphas), distributions.isf("norm", alphas / 2)])
+    return _frame(values, [_label(a) for a in alphas], ["One-tailed", "Two-tailed"], "α", "test")
+
+
+def t_table(dfs, alphas, tails=2):
+    """Critical t (upper tail area α, or α/2 when ``tails`` = 2) for every df × α."""
+    _check_probabilities(alphas)
+    _check_positive(dfs, "Degrees of freedom")
+    _check_cells(len(dfs) * len(alphas))
+    values = distributions.isf("t", _tail_area(alphas, tails)[None, :], dfs[:, None])
+    return _frame(values, [_label(d) for d in dfs], [_label(a) for a in alphas], "df", "α")
+
+
+def two_sample_t_table(sizes_1, sizes_2, alpha=0.05, tails=2):
+    """Pooled two-sample critical t for group sizes n₁ × n₂ (df = n₁ + n₂ − 2)."""
+    _check_probabilities(np.array([alpha]))
+    if np.any(sizes_1 < 2) or np.any(sizes_2 < 2) or np.any(np.isinf(sizes_1)) or np.any(np.isinf(sizes_2)):
+        raise ValueError("Group sizes must be finite and at least 2.")
+    _check_cells(len(sizes_1) * len(sizes_2))
+    dfs = np.add.outer(sizes_1, sizes_2) - 2
+    values = distributions.isf("t", _tail_area(alpha, tails), dfs)
+    return _frame(values, [_label(n) for n in sizes_1], [_label(n) for n in sizes_2], "n₁", "n₂")
+
+
+def chi2_table(dfs, areas):
+    """Critical χ² leaving ``area`` in the upper tail, for every df × area."""
+    _check_probabilities(areas)
+    dfs = dfs[np.isfinite(dfs)]
+    _check_positive(dfs, "Degrees of freedom")
+    _check_cells(len(dfs) * len(areas))
+    areas = areas[::-1]
+    values = distributions.isf("chi2", areas[None, :], dfs[:, None])
+    return _frame(values, [_label(d) for d in dfs], [_label(a) for a in areas], "df", "upper-tail area")
+
+
+def f_table(df1s, df2s, alpha=0.05):
+    """Critical F (upper tail α) with numerator df across the columns and denominator df down the rows."""
+    _check_probabilities(np.array([alpha]))
+    df1s, df2s = df1s[np.isfinite(df1s)], df2s[np.isfinite(df2s)]
+    _check_positive(df1s, "Degrees of freedom")
+    _check_positive(df2s, "Degrees of freedom")
+    _check_cells(len(df1s) * len(df2s))
+    values = distributions.isf("f", alpha, df1s[None, :], df2s[:, None])
+    return _frame(values, [_label(d) for d in df2s], [_label(d) for d in df1s], "df₂ (denominator)",
+                  "df₁ (numerator)")
+
+
+def pearson_table(dfs, alphas, tails=2):
+    """Critical |r| for testing ρ = 0 with df = n − 2: r = t / √(df + t²)."""
+    _check_probabilities(alphas)
+    dfs = dfs[np.isfinite(dfs)]
+    _check_positive(dfs, "Degrees of freedom")
+    _check_cells(len(dfs) * len(alphas))
+    t = distributions.isf("t", _tail_area(alphas, tails)[None, :], dfs[:, None])
+    return _frame(t / np.sqrt(dfs[:, None] + t * t), [_label(d) for d in dfs], [_label(a) for a in alphas],
+                  "df", "α")
+
+
+def binomial_table(sizes, probs, cumulative=False):
+    """P(X = k) (or P(X ≤ k)) for every n in ``sizes``, k = 0..n and success probability p."""
+    _check_probabilities(probs)
+    sizes = sizes[np.isfinite(sizes)].astype(np.int64)
+    if np.any(sizes < 1):
+        raise ValueError("n must be at least 1.")
+    _check_cells(float(np.sum(sizes + 1)) * len(probs))
+    n = np.repeat(sizes, sizes + 1)
+    k = np.concatenate([np.arange(size + 1) for size in sizes])
+    method = distributions.cdf if cumulative else distributions.pmf
+    values = method("binom", k[:, None], n[:, None], probs[None, :])
+    index = pd.MultiIndex.from_arrays([n, k], names=["n", "k"])
+    return _frame(values, index, [_label(p) for p in probs], None, "p")
+
+
+def poisson_table(rates, k_max=20, cumulative=False):
+    """P(X = k) (or P(X ≤ k)) for k = 0..k_max down the rows and each λ across the columns."""
+    _check_positive(rates, "λ")
+    rates = rates[np.isfinite(rates)]
+    _check_cells((int(k_max) + 1) * len(rates))
+    k = np.arange(int(k_max) + 1)
+    method = distributions.cdf if cumulative else distributions.pmf
+    values = method("poisson", k[:, None], rates[None, :])
+    return _frame(values, k, [_label(r) for r in rates], "k", "λ")
+
+
+def exponential_table(xs, rates):
+    """P(X ≤ x) = 1 − e^(−λx) for each x down the rows and rate λ across the columns."""
+    _check_positive(rates, "λ")
+    if np.any(xs < 0):
+        raise ValueError("x must be non-negative.")
+    rates = rates[np.isfinite(rates)]
+    _check_cells(len(xs) * len(rates))
+    values = -np.expm1(-np.multiply.outer(xs, rates))
+    return _frame(values, [_label(x) for x in xs], [_label(r) for r in rates], "x", "λ")
+
+
+def normal_table(xs, mean=0.0, std=1.0):
+    """z, P(X ≤ x) and P(X > x) for X ~ N(mean, std²) at each x."""
+    _check_positive(np.array([std]), "σ")
+    z = (xs - mean) / std
+    values = np.column_stack([z, distributions.cdf("norm", z), distributions.sf("norm", z)])
+    return _frame(values, [_label(x) for x in xs], ["z", "P(X ≤ x)", "P(X > x)"], "x", None)
+
+
+def filter_rows(frame, query):
+    """Rows whose index label contains ``query`` (case-insensitive); all rows for an empty query."""
+    query = str(query).strip().lower()
+    if not query:
+        return frame
+    labels = (" ".join(map(str, label)) if isinstance(label, tuple) else str(label) for label in frame.index)
+    return frame[np.array([query in label.lower() for label in labels], dtype=bool)]
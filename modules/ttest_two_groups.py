@@ -2,11 +2,12 @@ import streamlit as st
 from scipy import stats
 import matplotlib.pyplot as plt
 import seaborn as sns
+from modules import model_cache, permutation
 
 def run_ttest(df):
     st.header("📘 T-Test: Two Independent Groups")
     
-    numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns.tolist()
+    numeric_cols = df.select_dtypes(include='number').columns.tolist()
     
     if len(numeric_cols) >= 2:
         col1 = st.selectbox("🧪 Select first group column:", numeric_cols, key="hyp1")
@@ -38,5 +39,13 @@ def run_ttest(df):
             with col2:
                 st.pyplot(fig)
 
+        # Mismo contraste sin suponer normalidad (fuera del botón para sobrevivir a los reruns)
+        statistic = "mean_diff" if equal_var else "welch_t"
+        permutation.show_permutation_test(
+            lambda n, seed, stop: permutation.two_sample_test(df[col1].dropna(), df[col2].dropna(), statistic,
+                                                              n_permutations=n, seed=seed, stop_early=stop),
+            model_cache.frame_fingerprint(df, [col1, col2]), (col1, col2, statistic), "ttest"
+        )
+
     else:
         st.warning("⚠️ At least two numeric columns are required for T-Test.")
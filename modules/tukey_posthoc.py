@@ -1,29 +1,72 @@
 import streamlit as st
-import pandas as pd
-from statsmodels.stats.multicomp import pairwise_tukeyhsd
+import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
+from modules import anova_engine, posthoc
+
+# Con más grupos los gráficos por grupo dejan de ser legibles
+PLOT_MAX_GROUPS = 40
+PAGE_SIZES = [25, 50, 100, 500]
 
 def run_tukey_test(data, group_col, value_col):
     st.header("📘 Tukey's Post-Hoc Test")
 
     try:
-        tukey = pairwise_tukeyhsd(endog=data[value_col], groups=data[group_col], alpha=0.05)
+        # Mismos estadísticos por grupo que el ANOVA: MSW y medias salen de la caché de la sesión
+        gs = anova_engine.cached_group_stats(data, group_col, value_col)
+        alpha = 0.05
+
+        method = st.selectbox("🧪 Comparison method:", list(posthoc.METHODS), key="posthoc_method")
+        result_df = anova_engine.cached_derived(
+            data, group_col, value_col, ("posthoc", method, alpha),
+            lambda: posthoc.METHODS[method](gs, alpha).sort_values('p-adj', kind='stable').reset_index(drop=True)
+        )
+        n_significant = int(result_df['reject'].sum())
+
+        st.subheader(f"📋 {method} Summary")
+        st.write(f"**Groups:** {gs.k} — **Pairs:** {len(result_df)} — **Significant (α={alpha}):** {n_significant}")
+        if 'note' in result_df:
+            n_skipped = int((result_df['note'] != "").sum())
+            st.warning(f"⚠️ {n_skipped} pair(s) could not be tested (see the 'note' column).")
+
+        only_significant = st.checkbox("Show only significant pairs", value=len(result_df) > PAGE_SIZES[0],
+                                       key="posthoc_significant")
+        view = result_df[result_df['reject']] if only_significant else result_df
+        col1, col2 = st.columns(2)
+        with col1:
+            page_size = st.selectbox("Rows per page:", PAGE_SIZES, index=1, key="posthoc_page_size")
+        n_pages = max(1, -(-len(view) // page_size))
+        with col2:
+            page = st.number_input("Page:", min_value=1, max_value=n_pages, value=1, step=1, key="posthoc_page")
+        start = (page - 1) * page_size
+        st.dataframe(view.iloc[start:start + page_size].round(4))
+        st.caption(f"Rows {min(start + 1, len(view))}–{min(start + page_size, len(view))} of {len(view)}, sorted by adjusted p-value.")
+        st.download_button(
+            label="📥 Download all comparisons (CSV)",
+            data=lambda: result_df.to_csv(index=False).encode("utf-8"),
+            file_name="posthoc_comparisons.csv",
+            mime="text/csv",
+            key="posthoc_csv"
+        )
 
-        st.subheader("📋 Tukey HSD Summary")
-        result_df = pd.DataFrame(data=tukey.summary().data[1:], columns=tukey.summary().data[0])
-        st.dataframe(result_df)
+        if gs.k > PLOT_MAX_GROUPS:
+            st.info(f"ℹ️ Plots are shown for up to {PLOT_MAX_GROUPS} groups ({gs.k} here); use the table above.")
+            return
 
         # Gráfico de comparaciones múltiples
         st.subheader("📈 Tukey HSD Plot")
-        fig = tukey.plot_simultaneous(figsize=(4, 2))
-        fig.suptitle("Tukey HSD Plot", fontsize=8)
-        for ax in fig.axes:
-            ax.tick_params(axis='both', labelsize=6)
-            ax.set_title("")  # Borra el título superpuesto
+        halfwidths = posthoc.simultaneous_intervals(gs, alpha=alpha)
+        fig, ax = plt.subplots(figsize=(4, 2))
+        positions = np.arange(gs.k)
+        ax.errorbar(gs.mean, positions, xerr=halfwidths, fmt='o', capsize=3)
+        ax.set_yticks(positions)
+        ax.set_yticklabels(gs.labels.astype(str))
+        ax.set_ylim(-1, gs.k)
+        ax.set_title("Tukey HSD Plot", fontsize=8)
+        ax.tick_params(axis='both', labelsize=6)
         col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
-            st.pyplot(fig.figure)
+            st.pyplot(fig)
 
 
         # Boxplot para visualización de grupos
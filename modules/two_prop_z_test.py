@@ -1,7 +1,7 @@
 
 import streamlit as st
-from scipy.stats import norm
 import numpy as np
+from modules import distributions
 
 def run():
     st.header("📊 Two-Proportion Z-Test")
@@ -36,11 +36,11 @@ def run():
         z_score = (p1 - p2) / se
 
         if alternative == "p₁ ≠ p₂ (Two-tailed)":
-            p_value = 2 * (1 - norm.cdf(abs(z_score)))
+            p_value = distributions.p_value("norm", z_score)
         elif alternative == "p₁ > p₂ (Right-tailed)":
-            p_value = 1 - norm.cdf(z_score)
+            p_value = distributions.sf("norm", z_score)
         else:
-            p_value = norm.cdf(z_score)
+            p_value = distributions.cdf("norm", z_score)
 
         st.subheader("🧾 Results")
         st.write(f"Z-Score: **{z_score:.4f}**")
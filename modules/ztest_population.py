@@ -2,12 +2,12 @@ import streamlit as st
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from scipy import stats
+from modules import distributions
 
 def run_ztest(df):
     st.header("📘 Z-Test: Sample vs Population")
 
-    numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns.tolist()
+    numeric_cols = df.select_dtypes(include='number').columns.tolist()
 
     if len(numeric_cols) >= 1:
         col = st.selectbox("🔢 Select numeric sample column:", numeric_cols, key="ztest1")
@@ -20,8 +20,8 @@ def run_ztest(df):
             sample_mean = sample_data.mean()
             n = len(sample_data)
             z_stat = (sample_mean - population_mean) / (population_std / np.sqrt(n))
-            p_value = 2 * (1 - stats.norm.cdf(abs(z_stat)))
-            z_crit = stats.norm.ppf(1 - alpha / 2)
+            p_value = distributions.p_value("norm", z_stat)
+            z_crit = distributions.critical_value("norm", alpha)
 
             # Resultados
             st.subheader("📈 Results")
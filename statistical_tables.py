@@ -1,36 +1,91 @@
+import numpy as np
 import streamlit as st
-import base64
-import os
-import streamlit.components.v1 as components 
-
-def embed_pdf_web_compatible(file_path, label):
-    if os.path.exists(file_path):
-        # Mostrar botón de descarga
-        with open(file_path, "rb") as f:
-            st.download_button(f"📥 Download {label}", data=f, file_name=os.path.basename(file_path), mime='application/pdf')
-
-        # Detectar si estamos en local o en la nube
-        if "localhost" in st.query_params.get("host", [""])[0]:
-            # ✅ Entorno local — usar iframe
-            with open(file_path, "rb") as f:
-                base64_pdf = base64.b64encode(f.read()).decode('utf-8')
-                pdf_display = f'<iframe src="data:application/pdf;base64,{base64_pdf}" width="700" height="500" type="application/pdf"></iframe>'
-                st.markdown(pdf_display, unsafe_allow_html=True)
-        else:
-            # 🌐 Cloud — dar link al PDF si está en /assets/
-            base_path = st.get_option('server.baseUrlPath') or ""
-            ##st.markdown(f"[📄 View {label} PDF online]({base_path}/assets/tables/{os.path.basename(file_path)})",unsafe_allow_html=True)   
-
+from modules import report_builder, table_engine
+from modules.table_engine import parse_values
+
+ALPHA_OPTIONS = [0.10, 0.05, 0.025, 0.01, 0.005, 0.001]
+TAIL_OPTIONS = {2: "Two-tailed", 1: "One-tailed"}
+
+# Cada tabla se describe con textos simples (rejillas "1-30, 40, inf"), que sirven de clave de caché
+_BUILDERS = {
+    "z": lambda negative: table_engine.z_cumulative_table(negative=negative),
+    "z_critical": lambda alphas: table_engine.z_critical_table(parse_values(alphas)),
+    "t": lambda dfs, alphas, tails: table_engine.t_table(parse_values(dfs, True), parse_values(alphas), tails),
+    "f": lambda df1s, df2s, alpha: table_engine.f_table(parse_values(df1s, True), parse_values(df2s, True), alpha),
+    "chi2": lambda dfs, areas: table_engine.chi2_table(parse_values(dfs, True), parse_values(areas)),
+    "pearson": lambda dfs, alphas, tails: table_engine.pearson_table(parse_values(dfs, True), parse_values(alphas),
+                                                                     tails),
+    "binomial": lambda sizes, probs, cumulative: table_engine.binomial_table(parse_values(sizes, True),
+                                                                             parse_values(probs), cumulative),
+    "poisson": lambda rates, k_max, cumulative: table_engine.poisson_table(parse_values(rates), k_max, cumulative),
+    "normal": lambda start, stop, step, mean, std: table_engine.normal_table(_grid(start, stop, step), mean, std),
+    "exponential": lambda xs, rates: table_engine.exponential_table(parse_values(xs), parse_values(rates)),
+    "two_sample_t": lambda sizes_1, sizes_2, alpha, tails: table_engine.two_sample_t_table(
+        parse_values(sizes_1, True), parse_values(sizes_2, True), alpha, tails),
+}
+
+
+def _grid(start, stop, step):
+    if step <= 0 or stop < start:
+        raise ValueError("Use a positive step and an end value at or above the start.")
+    if (stop - start) / step >= table_engine.MAX_CELLS:
+        raise ValueError("Too many rows; increase the step.")
+    return np.round(np.arange(start, stop + step / 2, step), 10)
+
+
+@st.cache_data(max_entries=64, show_spinner="🧮 Building table...")
+def _table(name, args):
+    return _BUILDERS[name](*args)
+
+
+def show_table(name, args, title, key, find_hint="e.g. 12"):
+    """Computed table with a row finder and CSV/PDF downloads (built once per grid, then cached)."""
+    try:
+        frame = _table(name, args)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        return
+
+    query = st.text_input("🔎 Find row:", key=f"{key}_find", placeholder=find_hint)
+    view = table_engine.filter_rows(frame, query)
+    if view.empty:
+        st.info("No rows match the search.")
     else:
-        st.error(f"❌ {label} not found: {file_path}")
+        st.dataframe(view, width="stretch")
+    st.caption(f"{frame.shape[0]:,} rows × {frame.shape[1]:,} columns, computed exactly (no interpolation).")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button(
+            label=f"📥 Download {title} (CSV)",
+            data=lambda: frame.to_csv().encode("utf-8"),
+            file_name=f"{key}.csv",
+            mime="text/csv",
+            key=f"{key}_csv"
+        )
+    with col2:
+        report_builder.report_download_button(
+            f"📄 Download {title} (PDF)", ("table", name) + tuple(args),
+            lambda: report_builder.build_table_pdf(title, frame), f"{key}.pdf", key=f"{key}_pdf"
+        )
+
+
+def _alpha_select(key, default=0.05):
+    return st.selectbox("⚠️ Significance level (α):", ALPHA_OPTIONS, index=ALPHA_OPTIONS.index(default), key=key)
+
+
+def _tails_radio(key):
+    return st.radio("Tails:", list(TAIL_OPTIONS), format_func=TAIL_OPTIONS.get, horizontal=True, key=key)
+
 
 def main():
     st.title("\U0001F4CA Statistical Tables Reference")
+    st.caption("Tables are computed on demand for the grid you choose. Ranges like `1-30` and `inf` are accepted.")
 
     tab_names = [
         "Z Table", "T Table", "F Table", "Chi-Square",
         "Pearson Correlation", "Binomial", "Poisson",
-        "Normal Dist", "Exponential", "Two-sample T", 
+        "Normal Dist", "Exponential", "Two-sample T",
     ]
 
     tabs = st.tabs(tab_names)
@@ -49,7 +104,11 @@ def main():
 - Critical Z: `=NORM.S.INV(1 - α/2)`  
 - Cumulative Probability: `=NORM.S.DIST(Z, TRUE)`
         """)
-        embed_pdf_web_compatible("assets/tables/Standard-Normal-Ztable.pdf", "Z Table")
+        side = st.radio("Side:", ["Positive z: P(Z ≤ z)", "Negative z: P(Z ≤ −z)"], horizontal=True, key="z_side")
+        show_table("z", (side.startswith("Negative"),), "Standard Normal Table", "z_table", find_hint="e.g. 1.9")
+        with st.expander("🎯 Critical z values"):
+            alphas = st.text_input("α values:", table_engine.DEFAULT_ALPHAS, key="z_crit_alphas")
+            show_table("z_critical", (alphas,), "Critical z Values", "z_critical", find_hint="e.g. 0.05")
 
     with tabs[1]:
         st.subheader("T Table (Student's t)")
@@ -65,7 +124,10 @@ def main():
 - Critical T: `=T.INV.2T(α, df)`  
 - Cumulative Probability: `=T.DIST(T, df, TRUE)`
         """)
-        embed_pdf_web_compatible("assets/tables/t-table.pdf", "T Table")
+        dfs = st.text_input("Degrees of freedom:", table_engine.DEFAULT_DFS, key="t_dfs")
+        alphas = st.text_input("α values:", table_engine.DEFAULT_ALPHAS, key="t_alphas")
+        tails = _tails_radio("t_tails")
+        show_table("t", (dfs, alphas, tails), "t Critical Values", "t_table")
 
     with tabs[2]:
         st.subheader("F Table (Fisher Distribution)")
@@ -82,7 +144,10 @@ def main():
 - Critical F: `=F.INV.RT(α, df1, df2)`  
 - Cumulative Probability: `=F.DIST.RT(F, df1, df2)`
         """)
-        embed_pdf_web_compatible("assets/tables/F-table.pdf", "F Table")
+        alpha = _alpha_select("f_alpha")
+        df1s = st.text_input("Numerator df (df1):", "1-10, 12, 15, 20, 24, 30, 40, 60, 120", key="f_df1")
+        df2s = st.text_input("Denominator df (df2):", "1-30, 40, 60, 120", key="f_df2")
+        show_table("f", (df1s, df2s, alpha), f"F Critical Values (α = {alpha})", "f_table")
 
     with tabs[3]:
         st.subheader("Chi-Square Table")
@@ -100,7 +165,9 @@ def main():
 - Critical χ²: `=CHIINV(α, df)`  
 - Cumulative Probability: `=CHIDIST(χ², df)`
         """)
-        embed_pdf_web_compatible("assets/tables/chi-square-table.pdf", "Chi-Square Table")
+        dfs = st.text_input("Degrees of freedom:", "1-30, 40, 50, 60, 70, 80, 90, 100", key="chi2_dfs")
+        areas = st.text_input("Upper-tail areas:", table_engine.DEFAULT_CHI2_AREAS, key="chi2_areas")
+        show_table("chi2", (dfs, areas), "Chi-Square Critical Values", "chi_square_table")
 
     with tabs[4]:
         st.subheader("Pearson Correlation Table")
@@ -116,7 +183,11 @@ def main():
 - Pearson r: `=CORREL(range1, range2)`  
 - Associated T: `=T.INV.2T(α, n - 2)`
         """)
-        embed_pdf_web_compatible("assets/tables/Pearsonstable.pdf", "Pearson Correlation Table")
+        dfs = st.text_input("Degrees of freedom (n - 2):", "1-30, 35, 40, 45, 50, 60, 70, 80, 90, 100",
+                            key="pearson_dfs")
+        alphas = st.text_input("α values:", "0.10, 0.05, 0.02, 0.01, 0.001", key="pearson_alphas")
+        tails = _tails_radio("pearson_tails")
+        show_table("pearson", (dfs, alphas, tails), "Pearson r Critical Values", "pearson_table")
 
     with tabs[5]:
         st.subheader("Binomial Distribution Table")
@@ -130,7 +201,10 @@ def main():
 - Exact success: `=BINOM.DIST(x, n, p, FALSE)`  
 - Cumulative: `=BINOM.DIST(x, n, p, TRUE)`
         """)
-        embed_pdf_web_compatible("assets/tables/Binomial-Distribution-Table.pdf", "Binomial Table")
+        sizes = st.text_input("Number of trials (n):", "1-20", key="binom_n")
+        probs = st.text_input("Success probabilities (p):", table_engine.DEFAULT_PROBS, key="binom_p")
+        cumulative = st.checkbox("Cumulative P(X ≤ k)", key="binom_cumulative")
+        show_table("binomial", (sizes, probs, cumulative), "Binomial Table", "binomial_table", find_hint="e.g. 5 3")
 
     with tabs[6]:
         st.subheader("Poisson Distribution Table")
@@ -144,7 +218,10 @@ def main():
 - Exact event count: `=POISSON.DIST(x, λ, FALSE)`  
 - Cumulative: `=POISSON.DIST(x, λ, TRUE)`
         """)
-        embed_pdf_web_compatible("assets/tables/poisson_table.pdf", "Poisson Table")
+        rates = st.text_input("Mean rates (λ):", "0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1-10", key="poisson_rates")
+        k_max = st.number_input("Largest k:", min_value=1, max_value=1000, value=20, key="poisson_kmax")
+        cumulative = st.checkbox("Cumulative P(X ≤ k)", key="poisson_cumulative")
+        show_table("poisson", (rates, int(k_max), cumulative), "Poisson Table", "poisson_table", find_hint="e.g. 4")
 
     with tabs[7]:
         st.subheader("Normal Distribution (Z-Score)")
@@ -157,7 +234,16 @@ def main():
 **Key Formula:**  
 - Cumulative Probability: `=NORM.DIST(X, mean, std_dev, TRUE)`
         """)
-        embed_pdf_web_compatible("assets/tables/z-table.pdf", "Normal Z Table")
+        col1, col2 = st.columns(2)
+        with col1:
+            mean = st.number_input("Mean (μ):", value=0.0, key="normal_mean")
+            start = st.number_input("From x:", value=-3.0, key="normal_start")
+            step = st.number_input("Step:", value=0.1, min_value=1e-6, format="%.4f", key="normal_step")
+        with col2:
+            std = st.number_input("Standard deviation (σ):", value=1.0, min_value=1e-12, key="normal_std")
+            stop = st.number_input("To x:", value=3.0, key="normal_stop")
+        show_table("normal", (start, stop, step, mean, std), "Normal Distribution Table", "normal_table",
+                   find_hint="e.g. 1.5")
 
     with tabs[8]:
         st.subheader("Exponential Distribution Table")
@@ -170,7 +256,9 @@ def main():
 **Key Formula:**  
 - Cumulative: `=EXPON.DIST(x, λ, TRUE)`
         """)
-        st.warning("⚠️ Exponential table not yet available.")
+        xs = st.text_input("x values:", "0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 2.5, 3-5, 7.5, 10", key="expon_x")
+        rates = st.text_input("Rates (λ):", "0.1, 0.2, 0.5, 1, 1.5, 2, 3, 5", key="expon_rates")
+        show_table("exponential", (xs, rates), "Exponential Table P(X ≤ x)", "exponential_table", find_hint="e.g. 2")
 
     with tabs[9]:
         st.subheader("Two-Sample T Table")
@@ -185,5 +273,10 @@ def main():
   - tails: 1 or 2  
   - type: 1 = paired, 2 = equal variances, 3 = unequal
         """)
-
-
+        st.caption("Critical t for the pooled-variance test (type 2): df = n₁ + n₂ − 2.")
+        sizes_1 = st.text_input("Group 1 sizes (n₁):", "2-20, 25, 30, 40, 50", key="t2_n1")
+        sizes_2 = st.text_input("Group 2 sizes (n₂):", "2-20, 25, 30, 40, 50", key="t2_n2")
+        alpha = _alpha_select("t2_alpha")
+        tails = _tails_radio("t2_tails")
+        show_table("two_sample_t", (sizes_1, sizes_2, alpha, tails), f"Two-Sample t Critical Values (α = {alpha})",
+                   "two_sample_t_table")